@@ -9,23 +9,43 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_SCAN_INTERVAL, Platform
 from homeassistant.core import HomeAssistant
 
-from .const import BASE, DOMAIN
-from .sensor import PiJups
+from . import loopwatch
+from .const import (
+    BASE,
+    CONF_LOOP_BLOCK_THRESHOLD,
+    CONF_METRICS,
+    CONF_TELEMETRY_SOCKET,
+    DOMAIN,
+)
+from .interface import PiJups
+from .services import async_setup_services, async_unload_services
 
 _LOGGER = logging.getLogger(__name__)
 
 #  List of platforms to support. There should be a matching .py file for each,
 #  eg <cover.py> and <sensor.py>
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [
+    Platform.BINARY_SENSOR,
+    Platform.NUMBER,
+    Platform.SENSOR,
+    Platform.SWITCH,
+]
 
 def get_local_platform_module(platform, name):
+    """Import integration module (platform or optional feature) outside of event loop."""
     return importlib.import_module("." + platform, name)
 
+@loopwatch.watch_loop
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up PiJups from a config entry."""
     # Store an instance of the "connecting" class that does the work of speaking
     # with your actual devices.
     hass.data.setdefault(DOMAIN, {})
+    threshold = entry.options.get(CONF_LOOP_BLOCK_THRESHOLD)
+    if threshold and loopwatch.ACTIVE_DETECTOR is None:
+        detector = loopwatch.LoopBlockDetector(hass.loop, threshold / 1000)
+        detector.start()
+        entry.async_on_unload(detector.stop)
 
     pijups: PiJups = PiJups(hass, entry)
     hass.data[DOMAIN][entry.entry_id] = {BASE: pijups}
@@ -41,17 +61,40 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # This creates each HA object for each platform your device requires.
     # It's done by calling the `async_setup_entry` function in each platform module.
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await async_setup_services(hass)
+    if socket_path := entry.options.get(CONF_TELEMETRY_SOCKET):
+        fanout = await hass.async_add_executor_job(get_local_platform_module, "fanout", __name__)
+        publisher = fanout.TelemetryPublisher(socket_path)
+        try:
+            await publisher.async_start()
+        except OSError as err:
+            _LOGGER.error("Telemetry socket %s not available: %s", socket_path, err)
+        else:
+            pijups.publisher = publisher
+            entry.async_on_unload(publisher.async_stop)
+    if entry.options.get(CONF_METRICS):
+        metrics = await hass.async_add_executor_job(get_local_platform_module, "metrics", __name__)
+        metrics.async_register_metrics_view(hass)
+    # options flow is created in event loop callback, have its module imported here already
+    await hass.async_add_executor_job(get_local_platform_module, "options_flow", __name__)
     _LOGGER.debug("async_setup_entry completed")
     return True
 
 
+@loopwatch.watch_loop
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # This is called when an entry/configured device is to be removed. The class
     # needs to unload itself, and remove callbacks. See the classes for further
     # details
+    pijups = hass.data[DOMAIN][entry.entry_id][BASE]
+    pijups.stop_sampler()
+    pijups.stop_profiler()
+    await hass.async_add_executor_job(pijups.stop_capture)
+    await hass.async_add_executor_job(pijups.disarm_watchdog)
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await async_unload_services(hass)
     _LOGGER.debug("async_unload_entry completed")
     return unload_ok
@@ -0,0 +1,186 @@
+"""The PiJuPS HAT integration - wake-up alarm scheduling."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import UTC
+from functools import lru_cache
+import logging
+
+from .pijuice import PiJuiceRtcAlarm
+from .registers import poll_register
+from .rtc import BCD
+
+_LOGGER = logging.getLogger(__name__)
+
+ALARM_LENGTH = 9
+CTRL_STATUS_LENGTH = 2
+CTRL_WAKEUP_ENABLED = 0x01 | 0x04
+# alarm register image field flags, see PiJuiceRtcAlarm.SetAlarm
+ALARM_EVERY = 0x80
+ALARM_WEEKDAY = 0x40
+ALARM_ALL_HOURS = [0xFF, 0xFF, 0xFF]
+ALARM_ALL_WEEKDAYS = 0xFF
+HOUR_BITS = [1 << hour for hour in range(24)]
+WEEKDAY_BITS = [1 << weekday for weekday in range(8)]
+
+
+def parse_cron_field(field, low, high):
+    """Parse single cron field: '*', '*/n', number or comma separated numbers; returns (kind, value)."""
+    if field == "*":
+        return "every", None
+    if field.startswith("*/"):
+        period = int(field[2:])
+        if not 1 <= period <= 60:
+            raise ValueError(f"invalid period {field}")
+        return "period", period
+    values = sorted({int(value) for value in field.split(",")})
+    if not values or values[0] < low or values[-1] > high:
+        raise ValueError(f"value out of range {low}..{high}: {field}")
+    if len(values) == 1:
+        return "value", values[0]
+    return "list", values
+
+
+@lru_cache(maxsize=32)
+def compile_cron(spec: str):
+    """Compile 'minute hour day-of-month month day-of-week' spec to alarm register image.
+
+    HAT alarm matches minute (or minute period), hours, day of month or weekdays; second is 0 and
+    month must be '*'. Day of week is 0-7 with Sunday as 0 or 7, as in cron.
+    """
+    fields = spec.split()
+    if len(fields) != 5:
+        raise ValueError(f"5 fields expected: {spec}")
+    minute, hour, day, month, weekday = fields
+    if month != "*":
+        raise ValueError("month can not be matched by HAT alarm")
+    if day != "*" and weekday != "*":
+        raise ValueError("day of month and day of week are mutually exclusive")
+    image = [BCD[0], 0, 0, 0, *ALARM_ALL_HOURS, 0, ALARM_ALL_WEEKDAYS]
+
+    kind, value = parse_cron_field(minute, 0, 59)
+    if kind == "value":
+        image[1] = BCD[value]
+    elif kind == "every":
+        image[1] = ALARM_EVERY
+    elif kind == "period":
+        image[1] = ALARM_EVERY
+        image[7] = value
+    else:
+        raise ValueError("minute list not supported by HAT alarm")
+
+    kind, value = parse_cron_field(hour, 0, 23)
+    if kind == "value":
+        image[2] = BCD[value]
+    elif kind == "every":
+        image[2] = ALARM_EVERY
+    elif kind == "list":
+        image[2] = ALARM_EVERY
+        mask = sum(HOUR_BITS[h] for h in value)
+        image[4:7] = [mask & 0xFF, (mask >> 8) & 0xFF, (mask >> 16) & 0xFF]
+    else:
+        raise ValueError("hour period not supported by HAT alarm")
+
+    if weekday != "*":
+        kind, value = parse_cron_field(weekday, 0, 7)
+        if kind == "value":
+            image[3] = ALARM_WEEKDAY | (value % 7 + 1)
+        elif kind == "list":
+            image[3] = ALARM_EVERY | ALARM_WEEKDAY
+            image[8] = sum({WEEKDAY_BITS[v % 7 + 1] for v in value})
+        else:
+            raise ValueError("weekday period not supported by HAT alarm")
+    else:
+        kind, value = parse_cron_field(day, 1, 31)
+        if kind == "value":
+            image[3] = BCD[value]
+        elif kind == "every":
+            image[3] = ALARM_EVERY
+        else:
+            raise ValueError("day of month list or period not supported by HAT alarm")
+    return tuple(image)
+
+
+def compile_datetime(when: datetime):
+    """Compile time to alarm register image matching second, minute, hour and day of month (RTC keeps UTC)."""
+    when = when.astimezone(UTC)
+    return (
+        BCD[when.second],
+        BCD[when.minute],
+        BCD[when.hour],
+        BCD[when.day],
+        *ALARM_ALL_HOURS,
+        0,
+        ALARM_ALL_WEEKDAYS,
+    )
+
+
+def first_match(when: datetime, now: datetime):
+    """Return first time after now matched by alarm compiled from when, alarm repeats monthly on day of month."""
+    when = when.astimezone(UTC)
+    now = now.astimezone(UTC)
+    year, month = now.year, now.month
+    while True:
+        try:
+            match = now.replace(
+                year=year,
+                month=month,
+                day=when.day,
+                hour=when.hour,
+                minute=when.minute,
+                second=when.second,
+                microsecond=0,
+            )
+        except ValueError:  # no such day in month
+            match = None
+        if match is not None and match > now:
+            return match
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def compile_alarm(spec):
+    """Compile datetime or cron-like string to alarm register image."""
+    if isinstance(spec, datetime):
+        return compile_datetime(spec)
+    return compile_cron(" ".join(spec.split()))
+
+
+def schedule_wakeup(interface, image, enable=True):
+    """Write alarm register image and wake-up enable flag, skipping registers already holding requested values."""
+    image = list(image)
+    result = {"alarm_written": False, "wakeup_written": False}
+    with interface.bus_lock:
+        ret = interface.ReadData(PiJuiceRtcAlarm.RTC_ALARM_CMD, ALARM_LENGTH)
+        if ret["error"] != "NO_ERROR" or ret["data"] != image:
+            ret = interface.WriteData(PiJuiceRtcAlarm.RTC_ALARM_CMD, image)
+            if ret["error"] != "NO_ERROR":
+                return ret
+            ret = poll_register(
+                interface, PiJuiceRtcAlarm.RTC_ALARM_CMD, ALARM_LENGTH, lambda data: data == image
+            )
+            if ret["error"] != "NO_ERROR":
+                return ret
+            result["alarm_written"] = True
+
+        ret = interface.ReadData(PiJuiceRtcAlarm.RTC_CTRL_STATUS_CMD, CTRL_STATUS_LENGTH)
+        if ret["error"] != "NO_ERROR":
+            return ret
+        ctrl = ret["data"]
+        enabled = ctrl[0] & CTRL_WAKEUP_ENABLED == CTRL_WAKEUP_ENABLED
+        if enabled != enable:
+            ctrl[0] = ctrl[0] | CTRL_WAKEUP_ENABLED if enable else ctrl[0] & ~0x01
+            ret = interface.WriteData(PiJuiceRtcAlarm.RTC_CTRL_STATUS_CMD, ctrl)
+            if ret["error"] != "NO_ERROR":
+                return ret
+            ret = poll_register(
+                interface,
+                PiJuiceRtcAlarm.RTC_CTRL_STATUS_CMD,
+                CTRL_STATUS_LENGTH,
+                lambda data: data[0] == ctrl[0],
+            )
+            if ret["error"] != "NO_ERROR":
+                return ret
+            result["wakeup_written"] = True
+    _LOGGER.debug("schedule_wakeup %s: %s", image, result)
+    return {"data": result, "error": "NO_ERROR"}
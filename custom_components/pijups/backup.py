@@ -0,0 +1,167 @@
+"""The PiJuPS HAT integration - HAT configuration backup and restore."""
+
+from datetime import datetime
+from datetime import UTC
+import json
+import logging
+
+from .const import CONF_MODEL
+from .interface import PiJups
+from .pijuice import PiJuiceConfig, PiJuicePower, PiJuiceRtcAlarm
+from .registers import read_register_snapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKUP_FORMAT_VERSION = 1
+SECTION_BACKUP = "backup"
+
+# configuration registers in restore order; "verify" is WriteDataVerify delay as used by
+# PiJuice API setters (None - verify without delay), registers without it are written with WriteData;
+# custom profile is selected before its data is written, as PiJuice API/GUI do; watchdog is backed up
+# for reference only, it is armed by integration option so that it is disarmed on stop/unload
+BACKUP_REGISTERS = [
+    {"name": "charging", "cmd": PiJuiceConfig.CHARGING_CONFIG_CMD, "length": 1, "verify": None, "nv_mask": 0x80},
+    {"name": "profile_id", "cmd": PiJuiceConfig.BATTERY_PROFILE_ID_CMD, "length": 1},
+    {"name": "profile", "cmd": PiJuiceConfig.BATTERY_PROFILE_CMD, "length": 14, "verify": 0.2, "custom_profile": True},
+    {"name": "ext_profile", "cmd": PiJuiceConfig.BATTERY_EXT_PROFILE_CMD, "length": 17, "verify": 0.2, "custom_profile": True},
+    {"name": "temp_sense_rsoc", "cmd": PiJuiceConfig.BATTERY_TEMP_SENSE_CONFIG_CMD, "length": 1, "verify": None},
+    {"name": "power_inputs", "cmd": PiJuiceConfig.POWER_INPUTS_CONFIG_CMD, "length": 1, "verify": None},
+    {"name": "sw1", "cmd": PiJuiceConfig.BUTTON_CONFIGURATION_CMD, "length": 12, "verify": 0.4},
+    {"name": "sw2", "cmd": PiJuiceConfig.BUTTON_CONFIGURATION_CMD + 1, "length": 12, "verify": 0.4},
+    {"name": "sw3", "cmd": PiJuiceConfig.BUTTON_CONFIGURATION_CMD + 2, "length": 12, "verify": 0.4},
+    {"name": "d1", "cmd": PiJuiceConfig.LED_CONFIGURATION_CMD, "length": 4, "verify": 0.2},
+    {"name": "d2", "cmd": PiJuiceConfig.LED_CONFIGURATION_CMD + 1, "length": 4, "verify": 0.2},
+    {"name": "regulator", "cmd": PiJuiceConfig.POWER_REGULATOR_CONFIG_CMD, "length": 1, "verify": None},
+    {"name": "run_pin", "cmd": PiJuiceConfig.RUN_PIN_CONFIG_CMD, "length": 1, "verify": None},
+    {"name": "io1", "cmd": PiJuiceConfig.IO_CONFIGURATION_CMD, "length": 5, "verify": 0.2},
+    {"name": "io2", "cmd": PiJuiceConfig.IO_CONFIGURATION_CMD + 5, "length": 5, "verify": 0.2},
+    {"name": "watchdog", "cmd": PiJuicePower.WATCHDOG_ACTIVATION_CMD, "length": 2, "restore": False},
+    {"name": "wakeup_on_charge", "cmd": PiJuicePower.WAKEUP_ON_CHARGE_CMD, "length": 1},
+    {"name": "alarm", "cmd": PiJuiceRtcAlarm.RTC_ALARM_CMD, "length": 9, "verify": 0.2},
+]
+for _reg in BACKUP_REGISTERS:
+    _reg["section"] = SECTION_BACKUP
+
+
+def profile_id_to_write(data):
+    """Convert battery profile status register value to profile id accepted by register write."""
+    if (data[0] >> 4) & 0x03 != 0:  # profile selected by DIP switch or resistor
+        return 0xFF
+    return data[0] & 0x0F
+
+
+def is_custom_profile(data):
+    """Check if battery profile status register value selects custom profile."""
+    return data[0] & 0x0F == 0x0F
+
+
+def decode_backup_config(snapshot):
+    """Decode register snapshot with PiJuice API getters for human readable part of backup."""
+    getters = {
+        "charging": (snapshot.config.GetChargingConfig,),
+        "profile_id": (snapshot.config.GetBatteryProfileStatus,),
+        "profile": (snapshot.config.GetBatteryProfile,),
+        "ext_profile": (snapshot.config.GetBatteryExtProfile,),
+        "temp_sense": (snapshot.config.GetBatteryTempSenseConfig,),
+        "rsoc": (snapshot.config.GetRsocEstimationConfig,),
+        "power_inputs": (snapshot.config.GetPowerInputsConfig,),
+        "sw1": (snapshot.config.GetButtonConfiguration, "SW1"),
+        "sw2": (snapshot.config.GetButtonConfiguration, "SW2"),
+        "sw3": (snapshot.config.GetButtonConfiguration, "SW3"),
+        "d1": (snapshot.config.GetLedConfiguration, "D1"),
+        "d2": (snapshot.config.GetLedConfiguration, "D2"),
+        "regulator": (snapshot.config.GetPowerRegulatorMode,),
+        "run_pin": (snapshot.config.GetRunPinConfig,),
+        "io1": (snapshot.config.GetIoConfiguration, 1),
+        "io2": (snapshot.config.GetIoConfiguration, 2),
+        "watchdog": (snapshot.power.GetWatchdog,),
+        "wakeup_on_charge": (snapshot.power.GetWakeUpOnCharge,),
+        "alarm": (snapshot.rtcalarm.GetAlarm,),
+    }
+    config = {}
+    for name, (getter, *args) in getters.items():
+        ret = getter(*args)
+        if ret["error"] == "NO_ERROR":
+            config[name] = PiJups.unwrap_pijuice_data(ret)
+    return config
+
+
+def backup_config(pijups: PiJups, file_name):
+    """Save HAT configuration registers (raw and decoded) to file."""
+    snapshot = read_register_snapshot(pijups.interface, None, BACKUP_REGISTERS)
+    if snapshot.failed:
+        _LOGGER.error("Configuration backup failed, registers not read: %s", snapshot.failed)
+        return {"error": "COMMUNICATION_ERROR", "failed": snapshot.failed}
+    backup = {
+        "format": BACKUP_FORMAT_VERSION,
+        "model": CONF_MODEL,
+        "firmware": pijups.fw_version,
+        "created": datetime.now(UTC).isoformat(),
+        "registers": {
+            reg["name"]: bytes(snapshot.registers[reg["cmd"]]).hex()
+            for reg in BACKUP_REGISTERS
+        },
+        "config": decode_backup_config(snapshot),
+    }
+    with open(file_name, "w", encoding="utf-8") as file:
+        json.dump(backup, file, indent=1)
+    _LOGGER.debug("backup_config saved to %s: %s", file_name, backup)
+    return {"error": "NO_ERROR"}
+
+
+def restore_config(pijups: PiJups, file_name):
+    """Restore HAT configuration from backup file, only registers that differ from device are written."""
+    with open(file_name, encoding="utf-8") as file:
+        backup = json.load(file)
+    if backup.get("format") != BACKUP_FORMAT_VERSION or backup.get("model") != CONF_MODEL:
+        _LOGGER.error("Unsupported configuration backup file %s", file_name)
+        return {"error": "BAD_ARGUMENT"}
+    saved = {}
+    for reg in BACKUP_REGISTERS:
+        raw = backup.get("registers", {}).get(reg["name"])
+        if raw is not None and len(bytes.fromhex(raw)) == reg["length"]:
+            saved[reg["cmd"]] = list(bytes.fromhex(raw))
+
+    written = []
+    failed = []
+    with pijups.interface.bus_lock:
+        snapshot = read_register_snapshot(pijups.interface, None, BACKUP_REGISTERS)
+        current = snapshot.registers
+        profile_id = saved.get(PiJuiceConfig.BATTERY_PROFILE_ID_CMD)
+        profile_selected = False
+        for reg in BACKUP_REGISTERS:
+            cmd = reg["cmd"]
+            data = saved.get(cmd)
+            if data is None or not reg.get("restore", True):
+                continue
+            if reg.get("custom_profile"):
+                if profile_id is None or not is_custom_profile(profile_id):
+                    continue  # profile data is fixed for predefined profiles
+                if not profile_selected and current.get(cmd) == data:
+                    continue
+            elif cmd == PiJuiceConfig.BATTERY_PROFILE_ID_CMD:
+                data = [profile_id_to_write(data)]
+                if cmd in current and profile_id_to_write(current[cmd]) == data[0]:
+                    continue
+                profile_selected = True  # custom profile data is written to newly selected profile
+            elif current.get(cmd) == data:
+                continue
+            if "verify" in reg:
+                ret = pijups.interface.WriteDataVerify(cmd, data, reg["verify"])
+                if (
+                    ret["error"] == "WRITE_FAILED"
+                    and reg.get("nv_mask")
+                    and not data[0] & reg["nv_mask"]
+                ):
+                    # volatile write matching EEPROM content is reported as failed, see SetChargingConfig
+                    ret["error"] = "NO_ERROR"
+            else:
+                ret = pijups.interface.WriteData(cmd, data)
+            (written if ret["error"] == "NO_ERROR" else failed).append(reg["name"])
+    result = {
+        "error": "NO_ERROR" if not failed and not snapshot.failed else "WRITE_FAILED",
+        "written": written,
+        "failed": failed + snapshot.failed,
+    }
+    _LOGGER.debug("restore_config from %s: %s", file_name, result)
+    return result
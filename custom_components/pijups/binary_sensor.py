@@ -0,0 +1,75 @@
+"""The PiJuPS HAT integration - binary sensor platform implementation."""
+
+import logging
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import BASE, DOMAIN, PIJU_FAULT_NAME
+from .interface import FAULT_NAMES, PiJups
+from .io_pins import PiJuiceIoPinEntity, async_get_io_pins
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = None  # value set in __init__.py async_setup_entry
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add entities for HAT faults and IO pins configured as digital inputs."""
+    pijups = hass.data[DOMAIN][config_entry.entry_id][BASE]
+    pins = await async_get_io_pins(hass, pijups, Platform.BINARY_SENSOR)
+    async_add_entities(
+        [PiJuiceFaultBinarySensor(hass, config_entry, fault) for fault in FAULT_NAMES]
+        + [PiJuiceIoBinarySensor(hass, config_entry, pin) for pin in pins],
+        True,
+    )
+    _LOGGER.debug("async_setup_entry binary sensors added for IO pins %s", pins)
+
+
+class PiJuiceFaultBinarySensor(BinarySensorEntity):
+    """PiJuice HAT fault, state comes from faults tracked with status polling (no extra reads)."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, hass: HomeAssistant, config: ConfigEntry, fault) -> None:
+        """Initialize the fault entity."""
+        self.hass = hass
+        self._pijups: PiJups = hass.data[DOMAIN][config.entry_id][BASE]
+        self._fault = fault
+        self._attr_name = PIJU_FAULT_NAME.format(fault=fault.replace("_", " "))
+        self._attr_has_entity_name = True
+        self._attr_unique_id = f"fault_{fault}"
+        self._attr_device_info: DeviceInfo = self._pijups.piju_device_info
+
+    def update(self) -> None:
+        """Update fault state, charging temperature fault reports its state as attribute."""
+        if not self._pijups.piju_enabled or self._pijups.get_piju_status() is None:
+            return
+        value = self._pijups.faults.get(self._fault)
+        self._attr_is_on = value is not None
+        if self._fault == "charging_temperature_fault":
+            self._attr_extra_state_attributes = {"state": value or "NORMAL"}
+
+
+class PiJuiceIoBinarySensor(PiJuiceIoPinEntity, BinarySensorEntity):
+    """PiJuice IO pin in digital input mode."""
+
+    _attr_icon = "mdi:electric-switch"
+
+    def update(self) -> None:
+        """Update pin state."""
+        value = self.read_pin("GetIoDigitalInput")
+        if value is not None:
+            self._attr_is_on = value == 1
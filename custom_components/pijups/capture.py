@@ -0,0 +1,187 @@
+"""The PiJuPS HAT integration - I2C traffic capture and replay.
+
+Capture file starts with header (magic, version, i2c address, start time) followed by records:
+time since previous record in us, cmd, flags (direction, error), byte count and transferred bytes.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+import logging
+import struct
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"PJCP"
+CAPTURE_VERSION = 1
+CAPTURE_HEADER = struct.Struct("<4sBBd")
+CAPTURE_RECORD = struct.Struct("<IBBB")
+CAPTURE_FLAG_WRITE = 0x01
+CAPTURE_FLAG_ERROR = 0x02
+CAPTURE_MAX_DELTA_US = 0xFFFFFFFF
+
+
+@dataclass
+class CaptureRecord:
+    """Single bus transaction, time is seconds since capture start."""
+
+    time: float
+    cmd: int
+    write: bool
+    error: bool
+    data: bytes
+
+
+class CaptureBus:
+    """SMBus wrapper writing every transaction to capture file, errors are re-raised to caller."""
+
+    def __init__(self, bus, address, file_name) -> None:
+        """Open capture file and write header."""
+        self.bus = bus
+        self.file_name = file_name
+        self.file = open(file_name, "wb")  # pylint: disable=consider-using-with
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.last = time.monotonic()
+        self.records = 0
+        self.file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, address, self.started))
+
+    def record(self, cmd, flags, data):
+        """Append record, transfers might finish in parallel when HAT read thread timed out."""
+        data = bytes(data or ())[:255]
+        with self.lock:
+            if self.file is None:
+                return
+            now = time.monotonic()
+            delta = min(int((now - self.last) * 1000000), CAPTURE_MAX_DELTA_US)
+            self.last = now
+            self.file.write(CAPTURE_RECORD.pack(delta, cmd, flags, len(data)) + data)
+            self.records += 1
+
+    def read_i2c_block_data(self, addr, cmd, length, force=None):
+        """Read from wrapped bus and record result."""
+        try:
+            data = self.bus.read_i2c_block_data(addr, cmd, length, force=force)
+        except Exception:
+            self.record(cmd, CAPTURE_FLAG_ERROR, None)
+            raise
+        self.record(cmd, 0, data)
+        return data
+
+    def write_i2c_block_data(self, addr, cmd, data, force=None):
+        """Record and write to wrapped bus."""
+        try:
+            self.bus.write_i2c_block_data(addr, cmd, data, force=force)
+        except Exception:
+            self.record(cmd, CAPTURE_FLAG_WRITE | CAPTURE_FLAG_ERROR, data)
+            raise
+        self.record(cmd, CAPTURE_FLAG_WRITE, data)
+
+    def close(self):
+        """Close capture file, returns capture statistics."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+        return {
+            "file": self.file_name,
+            "records": self.records,
+            "duration": round(time.time() - self.started, 3),
+        }
+
+
+def read_capture(file_name):
+    """Read capture file, returns i2c address, start time and record list."""
+    with open(file_name, "rb") as file:
+        content = file.read()
+    if len(content) < CAPTURE_HEADER.size:
+        raise ValueError("Capture header missing")
+    magic, version, address, started = CAPTURE_HEADER.unpack_from(content)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError(f"Unsupported capture format {magic!r} version {version}")
+    records = []
+    offset = CAPTURE_HEADER.size
+    elapsed = 0.0
+    while offset + CAPTURE_RECORD.size <= len(content):
+        delta, cmd, flags, length = CAPTURE_RECORD.unpack_from(content, offset)
+        offset += CAPTURE_RECORD.size
+        elapsed += delta / 1000000
+        records.append(
+            CaptureRecord(
+                elapsed,
+                cmd,
+                bool(flags & CAPTURE_FLAG_WRITE),
+                bool(flags & CAPTURE_FLAG_ERROR),
+                content[offset : offset + length],
+            )
+        )
+        offset += length
+    if offset != len(content):
+        _LOGGER.warning("Capture %s truncated at byte %d", file_name, offset)
+    return address, started, records
+
+
+class ReplayBus:
+    """SMBus replacement serving captured reads back.
+
+    Reads of each cmd are served in captured order regardless of order of other commands, so replay
+    is deterministic even if caller polls differently; last good read of cmd is repeated when its
+    records run out. Captured errors are raised as IOError, commands never read or other addresses
+    behave as missing device. Writes are accepted. Speed scales captured timing, None - no delays.
+    """
+
+    def __init__(self, address, records, speed=None) -> None:
+        """Split records into per cmd read queues."""
+        self.address = address
+        self.speed = speed
+        self.reads = {}
+        self.last_data = {}
+        self.writes = []
+        for record in records:
+            if not record.write:
+                self.reads.setdefault(record.cmd, deque()).append(record)
+        self.replay_started = None
+        self.served = 0
+
+    @classmethod
+    def from_file(cls, file_name, speed=None):
+        """Create replay bus from capture file."""
+        address, _, records = read_capture(file_name)
+        return cls(address, records, speed)
+
+    def pace(self, record_time):
+        """Wait until captured time (scaled by speed) passes since replay start."""
+        if self.speed is None:
+            return
+        now = time.monotonic()
+        if self.replay_started is None:
+            self.replay_started = now - record_time / self.speed
+        delay = self.replay_started + record_time / self.speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def read_i2c_block_data(self, addr, cmd, length, force=None):
+        """Serve next captured read of cmd."""
+        if addr != self.address:
+            raise OSError(121, "Remote I/O error")
+        queue = self.reads.get(cmd)
+        if queue:
+            record = queue.popleft()
+            self.pace(record.time)
+            self.served += 1
+            if record.error:
+                raise OSError(121, "Remote I/O error")
+            self.last_data[cmd] = list(record.data)
+        if cmd not in self.last_data:
+            raise OSError(121, "Remote I/O error")
+        data = self.last_data[cmd]
+        return data[:length] + [0] * (length - len(data))
+
+    def write_i2c_block_data(self, addr, cmd, data, force=None):
+        """Accept write, written data are kept for inspection."""
+        if addr != self.address:
+            raise OSError(121, "Remote I/O error")
+        self.writes.append((cmd, list(data)))
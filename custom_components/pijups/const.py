@@ -14,6 +14,10 @@ CONF_FIRMWARE_SELECTION = "fw_upgrade_config"
 CONF_FW_UPGRADE_PATH = "fw_upgrade_path"
 CONF_BUS_OPTIONS = "bus_options"
 CONF_ADDRESS_OPTIONS = "address_options"
+CONF_TELEMETRY_SOCKET = "telemetry_socket"
+CONF_METRICS = "metrics"
+CONF_LOOP_BLOCK_THRESHOLD = "loop_block_threshold"
+CONF_WATCHDOG_PERIOD = "watchdog_period"
 
 CONF_I2C_BUSES_TO_SEARCH = (1, 2)
 CONF_I2C_ADDRESSES_TO_SEARCH = range(0, 0xFF)
@@ -33,6 +37,11 @@ DEFAULT_BATTERY_TEMP_SENSE = "AUTO_DETECT"
 DEFAULT_SCAN_INTERVAL = 5
 DEFAULT_SLOW_SCAN_COUNT = 6
 DEFAULT_FAST_SCAN_COUNT = 1
+DEFAULT_OPTION_SNAPSHOT_TTL = 60
+DEFAULT_RTC_DRIFT_THRESHOLD = 2.0
+DEFAULT_RTC_SYNC_INTERVAL = 21600
+WATCHDOG_CHECKS_PER_PERIOD = 4
+WATCHDOG_MAX_PERIOD = 1440
 
 DEFAULT_FIRMWARE_PATH = "/config/custom_components"
 DEFAULT_NO_FIRMWARE_UPGRADE = "No firmware upgrade"
@@ -54,5 +63,39 @@ PIJU_SENSOR_POWER_INPUT_IO_STATUS = "Power input IO status"
 PIJU_SENSOR_IO_VOLTAGE = "IO voltage"
 PIJU_SENSOR_IO_CURRENT = "IO current"
 PIJU_SENSOR_EXTERNAL_POWER = "External Power"
+PIJU_SENSOR_BATTERY_POWER = "Battery power"
+PIJU_SENSOR_DISCHARGE_CURRENT = "Discharge current"
+PIJU_SENSOR_TIME_TO_EMPTY = "Time to empty"
+PIJU_SENSOR_TIME_TO_FULL = "Time to full"
+PIJU_IO_PIN_NAME = "IO{pin}"
+PIJU_FAULT_NAME = "Fault {fault}"
 
 SENSOR_ENTITY = "sensor.entity"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_FILE = "file"
+SERVICE_BACKUP_CONFIG = "backup_config"
+SERVICE_RESTORE_CONFIG = "restore_config"
+ATTR_AT = "at"
+ATTR_CRON = "cron"
+ATTR_ENABLE = "enable"
+SERVICE_SCHEDULE_WAKEUP = "schedule_wakeup"
+ATTR_RATE = "rate"
+ATTR_DURATION = "duration"
+SERVICE_SAMPLE_BATTERY = "sample_battery"
+ATTR_SAVE_LAST = "save_last"
+DEFAULT_SAMPLER_RATE = 20
+DEFAULT_SAMPLER_DURATION = 60
+DEFAULT_SAMPLER_FILE = "pijuice_samples_{time}.csv"
+SAMPLER_MAX_RATE = 50
+SAMPLER_MAX_DURATION = 600
+SERVICE_CAPTURE_I2C = "capture_i2c"
+DEFAULT_CAPTURE_DURATION = 60
+DEFAULT_CAPTURE_FILE = "pijuice_i2c_{time}.cap"
+SERVICE_PROFILE = "profile"
+ATTR_CYCLES = "cycles"
+DEFAULT_PROFILER_DURATION = 30
+DEFAULT_PROFILER_FILE = "pijups_profile_{time}.txt"
+PROFILER_MAX_DURATION = 600
+SERVICE_CLEAR_FAULTS = "clear_faults"
+EVENT_PIJUPS_FAULT = "pijups_fault"
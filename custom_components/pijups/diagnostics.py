@@ -1,5 +1,6 @@
 """The PiJuPS HAT integration - handle diagnostics."""
 import logging
+import time
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
@@ -7,11 +8,15 @@ from homeassistant.const import CONF_SCAN_INTERVAL
 from homeassistant.core import HomeAssistant
 
 from .const import BASE, CONF_I2C_ADDRESS, CONF_I2C_BUS, DOMAIN
-from .sensor import PiJups
+from .interface import PiJups
+from .loopwatch import watch_loop
 
 _LOGGER = logging.getLogger(__name__)
 
+decode_snapshot = PiJups.decode_snapshot
 
+
+@watch_loop
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: ConfigEntry
 ) -> dict[str, Any]:
@@ -24,73 +29,52 @@ def get_config_entry_diagnostics(
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry in sync mode."""
     pijups: PiJups = hass.data[DOMAIN][entry.entry_id][BASE]
+    started = time.monotonic()
+    snapshot = pijups.get_register_snapshot()
+    timing = {section: round(t * 1000, 1) for section, t in snapshot.timing.items()}
     info: dict = {
         CONF_I2C_BUS: pijups.i2c_bus,
         CONF_I2C_ADDRESS: f"0x{pijups.i2c_address:02x}",
-        "HAT EEPROM address": pijups.call_pijuice_with_error_check(
-            pijups.config.GetIdEepromAddress
-        ),
+        "HAT EEPROM address": decode_snapshot(snapshot.config.GetIdEepromAddress),
         "HAT Firmware version": pijups.fw_version,
         "Sensor scan interval": entry.data.get(CONF_SCAN_INTERVAL),
+        "Startup timing, ms": pijups.startup_timing,
+        "RTC synchronisation": pijups.rtc_sync.get_diagnostics(),
+        "IO pins": pijups.io_config,
+        "Runtime estimate": pijups.estimator.get_diagnostics(),
     }
-    status = pijups.call_pijuice_with_error_check(pijups.status.GetStatus)
+    status = decode_snapshot(snapshot.status.GetStatus)
     info["Device status"] = status
-    if status.get("isFault"):
-        faults = pijups.call_pijuice_with_error_check(pijups.status.GetFaultStatus)
-        info["Reported faults"] = faults
-    if status.get("isButton"):
-        buttons = pijups.call_pijuice_with_error_check(pijups.status.GetButtonEvents)
-        info["Reported button events"] = buttons
+    if status is not None and status.get("isFault"):
+        info["Reported faults"] = decode_snapshot(snapshot.status.GetFaultStatus)
+    if status is not None and status.get("isButton"):
+        info["Reported button events"] = decode_snapshot(snapshot.status.GetButtonEvents)
     if pijups.fw_version < "1.6":
         info["Circular log"] = "Not available prior firmware version 1.6"
     else:
+        section_started = time.monotonic()
         info["Circular log settings"] = pijups.get_diag_log_config()
+        timing["circular log settings"] = round((time.monotonic() - section_started) * 1000, 1)
+        section_started = time.monotonic()
         info["Circular log contents"] = pijups.get_diag_log().get("data", [])
-    profile_status = pijups.call_pijuice_with_error_check(
-        pijups.config.GetBatteryProfileStatus, error_log_level=logging.INFO
-    )
-    info["HAT profile status"] = profile_status
-    data = pijups.call_pijuice_with_error_check(
-        pijups.config.GetBatteryProfile, error_log_level=logging.INFO
-    )
-    info["HAT battery profile"] = data
-    data = pijups.call_pijuice_with_error_check(
-        pijups.config.GetBatteryExtProfile, error_log_level=logging.INFO
-    )
-    info["HAT battery ext profile"] = data
+        timing["circular log"] = round((time.monotonic() - section_started) * 1000, 1)
+    info["HAT profile status"] = decode_snapshot(snapshot.config.GetBatteryProfileStatus)
+    info["HAT battery profile"] = decode_snapshot(snapshot.config.GetBatteryProfile)
+    info["HAT battery ext profile"] = decode_snapshot(snapshot.config.GetBatteryExtProfile)
     # power input configuration
-    data = pijups.call_pijuice_with_error_check(
-        pijups.config.GetPowerInputsConfig, error_log_level=logging.INFO
-    )
-    info["HAT power inputs"] = data
-    data = pijups.call_pijuice_with_error_check(pijups.config.GetPowerRegulatorMode)
-    info["HAT power regulator mode"] = data
-    data = pijups.call_pijuice_with_error_check(pijups.config.GetRunPinConfig)
-    info["HAT run pin configuration"] = data
-    data = pijups.call_pijuice_with_error_check(
-        pijups.config.GetButtonConfiguration, "SW1"
-    )
-    info["SW1 button configuration"] = data
-    data = pijups.call_pijuice_with_error_check(
-        pijups.config.GetButtonConfiguration, "SW2"
-    )
-    info["SW2 button configuration"] = data
-    data = pijups.call_pijuice_with_error_check(
-        pijups.config.GetButtonConfiguration, "SW3"
-    )
-    info["SW3 button configuration"] = data
-
-    data = pijups.call_pijuice_with_error_check(
-        pijups.power.GetPowerOff, error_log_level=logging.INFO
-    )
-    info["PowerOff configuration"] = data
-    data = pijups.call_pijuice_with_error_check(
-        pijups.power.GetWakeUpOnCharge, error_log_level=logging.INFO
-    )
-    info["WakeUpOnCharge configuration"] = data
-    data = pijups.call_pijuice_with_error_check(
-        pijups.power.GetSystemPowerSwitch, error_log_level=logging.INFO
-    )
-    info["SystemPowerSwitch configuration"] = data
+    info["HAT power inputs"] = decode_snapshot(snapshot.config.GetPowerInputsConfig)
+    info["HAT power regulator mode"] = decode_snapshot(snapshot.config.GetPowerRegulatorMode)
+    info["HAT run pin configuration"] = decode_snapshot(snapshot.config.GetRunPinConfig)
+    for button in ("SW1", "SW2", "SW3"):
+        info[f"{button} button configuration"] = decode_snapshot(
+            snapshot.config.GetButtonConfiguration, button
+        )
+    info["PowerOff configuration"] = decode_snapshot(snapshot.power.GetPowerOff)
+    info["WakeUpOnCharge configuration"] = decode_snapshot(snapshot.power.GetWakeUpOnCharge)
+    info["SystemPowerSwitch configuration"] = decode_snapshot(snapshot.power.GetSystemPowerSwitch)
+    if snapshot.failed:
+        info["Unavailable registers"] = snapshot.failed
+    timing["total"] = round((time.monotonic() - started) * 1000, 1)
+    info["Timing, ms"] = timing
     _LOGGER.debug("get_config_entry_diagnostics %s", info)
     return info
@@ -0,0 +1,79 @@
+"""The PiJuPS HAT integration - battery runtime estimation from telemetry samples."""
+
+from __future__ import annotations
+
+import math
+
+# smoothing time constant for battery current, seconds
+ESTIMATOR_TIME_CONSTANT = 300.0
+# smoothed current below this (mA, either direction) is treated as idle: no time to empty/full estimate
+ESTIMATOR_MIN_CURRENT = 5.0
+
+
+class RuntimeEstimator:
+    """Battery power, smoothed current and time to empty/full, updated in O(1) per telemetry sample.
+
+    Battery current is positive on discharge and negative on charge, as reported by HAT. Current
+    is smoothed by exponentially weighted moving average with weight depending on time between
+    samples, so irregular sampling does not skew the estimate.
+    """
+
+    def __init__(self, time_constant=ESTIMATOR_TIME_CONSTANT, min_current=ESTIMATOR_MIN_CURRENT) -> None:
+        """Initialize estimator state."""
+        self.time_constant = time_constant
+        self.min_current = min_current
+        self.capacity = None  # mAh, from battery profile
+        self.voltage = None
+        self.charge = None
+        self.power = None  # W
+        self.current = None  # smoothed, mA
+        self.sampled_at = None
+        self.samples = 0
+
+    def update(self, timestamp, voltage, current, charge=None):
+        """Add telemetry sample: timestamp in seconds, battery voltage in mV, current in mA, charge level in %."""
+        self.voltage = voltage
+        self.power = round(voltage * current / 1000000, 3)
+        if self.current is None or self.sampled_at is None or timestamp <= self.sampled_at:
+            self.current = float(current)
+        else:
+            alpha = 1.0 - math.exp((self.sampled_at - timestamp) / self.time_constant)
+            self.current += alpha * (current - self.current)
+        if charge is not None:
+            self.charge = charge
+        self.sampled_at = timestamp
+        self.samples += 1
+
+    @property
+    def discharge_current(self):
+        """Smoothed battery current, mA."""
+        return None if self.current is None else round(self.current, 1)
+
+    @property
+    def time_to_empty(self):
+        """Minutes left until battery is empty at smoothed discharge current."""
+        if self.capacity is None or self.charge is None or self.current is None:
+            return None
+        if self.current < self.min_current:
+            return None
+        return round(self.charge * self.capacity * 60 / (100 * self.current))
+
+    @property
+    def time_to_full(self):
+        """Minutes left until battery is full at smoothed charge current."""
+        if self.capacity is None or self.charge is None or self.current is None:
+            return None
+        if self.current > -self.min_current:
+            return None
+        return round((100 - self.charge) * self.capacity * 60 / (100 * -self.current))
+
+    def get_diagnostics(self):
+        """Return estimator state for diagnostics."""
+        return {
+            "samples": self.samples,
+            "capacity, mAh": self.capacity,
+            "power, W": self.power,
+            "discharge current, mA": self.discharge_current,
+            "time to empty, min": self.time_to_empty,
+            "time to full, min": self.time_to_full,
+        }
@@ -0,0 +1,104 @@
+"""The PiJuPS HAT integration - telemetry fan-out to local processes over Unix domain socket."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import stat
+
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+FANOUT_MAX_CLIENTS = 16
+# client is dropped if it does not read and this many bytes are queued for it
+FANOUT_MAX_BUFFER = 65536
+FANOUT_SNAPSHOT_REQUEST = b"snapshot"
+FANOUT_SOCKET_MODE = 0o660
+
+
+class TelemetryPublisher:
+    """Publish telemetry frames as JSON lines to connected clients, 'snapshot' request line is answered with last frame.
+
+    Frames are encoded once per telemetry burst and written without waiting for clients, so slow
+    or stuck consumers never delay HAT polling.
+    """
+
+    def __init__(self, path) -> None:
+        """Initialize publisher, socket is created by async_start."""
+        self.path = path
+        self.server = None
+        self.clients = set()
+        self.frame = None
+        self.published = 0
+        self.dropped = 0
+
+    async def async_start(self):
+        """Create socket and start accepting clients, stale socket file is replaced."""
+        try:
+            if stat.S_ISSOCK(os.stat(self.path).st_mode):
+                os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self.server = await asyncio.start_unix_server(self.handle_client, path=self.path)
+        os.chmod(self.path, FANOUT_SOCKET_MODE)
+        _LOGGER.debug("Telemetry fan-out listening on %s", self.path)
+
+    async def async_stop(self):
+        """Disconnect clients and remove socket."""
+        if self.server is None:
+            return
+        self.server.close()
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+        await self.server.wait_closed()
+        self.server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        _LOGGER.debug("Telemetry fan-out on %s stopped", self.path)
+
+    async def handle_client(self, reader, writer):
+        """Serve client until it disconnects: register for frames and answer snapshot requests."""
+        if len(self.clients) >= FANOUT_MAX_CLIENTS:
+            _LOGGER.warning("Telemetry fan-out client limit %s reached", FANOUT_MAX_CLIENTS)
+            writer.close()
+            return
+        self.clients.add(writer)
+        try:
+            while line := await reader.readline():
+                if line.strip() == FANOUT_SNAPSHOT_REQUEST:
+                    self.send(writer, self.frame or b"{}\n")
+        except ConnectionError:
+            pass
+        except (ValueError, asyncio.LimitOverrunError):
+            _LOGGER.warning("Telemetry fan-out client sent too long line, dropped")
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def send(self, writer, frame):
+        """Queue frame to client without waiting, client not keeping up is dropped."""
+        transport = writer.transport
+        if transport.is_closing():
+            self.clients.discard(writer)
+            return
+        if transport.get_write_buffer_size() > FANOUT_MAX_BUFFER:
+            _LOGGER.warning("Telemetry fan-out client is not reading, dropped")
+            self.dropped += 1
+            self.clients.discard(writer)
+            writer.close()
+            return
+        writer.write(frame)
+
+    @callback
+    def publish(self, frame):
+        """Encode frame once and send it to all clients."""
+        self.frame = (json.dumps(frame, default=str) + "\n").encode()
+        self.published += 1
+        for writer in list(self.clients):
+            self.send(writer, self.frame)
@@ -0,0 +1,104 @@
+"""The PiJuPS HAT integration - firmware image catalogue."""
+
+import hashlib
+import logging
+import os
+import re
+
+from .const import DEFAULT_FW_FILE_NAME, DEFAULT_FW_UTILITY_NAME
+
+_LOGGER = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 16
+
+
+def parse_version(version: str):
+    """Convert version string like '1.6' to sortable tuple, empty tuple if not parsable."""
+    try:
+        return tuple(int(v) for v in version.split("."))
+    except (AttributeError, ValueError):
+        return ()
+
+
+def file_sha256(file_path):
+    """Calculate file SHA-256 reading file in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FirmwareCatalogue:
+    """Firmware images found in directory, re-scanned only if directory or file modification time changes."""
+
+    def __init__(self) -> None:
+        """Initialize empty catalogue."""
+        self.path = None
+        self.dir_mtime = None
+        self.utility_found = False
+        self.images = {}
+        self.fw_bin_pat = re.compile("^" + DEFAULT_FW_FILE_NAME + "$")
+
+    def refresh(self, path):
+        """Re-scan directory if changed since last scan, hash only new or modified images."""
+        try:
+            dir_mtime = os.stat(path).st_mtime_ns
+        except OSError as error:
+            _LOGGER.warning("Firmware directory %s not accessible: %s", path, error)
+            self.path, self.dir_mtime, self.utility_found, self.images = path, None, False, {}
+            return self.images
+        if path == self.path and dir_mtime == self.dir_mtime:
+            # file content might be replaced without directory change, check known images only
+            for name in list(self.images):
+                self._update_image(path, name)
+            return self.images
+        if path != self.path:
+            self.images = {}
+        self.path = path
+        self.dir_mtime = dir_mtime
+        files = os.listdir(path)
+        self.utility_found = DEFAULT_FW_UTILITY_NAME in files
+        for name in list(self.images):
+            if name not in files:
+                del self.images[name]
+        for name in files:
+            if self.fw_bin_pat.match(name):
+                self._update_image(path, name)
+        _LOGGER.debug("FirmwareCatalogue refreshed %s: %s", path, self.images)
+        return self.images
+
+    def _update_image(self, path, name):
+        """Add/update image description, hash is kept while size and modification time are unchanged."""
+        file_path = os.path.join(path, name)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.images.pop(name, None)
+            return
+        image = self.images.get(name)
+        if (
+            image is not None
+            and image["size"] == stat.st_size
+            and image["mtime"] == stat.st_mtime_ns
+        ):
+            return
+        match = self.fw_bin_pat.match(name)
+        self.images[name] = {
+            "version": (int(match.group(1)), int(match.group(2))),
+            "date": match.group(3),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha256": file_sha256(file_path),
+        }
+
+    def get_upgrades(self, installed_version):
+        """Get images not older than installed version, newest first, with 'newer' flag set."""
+        installed = parse_version(installed_version)
+        upgrades = {}
+        for name, image in sorted(
+            self.images.items(), key=lambda item: (item[1]["version"], item[1]["date"]), reverse=True
+        ):
+            if image["version"] >= installed:
+                upgrades[name] = {**image, "newer": image["version"] > installed}
+        return upgrades
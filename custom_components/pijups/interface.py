@@ -4,7 +4,7 @@ from datetime import datetime
 from datetime import UTC
 import logging
 import os
-import re
+import threading
 import time
 
 from homeassistant.components import persistent_notification
@@ -28,21 +28,64 @@ from .const import (
     CONF_I2C_BUSES_TO_SEARCH,
     CONF_MANUFACTURER,
     CONF_MODEL,
-    DEFAULT_FW_UTILITY_NAME,
-    DEFAULT_FW_FILE_NAME,
+    CONF_WATCHDOG_PERIOD,
     DEFAULT_NAME,
     DEFAULT_NO_FIRMWARE_UPGRADE,
+    DEFAULT_OPTION_SNAPSHOT_TTL,
+    DEFAULT_SLOW_SCAN_COUNT,
     DOMAIN,
+    EVENT_PIJUPS_FAULT,
     MAX_WAKEON_DELTA,
 )
+from .estimator import RuntimeEstimator
 from .pijuice import PiJuice, PiJuiceConfig, PiJuiceStatus
-from .pijuice_log import LOG_ENABLE_LIST, LOGGING_CMD, GetPiJuiceLog
+from .registers import RegisterCache, RegisterSnapshot, read_register_snapshot
+from .rtc import RtcSync
+from .stats import RollingWindow
 
 bat_status_enum = PiJuiceStatus.batStatusEnum
 power_in_status_enum = PiJuiceStatus.powerInStatusEnum
 
 _LOGGER = logging.getLogger(__name__)
 
+# HAT readiness polling: doubling back-off between GetAddress probes until deadline
+STARTUP_POLL_MIN_DELAY = 0.005
+STARTUP_POLL_MAX_DELAY = 0.05
+STARTUP_READY_DEADLINE = 2.0
+SECTION_STARTUP = "startup"
+# independent initial reads done in one burst once HAT responds
+STARTUP_REGISTERS = [
+    {"name": "firmware", "cmd": PiJuiceConfig.FIRMWARE_VERSION_CMD, "length": 2, "section": SECTION_STARTUP},
+    {"name": "status", "cmd": PiJuiceStatus.STATUS_CMD, "length": 1, "section": SECTION_STARTUP},
+]
+SECTION_TELEMETRY = "telemetry"
+# sensor values read in one burst per scan interval, "slow" ones every DEFAULT_SLOW_SCAN_COUNT scans
+TELEMETRY_REGISTERS = [
+    {"name": "status", "cmd": PiJuiceStatus.STATUS_CMD, "length": 1, "section": SECTION_TELEMETRY},
+    {"name": "charge", "cmd": PiJuiceStatus.CHARGE_LEVEL_CMD, "length": 1, "section": SECTION_TELEMETRY, "slow": True},
+    {"name": "temperature", "cmd": PiJuiceStatus.BATTERY_TEMPERATURE_CMD, "length": 2, "section": SECTION_TELEMETRY, "slow": True},
+    {"name": "battery_voltage", "cmd": PiJuiceStatus.BATTERY_VOLTAGE_CMD, "length": 2, "section": SECTION_TELEMETRY, "slow": True},
+    {"name": "battery_current", "cmd": PiJuiceStatus.BATTERY_CURRENT_CMD, "length": 2, "section": SECTION_TELEMETRY, "slow": True},
+    {"name": "io_voltage", "cmd": PiJuiceStatus.IO_VOLTAGE_CMD, "length": 2, "section": SECTION_TELEMETRY, "slow": True},
+    {"name": "io_current", "cmd": PiJuiceStatus.IO_CURRENT_CMD, "length": 2, "section": SECTION_TELEMETRY, "slow": True},
+]
+IO_PINS = (1, 2)
+HEALTH_OK = "ok"
+HEALTH_FAULT = "fault"
+HEALTH_UNAVAILABLE = "unavailable"
+HEALTH_STATES = (HEALTH_OK, HEALTH_FAULT, HEALTH_UNAVAILABLE)
+# latched fault events (cleared by ResetFaultFlags) followed by fault conditions
+FAULT_NAMES = PiJuiceStatus.faultEvents + PiJuiceStatus.faults
+# telemetry values (name: PiJuiceStatus getter) with rolling window statistics
+STATS_CHANNELS = {
+    "charge": "GetChargeLevel",
+    "temperature": "GetBatteryTemperature",
+    "battery_voltage": "GetBatteryVoltage",
+    "battery_current": "GetBatteryCurrent",
+    "io_voltage": "GetIoVoltage",
+    "io_current": "GetIoCurrent",
+}
+
 
 class PiJups:
     """PiJuice interface handling class."""
@@ -65,6 +108,34 @@ class PiJups:
         self.piju_enabled = True
         self.piju_status = None
         self.piju_status_read_at = None
+        self.fault_flag = None
+        self.faults = {}
+        self.faults_read_at = None
+        self.watchdog_period = 0
+        self.watchdog_kicked_at = None
+        self.register_cache = None
+        self.option_snapshot = None
+        self.option_snapshot_read_at = None
+        self.fw_catalogue = None
+        self.startup_timing = {}
+        self.rtc_sync = None
+        self.telemetry = None
+        self.telemetry_registers = TELEMETRY_REGISTERS
+        self.telemetry_slow_read_at = None
+        self.status_lock = threading.Lock()
+        self.status_reads = 0
+        self.io_config = None
+        self.sampler = None
+        self.sampler_stats = None
+        self.sampler_unsaved = None
+        self.tool_lock = threading.Lock()
+        self.capture = None
+        self.profiler = None
+        self.estimator = RuntimeEstimator()
+        self.battery_capacity_known = False
+        self.telemetry_stats = {channel: RollingWindow() for channel in STATS_CHANNELS.values()}
+        self.telemetry_values = {}
+        self.publisher = None
         _LOGGER.debug(
             "Initializing PiJups unique_id=%s i2c_bus=%d i2c_address=0x%x",
             entry.unique_id,
@@ -80,25 +151,19 @@ class PiJups:
         self.config = self.pijups.config
         self.power = self.pijups.power
         self.rtcalarm = self.pijups.rtcAlarm
-        sleep_time = 0.05
-        time.sleep(sleep_time)
-        # check configured i2c address and one recognized by PiJuice API
-        for _tr in (1, 2, 3, 4, 5):
-            hex_addr = self.call_pijuice_with_error_check(
-                self.pijups.config.GetAddress, self.i2c_bus
-            )
-            if hex_addr is not None:
-                hex_addr = int(hex_addr, 16)
-                break
-            sleep_time = sleep_time * 2
-            time.sleep(sleep_time)
+        self.register_cache = RegisterCache(self.interface)
+        self.rtc_sync = RtcSync(self.interface)
+        self.interface.write_listeners.append(self.check_option_snapshot_write)
+        self.interface.write_listeners.append(self.check_telemetry_write)
+        self.interface.write_listeners.append(self.check_battery_profile_write)
+        started = time.monotonic()
+        hex_addr = self.wait_until_ready()
+        self.record_startup_phase("address", started)
 
         if self.i2c_address == hex_addr:
-            fw_version = self.call_pijuice_with_error_check(
-                self.pijups.config.GetFirmwareVersion
-            )
-            if fw_version is not None:
-                self.fw_version = fw_version.get("version")
+            started = time.monotonic()
+            self.read_startup_registers()
+            self.record_startup_phase("initial reads", started)
             if self.fw_version is None or self.fw_version < "1.0":
                 _LOGGER.critical(
                     "%s firmware version must be 1.0 or higher, but got %s, exiting",
@@ -122,31 +187,229 @@ class PiJups:
             manufacturer=CONF_MANUFACTURER,
             model=CONF_MODEL,
         )
+        started = time.monotonic()
         self.set_led_in_transition()
-        self.get_piju_status(True)
+        self.record_startup_phase("led", started)
 
         return True
 
-    def get_piju_status(self, force_update=False):
-        """Get cached HAT status, use scan interval as caching time parameter."""
-        time_now = datetime.now(UTC)
-        if force_update or (
-            time_now - self.piju_status_read_at
-        ).total_seconds() * 1.1 > self.config_entry.options.get(CONF_SCAN_INTERVAL):
-            status = self.call_pijuice_with_error_check(self.status.GetStatus)
-            if status is not None:
-                self.powered = (
-                    status.get("powerInput") == PiJuiceStatus.powerInStatusEnum[3]
-                    or status.get("powerInput5vIo")
-                    == PiJuiceStatus.powerInStatusEnum[3]
+    def record_startup_phase(self, phase, started):
+        """Store startup phase duration in ms for diagnostics."""
+        self.startup_timing[phase] = round((time.monotonic() - started) * 1000, 1)
+
+    def wait_until_ready(self):
+        """Poll HAT for i2c address with short doubling back-off, returns address read or None on deadline."""
+        deadline = time.monotonic() + STARTUP_READY_DEADLINE
+        delay = STARTUP_POLL_MIN_DELAY
+        polls = 0
+        while True:
+            polls += 1
+            ret = self.config.GetAddress(self.i2c_bus)
+            if ret["error"] == "NO_ERROR":
+                _LOGGER.debug("HAT ready after %d polls", polls)
+                return int(ret["data"], 16)
+            if time.monotonic() + delay > deadline:
+                _LOGGER.warning(
+                    "HAT not ready after %d polls: %s", polls, ret["error"]
                 )
-                self.piju_status = status
-                self.piju_status_read_at = time_now
-                self.process_buttons()
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, STARTUP_POLL_MAX_DELAY)
+
+    def read_startup_registers(self):
+        """Read firmware version and status in one burst, fall back to retrying calls for registers not read."""
+        snapshot = read_register_snapshot(self.interface, None, STARTUP_REGISTERS)
+        fw_version = self.decode_snapshot(snapshot.config.GetFirmwareVersion)
+        if fw_version is None:
+            fw_version = self.call_pijuice_with_error_check(
+                self.pijups.config.GetFirmwareVersion
+            )
+        if fw_version is not None:
+            self.fw_version = fw_version.get("version")
+        status = self.decode_snapshot(snapshot.status.GetStatus)
+        if status is None:
+            self.get_piju_status(True)
         else:
-            status = self.piju_status
+            self.update_piju_status(status, datetime.now(UTC))
+
+    def get_piju_status(self, force_update=False):
+        """Get cached HAT status, use scan interval as caching time parameter; status is read with telemetry burst.
+
+        Entities of all platforms update in parallel, burst is done under status lock and skipped if other
+        thread completed one while this one waited, so there is single burst per poll.
+        """
+        reads = self.status_reads
+        if not force_update and not self.is_status_stale(datetime.now(UTC)):
+            return self.piju_status
+        with self.status_lock:
+            if self.status_reads != reads:
+                return self.piju_status
+            time_now = datetime.now(UTC)
+            self.read_telemetry(time_now, force_update)
+            status = self.decode_snapshot(self.telemetry.status.GetStatus)
+            if status is None:
+                status = self.call_pijuice_with_error_check(self.status.GetStatus)
+            if status is not None:
+                self.update_piju_status(status, time_now)
+            self.status_reads += 1
+        if status is not None:
+            self.publish_telemetry()
         return status
 
+    def is_status_stale(self, time_now):
+        """Check if cached status is older than scan interval."""
+        return (
+            self.piju_status_read_at is None
+            or (time_now - self.piju_status_read_at).total_seconds() * 1.1
+            > self.config_entry.options.get(CONF_SCAN_INTERVAL)
+        )
+
+    def read_telemetry(self, time_now, read_all=False):
+        """Read telemetry registers in one burst, slow changing ones only if due; registers not read are dropped."""
+        scan_interval = self.config_entry.options.get(CONF_SCAN_INTERVAL)
+        read_slow = (
+            read_all
+            or self.telemetry_slow_read_at is None
+            or (time_now - self.telemetry_slow_read_at).total_seconds() * 1.1
+            > scan_interval * DEFAULT_SLOW_SCAN_COUNT
+        )
+        registers = [reg for reg in self.telemetry_registers if read_slow or not reg.get("slow")]
+        snapshot = read_register_snapshot(self.interface, None, registers)
+        data = dict(self.telemetry.registers) if self.telemetry is not None else {}
+        for reg in registers:
+            data.pop(reg["cmd"], None)
+        data.update(snapshot.registers)
+        self.telemetry = RegisterSnapshot(data, snapshot.timing, snapshot.failed)
+        if read_slow:
+            self.telemetry_slow_read_at = time_now
+            self.update_telemetry_statistics(time_now)
+
+    def update_telemetry_statistics(self, time_now):
+        """Feed rolling windows and runtime estimator with values from telemetry burst, no additional reads."""
+        values = {}
+        for name, channel in STATS_CHANNELS.items():
+            value = self.decode_snapshot(getattr(self.telemetry.status, channel))
+            if value is not None:
+                self.telemetry_stats[channel].append(value)
+            values[name] = value
+        self.telemetry_values = values
+        voltage = values["battery_voltage"]
+        current = values["battery_current"]
+        if voltage is not None and current is not None:
+            self.estimator.update(time_now.timestamp(), voltage, current, values["charge"])
+
+    def get_telemetry_frame(self):
+        """Compose telemetry frame for fan-out clients from values already decoded, no reads."""
+        return {
+            "time": self.piju_status_read_at.isoformat(),
+            "status": self.piju_status,
+            "powered": self.powered,
+            "values": self.telemetry_values,
+            "estimate": {
+                "power": self.estimator.power,
+                "discharge_current": self.estimator.discharge_current,
+                "time_to_empty": self.estimator.time_to_empty,
+                "time_to_full": self.estimator.time_to_full,
+            },
+        }
+
+    def publish_telemetry(self):
+        """Hand telemetry frame to fan-out publisher running in event loop."""
+        if self.publisher is not None:
+            self.hass.loop.call_soon_threadsafe(
+                self.publisher.publish, self.get_telemetry_frame()
+            )
+
+    def get_health(self):
+        """Get HAT health state from cached status: unavailable if disabled or not read, fault if HAT reports faults."""
+        if not self.piju_enabled or self.piju_status is None:
+            return HEALTH_UNAVAILABLE
+        if self.piju_status.get("isFault"):
+            return HEALTH_FAULT
+        return HEALTH_OK
+
+    def get_telemetry_statistics(self, channel):
+        """Get rolling window min/max/mean/stddev for telemetry channel."""
+        return self.telemetry_stats[channel].get_statistics()
+
+    def get_estimate(self, name):
+        """Get runtime estimator value, estimator is fed by telemetry burst when slow registers are due."""
+        if not self.battery_capacity_known:
+            self.get_battery_capacity()
+        self.get_piju_status(self.telemetry is None)
+        return getattr(self.estimator, name)
+
+    def get_battery_capacity(self):
+        """Read battery capacity from active profile for runtime estimation, unknown capacity is None."""
+        profile = self.call_pijuice_with_error_check(self.config.GetBatteryProfile)
+        capacity = profile.get("capacity") if isinstance(profile, dict) else None
+        self.estimator.capacity = capacity if capacity not in (None, 0, 0xFFFFFFFF) else None
+        self.battery_capacity_known = profile is not None
+        return self.estimator.capacity
+
+    def check_battery_profile_write(self, cmd):
+        """Re-read battery capacity on next estimate if battery profile is changed."""
+        if cmd in (
+            PiJuiceConfig.BATTERY_PROFILE_ID_CMD,
+            PiJuiceConfig.BATTERY_PROFILE_CMD,
+            PiJuiceConfig.RESET_TO_DEFAULT_CMD,
+        ):
+            self.battery_capacity_known = False
+
+    def get_telemetry_value(self, getter_name, *args):
+        """Get value decoded by PiJuiceStatus getter from telemetry burst, read directly if not available there."""
+        if self.telemetry is None:
+            self.get_piju_status(True)
+        else:
+            self.get_piju_status()
+        value = self.decode_snapshot(getattr(self.telemetry.status, getter_name), *args)
+        if value is None:
+            value = self.call_pijuice_with_error_check(
+                getattr(self.status, getter_name), *args
+            )
+        return value
+
+    def check_telemetry_write(self, cmd):
+        """Drop telemetry register data on write, e.g. IO pin output change."""
+        if self.telemetry is not None:
+            self.telemetry.registers.pop(cmd, None)
+
+    def get_io_config(self):
+        """Read IO pin configurations once, used pins are added to telemetry burst."""
+        if self.io_config is None:
+            io_config = {}
+            registers = list(TELEMETRY_REGISTERS)
+            for pin in IO_PINS:
+                config = self.call_pijuice_with_error_check(self.config.GetIoConfiguration, pin)
+                if config is None:
+                    continue
+                io_config[pin] = config
+                if config.get("mode") != "NOT_USED":
+                    registers.append(
+                        {
+                            "name": f"io{pin}",
+                            "cmd": PiJuiceStatus.IO_PIN_ACCESS_CMD + (pin - 1) * 5,
+                            "length": 2,
+                            "section": SECTION_TELEMETRY,
+                        }
+                    )
+            self.telemetry_registers = registers
+            self.io_config = io_config
+            _LOGGER.debug("get_io_config %s", io_config)
+        return self.io_config
+
+    def update_piju_status(self, status, time_now):
+        """Store status read from HAT, handle button events."""
+        self.powered = (
+            status.get("powerInput") == PiJuiceStatus.powerInStatusEnum[3]
+            or status.get("powerInput5vIo") == PiJuiceStatus.powerInStatusEnum[3]
+        )
+        self.piju_status = status
+        self.piju_status_read_at = time_now
+        self.watchdog_kicked_at = time.monotonic()  # HAT restarts watchdog countdown on status read
+        self.process_buttons()
+        self.process_faults(time_now)
+
     @staticmethod
     def find_piju_bus_addr(hass: HomeAssistant):
         """Search for PiJuice UPS Hat on i2c bus. Checking buses 1 and 2 and.
@@ -231,7 +494,9 @@ class PiJups:
                 self.fw_version,
             )
             return defaults
-        # get diagnostics logging settings
+        # get diagnostics logging settings, log parsers are loaded on first use
+        from .pijuice_log import LOG_ENABLE_LIST
+
         current_logs = self.get_diag_log_config()
         defaults[CONF_DIAG_LOG_CONFIG] = {
             "default": current_logs,
@@ -243,42 +508,116 @@ class PiJups:
         _LOGGER.debug("get_piju_logging_defaults exit with defaults %s", defaults)
         return defaults
 
+    def get_option_snapshot(self, hass: HomeAssistant, config_entry: ConfigEntry):
+        """Get all options flow defaults in one executor call, cached for short time and dropped on related writes."""
+        time_now = time.monotonic()
+        if (
+            self.option_snapshot is None
+            or time_now - self.option_snapshot_read_at > DEFAULT_OPTION_SNAPSHOT_TTL
+        ):
+            with self.interface.bus_lock:
+                snapshot = {
+                    "defaults": self.get_piju_defaults(hass, config_entry),
+                    "logging": self.get_piju_logging_defaults(hass, config_entry),
+                }
+            snapshot["fw_options"] = self.get_fw_file_list(hass, config_entry)
+            snapshot["fw_path"] = self.get_fw_directory(hass, config_entry)
+            self.option_snapshot = snapshot
+            self.option_snapshot_read_at = time_now
+        _LOGGER.debug("get_option_snapshot exit %s", self.option_snapshot)
+        return self.option_snapshot
+
+    def invalidate_option_snapshot(self):
+        """Drop cached options flow defaults."""
+        self.option_snapshot = None
+
+    def check_option_snapshot_write(self, cmd):
+        """Drop cached options flow defaults if register behind them is written."""
+        if cmd in (
+            PiJuiceConfig.BATTERY_TEMP_SENSE_CONFIG_CMD,
+            PiJuiceConfig.BATTERY_PROFILE_ID_CMD,
+            PiJuiceConfig.RESET_TO_DEFAULT_CMD,
+        ):
+            self.invalidate_option_snapshot()
+
+    def apply_selections(self, defaults_list, user_input):
+        """Write changed selections in one batch, registers are verified together after all writes, returns per-field success.
+
+        Batch is kept per thread, so writes done meanwhile by other threads are not deferred. Fields failing
+        batched verification are written again by their setter, so setter's own result handling decides.
+        """
+        results = {}
+        fields = {}
+        self.interface.BeginBatch()
+        try:
+            for defaults in defaults_list:
+                for name, default in defaults.items():
+                    requested_value = user_input.get(name, default.get("default"))
+                    setter = default.get("setter")
+                    if requested_value == default.get("default") or setter is None:
+                        continue
+                    batched = set(self.interface.batch)
+                    results[name] = self.apply_selection(default, requested_value)
+                    for cmd in set(self.interface.batch) - batched:
+                        fields[cmd] = name
+        finally:
+            verified = self.interface.EndBatch()
+            self.invalidate_option_snapshot()
+        failed = set()
+        for result in verified["data"]:
+            if result["error"] == "NO_ERROR":
+                continue
+            name = fields.get(result["cmd"])
+            if name is None:
+                _LOGGER.warning("apply_selections unexpected batched write 0x%x", result["cmd"])
+            elif results[name]:
+                failed.add(name)
+        for defaults in defaults_list:
+            for name in failed.intersection(defaults):
+                default = defaults[name]
+                results[name] = self.apply_selection(
+                    default, user_input.get(name, default.get("default"))
+                )
+        if failed:
+            self.invalidate_option_snapshot()
+        _LOGGER.debug("apply_selections exit %s", results)
+        return results
+
+    @staticmethod
+    def apply_selection(default, requested_value):
+        """Call selection setter (through wrapper if defined), returns success flag."""
+        setter = default["setter"]
+        wrapper = default.get("wrapper")
+        if wrapper is not None:
+            return wrapper(setter, requested_value, error_log_level=logging.DEBUG) is not None
+        ret = setter(requested_value)
+        return ret is None or ret.get("error") == "NO_ERROR"
+
     def get_diag_log_config(self):
         """Get HAT diagnostics log configuration selections."""
-        ret = self.pijups.interface.WriteData(LOGGING_CMD, [0x02])
-        time.sleep(0.1)
-        ret = self.pijups.interface.ReadData(LOGGING_CMD, 31)
+        from .pijuice_log import LOG_ENABLE_LIST, GetLogConfig
+
+        ret = GetLogConfig(self.pijups.interface)
         current_logs = []
-        if ret["error"] == "NO_ERROR" and ret["data"][1] == 0 and ret["data"][2] == 1:
-            msk = 0x01
-            for i in range(0, len(LOG_ENABLE_LIST) - 1):
-                if msk & ret["data"][3]:
-                    current_logs.append(LOG_ENABLE_LIST[i])
-                msk <<= 1
+        if ret["error"] == "NO_ERROR":
+            current_logs = [log for log in ret["data"] if log != LOG_ENABLE_LIST[-1]]
         _LOGGER.debug("get_diag_log_config exit %s", current_logs)
         return current_logs
 
     def set_diag_log_config(self, cfg_list):
         """Set selected HAT diagnostics log parameters."""
-        config = 0x00
-        for i in range(0, len(LOG_ENABLE_LIST) - 1):
-            if LOG_ENABLE_LIST[i] in cfg_list:
-                config |= 0x01 << i
-        ret = self.pijups.interface.WriteData(LOGGING_CMD, [0x01, config])
-        time.sleep(0.1)
+        from .pijuice_log import LOG_ENABLE_LIST, SetLogConfig
+
+        ret = SetLogConfig(self.pijups.interface, [log for log in cfg_list if log != LOG_ENABLE_LIST[-1]])
+        self.invalidate_option_snapshot()
         _LOGGER.debug("set_diag_log_config exit %s", ret)
         return ret
 
     def get_diag_log(self):
         """Get HAT diagnostic entry data."""
-        self.pijups.interface.WriteData(LOGGING_CMD, [0])
-        time.sleep(0.01)
-        ret = GetPiJuiceLog(self.pijups.interface)
-        if ret["error"] != "NO_ERROR":
-            time.sleep(0.5)
-            self.pijups.interface.WriteData(LOGGING_CMD, [0])
-            time.sleep(0.01)
-            ret = GetPiJuiceLog(self.pijups.interface)
+        from .pijuice_log import ReadPiJuiceLog
+
+        ret = ReadPiJuiceLog(self.pijups.interface)
         _LOGGER.debug("get_diag_log exit %s", ret)
         return ret
 
@@ -299,15 +638,16 @@ class PiJups:
         fw_path = self.get_fw_directory(hass, config_entry)[CONF_FW_UPGRADE_PATH][
             "default"
         ]
-        fw_files_local = os.listdir(fw_path)
-        fw_exe_pat = re.compile("^" + DEFAULT_FW_UTILITY_NAME + "$")
-        fw_bin_pat = re.compile("^" + DEFAULT_FW_FILE_NAME + "$")
-        exe_files = [s for s in fw_files_local if fw_exe_pat.match(s)]
-        bin_files = [s for s in fw_files_local if fw_bin_pat.match(s)]
+        if self.fw_catalogue is None:
+            from .firmware import FirmwareCatalogue
+
+            self.fw_catalogue = FirmwareCatalogue()
+        self.fw_catalogue.refresh(fw_path)
         fw_file_list = [DEFAULT_NO_FIRMWARE_UPGRADE]
         pijups: PiJups = hass.data[DOMAIN][config_entry.entry_id][BASE]
-        if len(exe_files) > 0 and len(bin_files) > 0 and pijups.i2c_bus == 1:
-            fw_file_list.extend(bin_files)
+        if self.fw_catalogue.utility_found and pijups.i2c_bus == 1:
+            # images older than installed firmware are not offered
+            fw_file_list.extend(self.fw_catalogue.get_upgrades(self.fw_version))
         defaults[CONF_FIRMWARE_SELECTION] = {
             "default": fw_file_list[0],
             "values": fw_file_list,
@@ -316,40 +656,136 @@ class PiJups:
         return defaults
 
     def set_up_ups(self):
-        """Set UPS RTC to UTC time, clean faults and button events."""
-        t_curr = datetime.now(UTC)
-        t_pi = {
-            "second": t_curr.second,
-            "minute": t_curr.minute,
-            "hour": t_curr.hour,
-            "weekday": (t_curr.weekday() + 1) % 7 + 1,
-            "day": t_curr.day,
-            "month": t_curr.month,
-            "year": t_curr.year,
-            "subsecond": t_curr.microsecond // 1000000,
-        }
-        self.call_pijuice_with_error_check(self.rtcalarm.SetTime, t_pi)
+        """Synchronise UPS RTC to UTC time if drifted, clean faults and button events."""
+        started = time.monotonic()
+        self.sync_rtc()
+        self.record_startup_phase("rtc", started)
+
+        # report and clear faults raised before start, fault register was read with startup status
+        started = time.monotonic()
+        if self.faults:
+            persistent_notification.create(
+                self.hass,
+                f"{self.piju_device_info['manufacturer']} {self.piju_device_info['model']} {self.faults}",
+                title=f"{self.piju_device_info['model']} h/w faults reported",
+                notification_id="hw_faults",
+            )
+            self.clear_faults()
+        self.record_startup_phase("faults", started)
 
-        # clear faults if any
-        status = self.call_pijuice_with_error_check(self.status.GetStatus)
-        if status is not None:
-            if status.get("isFault"):
-                faults = self.call_pijuice_with_error_check(self.status.GetFaultStatus)
-                _LOGGER.warning(
-                    "%s %s faults '%s'",
-                    self.piju_device_info["manufacturer"],
-                    self.piju_device_info["model"],
-                    faults,
-                )
-                persistent_notification.create(
-                    self.hass,
-                    f"{self.piju_device_info['manufacturer']} {self.piju_device_info['model']} {faults}",
-                    title=f"{self.piju_device_info['model']} h/w faults reported",
-                    notification_id="hw_faults",
-                )
-                self.call_pijuice_with_error_check(self.status.ResetFaultFlags, faults)
+        if period := self.config_entry.options.get(CONF_WATCHDOG_PERIOD):
+            self.arm_watchdog(period)
 
-        _LOGGER.debug("Set_up_ups completed")
+        _LOGGER.debug("Set_up_ups completed, startup timing %s", self.startup_timing)
+
+    def sync_rtc(self, force=False):
+        """Correct HAT RTC if drift exceeds threshold, returns drift and write flag or None on failure/disabled device."""
+        if not self.piju_enabled:
+            return None
+        ret = self.rtc_sync.sync(force)
+        if ret["error"] != "NO_ERROR":
+            return None
+        return ret["data"]
+
+    def schedule_wakeup(self, spec, enable=True):
+        """Set wake-up alarm from datetime or cron-like spec, unchanged registers are not written."""
+        from .alarm import compile_alarm, schedule_wakeup
+
+        return schedule_wakeup(self.interface, compile_alarm(spec), enable)
+
+    def run_sampler(self, rate, duration, file_name):
+        """Sample battery voltage/current at high rate into ring buffer, dump it to CSV file and return statistics.
+
+        OSError of dump is raised to caller, samples are kept for save_samples retry.
+        """
+        from .sampler import Sampler
+
+        sampler = Sampler(self.interface, rate, duration)
+        if not self.claim_tool("sampler", sampler):
+            return {"error": "BUSY"}
+        try:
+            stats = sampler.run()
+        finally:
+            self.sampler = None
+        self.sampler_unsaved = (sampler, stats)
+        return self.save_samples(file_name)
+
+    def save_samples(self, file_name):
+        """Dump samples of last sampler run not saved yet to CSV file."""
+        if self.sampler_unsaved is None:
+            return {"error": "NO_DATA"}
+        sampler, stats = self.sampler_unsaved
+        sampler.dump_csv(file_name)
+        self.sampler_unsaved = None
+        stats["file"] = file_name
+        self.sampler_stats = stats
+        return {"data": stats, "error": "NO_ERROR"}
+
+    def claim_tool(self, name, tool):
+        """Set sampler/profiler/capture attribute to tool if not in use, returns success flag."""
+        with self.tool_lock:
+            if getattr(self, name) is not None:
+                return False
+            setattr(self, name, tool)
+            return True
+
+    def stop_sampler(self):
+        """Stop running sampler, samples collected so far are still saved."""
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def run_profiler(self, duration, cycles, loop_thread_id, file_name):
+        """Profile integration code for duration or number of poll cycles, write report and return summary.
+
+        OSError of report write is raised to caller.
+        """
+        from .profiler import SamplingProfiler
+
+        profiler = SamplingProfiler(loop_thread_id=loop_thread_id)
+        if not self.claim_tool("profiler", profiler):
+            return {"error": "BUSY"}
+        try:
+            stats = profiler.run(duration, cycles, lambda: self.piju_status_read_at)
+            profiler.write_report(file_name, stats)
+        finally:
+            self.profiler = None
+        stats["file"] = file_name
+        return {"data": stats, "error": "NO_ERROR"}
+
+    def stop_profiler(self):
+        """Stop running profiler, report is written for samples taken so far."""
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def start_capture(self, file_name):
+        """Start recording HAT bus transactions to capture file.
+
+        Busy check, file creation and bus swap are done under tool lock, so concurrent
+        start does not truncate file of running capture.
+        """
+        from .capture import CaptureBus
+
+        with self.tool_lock:
+            if self.capture is not None:
+                return {"error": "BUSY"}
+            with self.interface.bus_lock, self.interface.semaphore:
+                self.capture = CaptureBus(self.interface.i2cbus, self.i2c_address, file_name)
+                self.interface.i2cbus = self.capture
+        _LOGGER.debug("I2C capture started to %s", file_name)
+        return {"error": "NO_ERROR"}
+
+    def stop_capture(self):
+        """Stop recording, returns capture statistics."""
+        with self.tool_lock:
+            if self.capture is None:
+                return {"error": "NOT_STARTED"}
+            with self.interface.bus_lock, self.interface.semaphore:
+                capture = self.capture
+                self.interface.i2cbus = capture.bus
+                self.capture = None
+        stats = capture.close()
+        _LOGGER.debug("I2C capture stopped: %s", stats)
+        return {"data": stats, "error": "NO_ERROR"}
 
     def call_pijuice_with_error_check(
         self, piju_function, *args, error_log_level=logging.DEBUG, non_volatile=None
@@ -381,27 +817,70 @@ class PiJups:
                 #):
                 #    return None
             else:
-                if isinstance(return_data.get("data", {}), dict):  # "<class 'dict'>":
-                    for piju_key in return_data.keys():
-                        if piju_key not in ("data", "error"):
-                            return_data["data"][piju_key] = return_data[piju_key]
-                    return_data = return_data.get("data", {})
-                else:
-                    extra_keys_in_return_data = False
-                    for piju_key in return_data.keys():
-                        if piju_key not in ("data", "error"):
-                            extra_keys_in_return_data = True
-                            break
-                    if not extra_keys_in_return_data:
-                        return_data = return_data.get("data", {})
+                return_data = self.unwrap_pijuice_data(return_data)
                 _LOGGER.log(
                     error_log_level, "%s @ %s", piju_function.__name__, return_data
                 )
                 return return_data
         return None
 
+    @staticmethod
+    def unwrap_pijuice_data(return_data):
+        """Extract data from successful PiJuice API call result, merging extra keys like non_volatile."""
+        if isinstance(return_data.get("data", {}), dict):  # "<class 'dict'>":
+            for piju_key in return_data.keys():
+                if piju_key not in ("data", "error"):
+                    return_data["data"][piju_key] = return_data[piju_key]
+            return return_data.get("data", {})
+        for piju_key in return_data.keys():
+            if piju_key not in ("data", "error"):
+                return return_data
+        return return_data.get("data", {})
+
+    @staticmethod
+    def decode_snapshot(piju_function, *args):
+        """Decode snapshot register data with PiJuice API getter, None if register was not read."""
+        return_data = piju_function(*args)
+        if return_data["error"] != "NO_ERROR":
+            return None
+        return PiJups.unwrap_pijuice_data(return_data)
+
+    def get_register_snapshot(self) -> RegisterSnapshot:
+        """Read configuration/status registers in one burst, unchanged configuration served from cache."""
+        return read_register_snapshot(self.interface, self.register_cache)
+
+    def arm_watchdog(self, period):
+        """Arm HAT watchdog for period in minutes (volatile setting), HAT power cycles host if status is not read in time."""
+        if self.call_pijuice_with_error_check(self.power.SetWatchdog, period) is None:
+            _LOGGER.warning("HAT watchdog not armed")
+            return False
+        self.watchdog_period = period
+        self.watchdog_kicked_at = time.monotonic()
+        _LOGGER.info("HAT watchdog armed, period %s min", period)
+        return True
+
+    def watchdog_heartbeat(self):
+        """Kick armed HAT watchdog with status read, skipped if telemetry burst read status within half period."""
+        if not self.piju_enabled or not self.watchdog_period:
+            return
+        if time.monotonic() - self.watchdog_kicked_at < self.watchdog_period * 30:
+            return
+        if self.call_pijuice_with_error_check(self.status.GetStatus) is not None:
+            self.watchdog_kicked_at = time.monotonic()
+
+    def disarm_watchdog(self):
+        """Disarm HAT watchdog before shutdown/unload, no-op if not armed."""
+        if not self.watchdog_period:
+            return
+        self.watchdog_period = 0
+        if self.call_pijuice_with_error_check(self.power.SetWatchdog, 0) is None:
+            _LOGGER.warning("HAT watchdog not disarmed")
+        else:
+            _LOGGER.info("HAT watchdog disarmed")
+
     def process_power_off(self, wakeon_delta, poweroff_delay, off_service_requested):
         """Handle power off/restart request."""
+        self.disarm_watchdog()
         self.set_led_in_transition()
         if off_service_requested:
             _LOGGER.debug("Executing switch off sequence")
@@ -447,6 +926,53 @@ class PiJups:
             self.config.SetLedConfiguration, "D2", LED_ON_STATUS_DOWN
         )
 
+    def process_faults(self, time_now):
+        """Track status isFault bit, fault register is read when bit flips and re-read on slow cadence while it is set.
+
+        Faults not reported before are fired as event, latched ones are not fired again.
+        """
+        is_fault = bool(self.piju_status.get("isFault"))
+        if not is_fault:
+            if self.fault_flag is not False:
+                self.fault_flag = False
+                self.faults = {}
+                _LOGGER.debug("Faults cleared")
+            return
+        if self.fault_flag and (
+            (time_now - self.faults_read_at).total_seconds() * 1.1
+            <= self.config_entry.options.get(CONF_SCAN_INTERVAL) * DEFAULT_SLOW_SCAN_COUNT
+        ):
+            return
+        faults = self.call_pijuice_with_error_check(self.status.GetFaultStatus)
+        if faults is None:
+            return  # retried on next status read
+        reported = self.faults if self.fault_flag else {}
+        self.fault_flag = True
+        self.faults = faults
+        self.faults_read_at = time_now
+        new_faults = {name: value for name, value in faults.items() if reported.get(name) != value}
+        if not new_faults:
+            return
+        _LOGGER.warning("%s %s faults '%s'", CONF_MANUFACTURER, CONF_MODEL, new_faults)
+        self.hass.bus.fire(
+            EVENT_PIJUPS_FAULT,
+            {"config_entry_id": self.config_entry.entry_id, "faults": new_faults},
+        )
+
+    def clear_faults(self):
+        """Clear latched fault events with one write and re-read fault register, returns faults left (conditions)."""
+        events = [fault for fault in self.faults if fault in PiJuiceStatus.faultEvents]
+        if events and self.call_pijuice_with_error_check(self.status.ResetFaultFlags, events) is None:
+            return {"error": "WRITE_FAILED"}
+        faults = self.call_pijuice_with_error_check(self.status.GetFaultStatus)
+        if faults is None:
+            return {"error": "COMMUNICATION_ERROR"}
+        self.faults = faults
+        self.fault_flag = bool(faults)
+        self.faults_read_at = datetime.now(UTC)
+        _LOGGER.debug("Faults %s cleared, left %s", events, faults)
+        return {"data": faults, "error": "NO_ERROR"}
+
     def process_buttons(self):
         """Routine to handle button events: cleans up any event noticed."""
         if self.piju_status.get("isButton"):
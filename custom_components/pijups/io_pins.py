@@ -0,0 +1,68 @@
+"""The PiJuPS HAT integration - IO pin entities common part."""
+
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo, Entity
+
+from .const import BASE, DOMAIN, PIJU_IO_PIN_NAME
+from .interface import PiJups
+
+_LOGGER = logging.getLogger(__name__)
+
+# entity platform per configured IO pin mode, unused pins have no entities
+IO_PIN_PLATFORMS = {
+    "ANALOG_IN": Platform.SENSOR,
+    "DIGITAL_IN": Platform.BINARY_SENSOR,
+    "DIGITAL_OUT_PUSHPULL": Platform.SWITCH,
+    "DIGITAL_IO_OPEN_DRAIN": Platform.SWITCH,
+    "PWM_OUT_PUSHPULL": Platform.NUMBER,
+    "PWM_OUT_OPEN_DRAIN": Platform.NUMBER,
+}
+
+
+async def async_get_io_pins(hass: HomeAssistant, pijups: PiJups, platform: Platform):
+    """Get IO pins served by platform as per pin mode configured in HAT."""
+    io_config = await hass.async_add_executor_job(pijups.get_io_config)
+    return [
+        pin
+        for pin, config in io_config.items()
+        if IO_PIN_PLATFORMS.get(config.get("mode")) == platform
+    ]
+
+
+class PiJuiceIoPinEntity(Entity):
+    """Common part of PiJuice IO pin entities, pin values are taken from telemetry burst."""
+
+    def __init__(self, hass: HomeAssistant, config: ConfigEntry, pin) -> None:
+        """Initialize the IO pin entity."""
+        self.hass = hass
+        self._pijups: PiJups = hass.data[DOMAIN][config.entry_id][BASE]
+        self._config = config
+        self._pin = pin
+        io_config = self._pijups.io_config[pin]
+        self._attr_name = PIJU_IO_PIN_NAME.format(pin=pin)
+        self._attr_has_entity_name = True
+        self._attr_unique_id = f"io{pin}"
+        self._attr_device_info: DeviceInfo = self._pijups.piju_device_info
+        self._attr_extra_state_attributes = {
+            "mode": io_config.get("mode"),
+            "pull": io_config.get("pull"),
+        }
+
+    def read_pin(self, getter_name):
+        """Get pin value decoded by PiJuiceStatus getter, None if not available."""
+        if not self._pijups.piju_enabled:
+            return None
+        return self._pijups.get_telemetry_value(getter_name, self._pin)
+
+    def write_pin(self, setter_name, value):
+        """Set pin value with PiJuiceStatus setter, returns success flag."""
+        return (
+            self._pijups.call_pijuice_with_error_check(
+                getattr(self._pijups.status, setter_name), self._pin, value
+            )
+            is not None
+        )
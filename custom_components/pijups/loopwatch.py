@@ -0,0 +1,168 @@
+"""The PiJuPS HAT integration - event loop blocking detector (debug mode).
+
+Watchdog thread posts heartbeat callbacks to event loop, loop thread stack is logged if heartbeat is
+not served within threshold and integration code is on it. Async entry points decorated with
+watch_loop additionally have each step (run between awaits) timed.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+_LOGGER = logging.getLogger(__name__)
+
+LOOP_WATCH_MAX_BLOCKS = 100
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# detector of running debug mode, None - decorated entry points are called directly
+ACTIVE_DETECTOR: LoopBlockDetector | None = None
+
+
+class LoopBlockDetector:
+    """Detect event loop being held longer than threshold (seconds) by integration code."""
+
+    def __init__(self, loop, threshold, package_dir=PACKAGE_DIR) -> None:
+        """Initialize detector, start() must be called from event loop thread."""
+        self.loop = loop
+        self.threshold = threshold
+        self.package_dir = package_dir
+        self.loop_thread_id = None
+        self.blocks = []
+        self.entry_stats = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.previous = None
+
+    def start(self):
+        """Start watchdog thread and time decorated entry points."""
+        global ACTIVE_DETECTOR  # pylint: disable=global-statement
+        self.loop_thread_id = threading.get_ident()
+        self.thread = threading.Thread(target=self.watch, name="pijups_loopwatch", daemon=True)
+        self.thread.start()
+        self.previous = ACTIVE_DETECTOR
+        ACTIVE_DETECTOR = self
+        _LOGGER.info("Event loop blocking detection started, threshold %s ms", self.threshold * 1000)
+
+    def stop(self):
+        """Stop watchdog thread, not joined as it might wait for heartbeat from loop calling stop."""
+        global ACTIVE_DETECTOR  # pylint: disable=global-statement
+        if ACTIVE_DETECTOR is self:
+            ACTIVE_DETECTOR = self.previous
+        self.stop_event.set()
+        self.thread = None
+
+    def watch(self):
+        """Post heartbeats, capture loop thread stack when heartbeat is late."""
+        while not self.stop_event.is_set():
+            beat = threading.Event()
+            posted = time.monotonic()
+            try:
+                self.loop.call_soon_threadsafe(beat.set)
+            except RuntimeError:  # loop closed
+                return
+            if not beat.wait(self.threshold):
+                stack = self.get_loop_stack()
+                while not beat.wait(self.threshold) and not self.stop_event.is_set():
+                    pass
+                if stack is not None:
+                    self.add_block(None, time.monotonic() - posted, stack)
+            self.stop_event.wait(self.threshold)
+
+    def get_loop_stack(self):
+        """Return formatted loop thread stack if integration code is on it."""
+        frame = sys._current_frames().get(self.loop_thread_id)  # pylint: disable=protected-access
+        if frame is None:
+            return None
+        summary = traceback.extract_stack(frame)
+        if not any(item.filename.startswith(self.package_dir) for item in summary):
+            return None
+        return "".join(traceback.format_list(summary))
+
+    def add_block(self, entry, duration, stack=None):
+        """Record and log loop hold longer than threshold."""
+        if len(self.blocks) < LOOP_WATCH_MAX_BLOCKS:
+            self.blocks.append(
+                {"entry": entry, "duration_ms": round(duration * 1000, 1), "stack": stack}
+            )
+        if stack is None:
+            _LOGGER.warning("%s held event loop for %.1f ms", entry, duration * 1000)
+        else:
+            _LOGGER.warning(
+                "Event loop blocked for %.1f ms by integration code:\n%s", duration * 1000, stack
+            )
+
+    def add_step(self, entry, duration):
+        """Account one step of decorated entry point."""
+        stats = self.entry_stats.get(entry)
+        if stats is None:
+            stats = self.entry_stats[entry] = {"steps": 0, "max_step_ms": 0.0}
+        stats["steps"] += 1
+        stats["max_step_ms"] = max(stats["max_step_ms"], round(duration * 1000, 1))
+        if duration > self.threshold:
+            self.add_block(entry, duration)
+
+
+class TimedCoroutine:
+    """Awaitable driving coroutine step by step, duration of each step is reported to detector."""
+
+    def __init__(self, coro, entry, detector) -> None:
+        """Wrap coroutine."""
+        self.coro = coro
+        self.entry = entry
+        self.detector = detector
+
+    def __await__(self):
+        """Forward sends/throws to wrapped coroutine, timing each."""
+        coro = self.coro
+        send, value = coro.send, None
+        while True:
+            started = time.monotonic()
+            try:
+                yielded = send(value)
+            except StopIteration as stop:
+                self.detector.add_step(self.entry, time.monotonic() - started)
+                return stop.value
+            except BaseException:
+                self.detector.add_step(self.entry, time.monotonic() - started)
+                raise
+            self.detector.add_step(self.entry, time.monotonic() - started)
+            try:
+                value = yield yielded
+                send = coro.send
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as exc:  # pylint: disable=broad-except
+                send, value = coro.throw, exc
+
+
+def watch_loop(func):
+    """Decorate async entry point to be timed while detector is active."""
+    entry = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        detector = ACTIVE_DETECTOR
+        if detector is None:
+            return await func(*args, **kwargs)
+        return await TimedCoroutine(func(*args, **kwargs), entry, detector)
+
+    return wrapper
+
+
+@contextmanager
+def detect_loop_blocking(loop, threshold, package_dir=PACKAGE_DIR):
+    """Run detector within context, e.g. to assert in tests that event loop is not blocked."""
+    detector = LoopBlockDetector(loop, threshold, package_dir)
+    detector.start()
+    try:
+        yield detector
+    finally:
+        detector.stop()
@@ -0,0 +1,166 @@
+"""The PiJuPS HAT integration - OpenMetrics view rendered from in-memory telemetry."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+import logging
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import callback
+
+from .const import BASE, CONF_METRICS, DOMAIN
+from .interface import HEALTH_STATES
+
+_LOGGER = logging.getLogger(__name__)
+
+METRICS_URL = "/api/pijups/metrics"
+METRICS_VIEW_REGISTERED = "pijups_metrics_view"
+METRICS_HEADERS = {"Content-Type": "application/openmetrics-text; version=1.0.0; charset=utf-8"}
+# family name, unit, telemetry value name, scale to base unit
+TELEMETRY_METRICS = (
+    ("pijups_battery_charge_ratio", "ratio", "charge", 0.01),
+    ("pijups_battery_temperature_celsius", "celsius", "temperature", 1),
+    ("pijups_battery_voltage_volts", "volts", "battery_voltage", 0.001),
+    ("pijups_battery_current_amperes", "amperes", "battery_current", 0.001),
+    ("pijups_io_voltage_volts", "volts", "io_voltage", 0.001),
+    ("pijups_io_current_amperes", "amperes", "io_current", 0.001),
+)
+ESTIMATE_METRICS = (
+    ("pijups_battery_power_watts", "watts", "power", 1),
+    ("pijups_battery_time_to_empty_seconds", "seconds", "time_to_empty", 60),
+    ("pijups_battery_time_to_full_seconds", "seconds", "time_to_full", 60),
+)
+
+
+def format_value(value):
+    """Format sample value, booleans as 0/1."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    """Format label set, values are escaped as required by exposition format."""
+    return ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in labels.items()
+    )
+
+
+class MetricsWriter:
+    """Collect metric families, samples of family are kept together as exposition format requires."""
+
+    def __init__(self) -> None:
+        """Initialize empty family list."""
+        self.families = {}
+
+    def add(self, family, metric_type, unit, help_text, labels, value, suffix=""):
+        """Add sample to family, samples with unknown value are skipped."""
+        if value is None:
+            return
+        lines = self.families.get(family)
+        if lines is None:
+            lines = [f"# TYPE {family} {metric_type}"]
+            if unit:
+                lines.append(f"# UNIT {family} {unit}")
+            lines.append(f"# HELP {family} {help_text}")
+            self.families[family] = lines
+        lines.append(f"{family}{suffix}{{{format_labels(labels)}}} {format_value(value)}")
+
+    def render(self):
+        """Return exposition text."""
+        lines = [line for family in self.families.values() for line in family]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def add_pijups_metrics(writer: MetricsWriter, pijups):
+    """Add metrics of one HAT from cached telemetry, interface counters and health state, no bus access."""
+    device = {"device": pijups.config_entry.unique_id}
+    health = pijups.get_health()
+    for state in HEALTH_STATES:
+        writer.add(
+            "pijups_health", "stateset", None, "HAT health state",
+            {**device, "pijups_health": state}, state == health,
+        )
+    if pijups.piju_status_read_at is not None:
+        writer.add(
+            "pijups_telemetry_timestamp_seconds", "gauge", "seconds", "Last telemetry read time",
+            device, pijups.piju_status_read_at.timestamp(),
+        )
+    writer.add(
+        "pijups_external_power", "gauge", None, "External power present",
+        device, pijups.powered,
+    )
+    for family, unit, name, scale in TELEMETRY_METRICS:
+        value = pijups.telemetry_values.get(name)
+        writer.add(
+            family, "gauge", unit, name.replace("_", " ").capitalize(),
+            device, None if value is None else round(value * scale, 6),
+        )
+    for family, unit, name, scale in ESTIMATE_METRICS:
+        value = getattr(pijups.estimator, name)
+        writer.add(
+            family, "gauge", unit, f"Estimated {name.replace('_', ' ')}",
+            device, None if value is None else round(value * scale, 6),
+        )
+    if pijups.interface is None:
+        return
+    for op, stats in pijups.interface.transfer_stats.items():
+        labels = {**device, "op": op}
+        writer.add(
+            "pijups_i2c_transfer_seconds", "summary", "seconds", "I2C transfer duration",
+            labels, stats["count"], "_count",
+        )
+        writer.add(
+            "pijups_i2c_transfer_seconds", "summary", "seconds", "I2C transfer duration",
+            labels, round(stats["seconds"], 6), "_sum",
+        )
+        writer.add(
+            "pijups_i2c_transfer_max_seconds", "gauge", "seconds", "Longest I2C transfer",
+            labels, round(stats["max_seconds"], 6),
+        )
+        writer.add(
+            "pijups_i2c_errors", "counter", None, "Failed I2C transfers",
+            labels, stats["errors"], "_total",
+        )
+
+
+def render_metrics(hass):
+    """Render metrics of all HATs with metrics enabled, None if there are none."""
+    writer = MetricsWriter()
+    found = False
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        pijups = entry_data.get(BASE)
+        if pijups is not None and pijups.config_entry.options.get(CONF_METRICS):
+            add_pijups_metrics(writer, pijups)
+            found = True
+    return writer.render() if found else None
+
+
+class PiJupsMetricsView(HomeAssistantView):
+    """OpenMetrics text of PiJups telemetry, served from memory so scrape does not read HAT."""
+
+    url = METRICS_URL
+    name = "api:pijups:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle scrape request."""
+        text = render_metrics(request.app["hass"])
+        if text is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        return web.Response(text=text, headers=METRICS_HEADERS)
+
+
+@callback
+def async_register_metrics_view(hass):
+    """Register view once, it serves all entries with metrics enabled."""
+    if hass.data.get(METRICS_VIEW_REGISTERED):
+        return
+    hass.http.register_view(PiJupsMetricsView)
+    hass.data[METRICS_VIEW_REGISTERED] = True
+    _LOGGER.debug("Metrics view registered at %s", METRICS_URL)
@@ -0,0 +1,50 @@
+"""The PiJuPS HAT integration - number platform implementation."""
+
+import logging
+
+from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import BASE, DOMAIN
+from .io_pins import PiJuiceIoPinEntity, async_get_io_pins
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = None  # value set in __init__.py async_setup_entry
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add entities for IO pins configured as PWM outputs."""
+    pijups = hass.data[DOMAIN][config_entry.entry_id][BASE]
+    pins = await async_get_io_pins(hass, pijups, Platform.NUMBER)
+    async_add_entities([PiJuiceIoPwm(hass, config_entry, pin) for pin in pins], True)
+    _LOGGER.debug("async_setup_entry numbers added for IO pins %s", pins)
+
+
+class PiJuiceIoPwm(PiJuiceIoPinEntity, NumberEntity):
+    """PiJuice IO pin in PWM output mode, value is duty cycle."""
+
+    _attr_icon = "mdi:square-wave"
+    _attr_native_min_value = 0
+    _attr_native_max_value = 100
+    _attr_native_step = 1
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_mode = NumberMode.SLIDER
+
+    def update(self) -> None:
+        """Update duty cycle."""
+        value = self.read_pin("GetIoPWM")
+        if value is not None:
+            self._attr_native_value = value
+
+    def set_native_value(self, value: float) -> None:
+        """Set duty cycle."""
+        if self.write_pin("SetIoPWM", value):
+            self._attr_native_value = value
@@ -0,0 +1,363 @@
+"""The PiJuPS HAT integration - options flow (HAT settings and firmware upgrade)."""
+import asyncio
+import logging
+import subprocess
+import time
+import threading
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant import config_entries, core
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.selector import (
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+)
+
+from .const import (
+    BASE,
+    CONF_FIRMWARE_SELECTION,
+    CONF_FW_UPGRADE_PATH,
+    CONF_LOOP_BLOCK_THRESHOLD,
+    CONF_METRICS,
+    CONF_TELEMETRY_SOCKET,
+    CONF_UPS_DELAY,
+    CONF_UPS_WAKEON_DELTA,
+    CONF_WATCHDOG_PERIOD,
+    DEFAULT_FW_UTILITY_NAME,
+    DEFAULT_NAME,
+    DEFAULT_NO_FIRMWARE_UPGRADE,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_UPS_DELAY,
+    DEFAULT_UPS_WAKEON_DELTA,
+    DOMAIN,
+    FW_PAGE_COUNT_LINE_PREFIX,
+    FW_PROCESSED_PAGE_LINE_PREFIX,
+    FW_PROGRESS_INTERVAL,
+    WATCHDOG_MAX_PERIOD,
+)
+from .interface import PiJups
+from .loopwatch import watch_loop
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PiJuOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle PiJu HAT options configuration."""
+
+    def __init__(self, config_entry):
+        """Initialize PiJu options flow."""
+        self.init_input = None
+        self.hass = core.async_get_hass()
+        self.pijups: PiJups = self.hass.data[DOMAIN][config_entry.entry_id][BASE]
+        self.fw_task = None
+        self.default_options = None
+        self.default_logging = None
+        self.fw_options = None
+        self.fw_path_info = None
+        self.fw_page_count = None
+        self.fw_processed_pages = None
+        self.fw_progress_action = None
+        self.fw_progress = threading.Event()
+        self.fw_status = None
+
+        self.fw_update_time = None
+
+    @staticmethod
+    def create_schema_from_defaults(schema, defaults):
+        """Create flow schema from HAT device configuration received from h/w is a form of array of values/default/handlers dictionaries."""
+        for name, default in defaults.items():
+            if default.get("type") == "multi":
+                schema_element = {
+                    vol.Required(
+                        name,
+                        default=default.get("default"),
+                    ): SelectSelector(
+                        SelectSelectorConfig(
+                            options=default.get("values"),
+                            multiple=True,
+                            mode=SelectSelectorMode.DROPDOWN,
+                            translation_key=default.get("key"),
+                        )
+                    )
+                }
+            else:
+                if default.get("key") is not None:
+                    schema_element = {
+                        vol.Required(
+                            name,
+                            default=default.get("default"),
+                        ): SelectSelector(
+                            SelectSelectorConfig(
+                                options=default.get("values"),
+                                mode=SelectSelectorMode.DROPDOWN,
+                                translation_key=default.get("key"),
+                            )
+                        ),
+                    }
+                else:
+                    schema_element = {
+                        vol.Required(
+                            name,
+                            default=default.get("default"),
+                        ): SelectSelector(
+                            SelectSelectorConfig(
+                                options=default.get("values"),
+                                mode=SelectSelectorMode.DROPDOWN,
+                            )
+                        ),
+                    }
+            schema = {**schema, **schema_element}
+        return schema
+
+    @watch_loop
+    async def async_step_init(self, user_input: dict[str, Any] = None) -> FlowResult:
+        """Handle 1st step of PiJu HAT options configuration."""
+        _LOGGER.debug("async_step_init user_input=%s", user_input)
+        if self.default_options is None:
+            snapshot = await self.hass.async_add_executor_job(
+                self.pijups.get_option_snapshot, self.hass, self.config_entry
+            )
+            self.default_options = snapshot["defaults"]
+            self.default_logging = snapshot["logging"]
+            self.fw_options = snapshot["fw_options"]
+            self.fw_path_info = snapshot["fw_path"]
+
+        errors = {}
+
+        if user_input is not None:
+            self.init_input = user_input
+            # execute requested changes in one batch
+            results = await self.hass.async_add_executor_job(
+                self.pijups.apply_selections,
+                (self.default_options, self.default_logging, self.fw_options),
+                user_input,
+            )
+            for name, result in results.items():
+                if not result:
+                    _LOGGER.warning("Failed to apply %s=%s", name, user_input.get(name))
+                    errors[name] = "write_failed"
+                else:
+                    # device state changed, new value is current one
+                    for defaults in (self.default_options, self.default_logging):
+                        if name in defaults:
+                            defaults[name]["default"] = user_input[name]
+
+            if not errors and (
+                len(self.fw_options[CONF_FIRMWARE_SELECTION]["values"]) <= 1
+                or user_input.get(CONF_FIRMWARE_SELECTION)
+                == DEFAULT_NO_FIRMWARE_UPGRADE
+            ):
+                return self.async_create_entry(title=DEFAULT_NAME, data=self.init_input)
+            if not errors:
+                await asyncio.sleep(0.2)
+                return await self.async_step_firmware_confirm()
+
+        device_options_schema = {}
+        for defaults in (
+            self.default_options,
+            self.default_logging,
+        ):
+            device_options_schema = PiJuOptionsFlowHandler.create_schema_from_defaults(
+                device_options_schema, defaults
+            )
+
+        restart_option_schema = {
+            vol.Required(
+                CONF_UPS_DELAY,
+                default=self.config_entry.options.get(
+                    CONF_UPS_DELAY, DEFAULT_UPS_DELAY
+                ),
+            ): vol.All(int, vol.Range(min=0, max=255)),
+            vol.Required(
+                CONF_UPS_WAKEON_DELTA,
+                default=self.config_entry.options.get(
+                    CONF_UPS_WAKEON_DELTA, DEFAULT_UPS_WAKEON_DELTA
+                ),
+            ): vol.All(int, vol.Range(min=-1, max=100)),
+            vol.Required(
+                CONF_SCAN_INTERVAL,
+                default=self.config_entry.options.get(
+                    CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+                ),
+            ): vol.All(int, vol.Range(min=5)),
+            vol.Optional(
+                CONF_TELEMETRY_SOCKET,
+                description={
+                    "suggested_value": self.config_entry.options.get(CONF_TELEMETRY_SOCKET)
+                },
+            ): str,
+            vol.Optional(
+                CONF_METRICS,
+                description={
+                    "suggested_value": self.config_entry.options.get(CONF_METRICS, False)
+                },
+            ): bool,
+            vol.Optional(
+                CONF_LOOP_BLOCK_THRESHOLD,
+                description={
+                    "suggested_value": self.config_entry.options.get(CONF_LOOP_BLOCK_THRESHOLD, 0)
+                },
+            ): vol.All(int, vol.Range(min=0, max=10000)),
+            vol.Optional(
+                CONF_WATCHDOG_PERIOD,
+                description={
+                    "suggested_value": self.config_entry.options.get(CONF_WATCHDOG_PERIOD, 0)
+                },
+            ): vol.All(int, vol.Range(min=0, max=WATCHDOG_MAX_PERIOD)),
+        }
+        options_schema = {**device_options_schema, **restart_option_schema}
+        if len(self.fw_options[CONF_FIRMWARE_SELECTION]["values"]) > 1:
+            options_schema = PiJuOptionsFlowHandler.create_schema_from_defaults(
+                options_schema, self.fw_options
+            )
+
+        return_form = self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(options_schema),
+            errors=errors,
+        )
+        return return_form
+
+    @watch_loop
+    async def async_step_firmware_confirm(
+        self, user_input: dict[str, Any] = None
+    ) -> FlowResult:
+        """Validate the user input allows us to connect."""
+        _LOGGER.debug("async_step_firmware_confirm user_input=%s", user_input)
+        errors = {}
+        if user_input is not None:
+            self.fw_progress.clear()
+            self.fw_progress_action = "fw_started"
+            self.fw_task = self.hass.async_create_task(self.async_background_status())
+            return await self.async_step_firmware_progress()
+        return self.async_show_form(
+            step_id="firmware_confirm",
+            data_schema=vol.Schema({}),
+            errors=errors,
+        )
+
+    @watch_loop
+    async def async_firmware_progress(self):
+        self.fw_progress.wait()
+        self.fw_progress.clear()
+        await asyncio.sleep(0.6)
+        _LOGGER.debug("async_firmware_progress %s", self.fw_progress_action)
+
+    @watch_loop
+    async def async_step_firmware_progress(
+        self, user_input: dict[str, Any] = None
+    ) -> FlowResult:
+        """Validate the user input allows us to connect."""
+        _LOGGER.debug(
+            "async_step_firmware_progress user_input=%s, pages %s, done %s, background task done %s %s %s",
+            user_input,
+            self.fw_page_count,
+            self.fw_processed_pages,
+            self.fw_task.done(),
+            self.fw_progress_action,
+            self.fw_status.done() if self.fw_status else None,
+        )
+        if not self.fw_status:
+            self.fw_status = self.hass.async_create_task(self.async_firmware_progress())
+        if not self.fw_status.done():
+            _LOGGER.debug("async_step_firmware_progress calling async_show_progress")
+            ret_data = self.async_show_progress(
+                step_id="firmware_progress",
+                progress_action=self.fw_progress_action,
+                progress_task=self.fw_status,
+            )
+        else:
+            if not self.fw_progress_action:
+                _LOGGER.debug("async_step_firmware_progress calling async_show_progress_done")
+                ret_data = self.async_show_progress_done(next_step_id="firmware_finish")
+            else:
+                #if self.fw_status: await self.fw_status
+                #self.fw_status = self.hass.async_create_task(self.async_firmware_progress())
+                #await asyncio.sleep(0)
+                _LOGGER.debug("async_step_firmware_progress calling async_show_progress")
+                ret_data = self.async_show_progress(
+                    step_id="firmware_progress",
+                    progress_action=self.fw_progress_action,
+                    progress_task=self.fw_status,
+                )
+                #await self.fw_status
+                self.fw_status = None
+        _LOGGER.debug(
+            "async_step_firmware_progress returning %s ", ret_data['type'],
+        )
+        return ret_data
+
+    @watch_loop
+    async def async_background_status(self):
+        """FW upgrade utlity execution monitor."""
+        _LOGGER.debug("async_background_status started")
+        watchdog_period = self.pijups.watchdog_period  # volatile, lost on HAT reset after upgrade
+        await self.hass.async_add_executor_job(self.pijups.disarm_watchdog)
+        self.pijups.piju_enabled = False  # disable requests to device
+        fw_path = self.fw_path_info[CONF_FW_UPGRADE_PATH]["default"]
+        fw_upgrade_process = subprocess.Popen(
+            [
+                fw_path + "/" + DEFAULT_FW_UTILITY_NAME,
+                f"{self.pijups.i2c_address:02x}",
+                fw_path + "/" + self.init_input[CONF_FIRMWARE_SELECTION],
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            with fw_upgrade_process.stdout as pipe:
+                for line in iter(pipe.readline, b""):
+                    progress = line.decode()[:-1]
+                    #_LOGGER.debug("%s -> %s", DEFAULT_FW_UTILITY_NAME, progress)
+                    if progress.startswith(FW_PAGE_COUNT_LINE_PREFIX):
+                        self.fw_page_count = int(
+                            progress[len(FW_PAGE_COUNT_LINE_PREFIX) :]
+                        )
+                        self.fw_update_time = time.time() - FW_PROGRESS_INTERVAL
+                    if progress.startswith(FW_PROCESSED_PAGE_LINE_PREFIX):
+                        self.fw_processed_pages = int(
+                            progress[
+                                len(FW_PROCESSED_PAGE_LINE_PREFIX) : progress.index(
+                                    " ", len(FW_PROCESSED_PAGE_LINE_PREFIX)
+                                )
+                            ]
+                        )
+                    if self.fw_page_count is not None and self.fw_processed_pages is not None:
+                        progress_action = f"fw_p_{int((self.fw_page_count - self.fw_processed_pages) * 10 / self.fw_page_count)}"
+                        if self.fw_progress_action != progress_action:
+                            _LOGGER.debug("%s -> %s %s", DEFAULT_FW_UTILITY_NAME, progress_action, self.fw_progress_action)
+                            self.fw_progress_action = progress_action
+                            self.fw_progress.set()
+                            await asyncio.sleep(0.1)
+        finally:
+            self.pijups.piju_enabled = True  # enable requests to device
+            if watchdog_period:
+                await self.hass.async_add_executor_job(
+                    self.pijups.arm_watchdog, watchdog_period
+                )
+            self.fw_progress_action = None
+            self.fw_progress.set()
+        _LOGGER.debug("async_background_status ended")
+
+    @watch_loop
+    async def async_step_firmware_finish(
+        self, user_input: dict[str, Any] = None
+    ) -> FlowResult:
+        """Validate the user input allows us to connect."""
+        _LOGGER.debug("async_step_firmware_finish entry user_input %s", user_input)
+        errors = {}
+        if user_input is None:
+            ret_val = self.async_show_form(
+                step_id="firmware_finish",
+                data_schema=vol.Schema({}),
+                last_step=True,
+                errors=errors,
+            )
+            self.fw_processed_pages = None
+        else:
+            ret_val = self.async_create_entry(title=DEFAULT_NAME, data=self.init_input)
+        return ret_val
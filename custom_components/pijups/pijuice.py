@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 __version__ = "1.8"
 
-import ctypes
 import sys
 import threading
 import time
@@ -40,6 +39,17 @@ class PiJuiceInterface(object):
         self.errTime = 0
         self.force = None
         self.semaphore = threading.Semaphore(1)
+        # held by callers running multi-transfer command sequences (e.g. LOGGING_CMD)
+        self.bus_lock = threading.RLock()
+        # called with cmd after each successful write, e.g. to drop cached register copies
+        self.write_listeners = []
+        # per thread cmd -> (data, delay) for WriteDataVerify calls deferred until EndBatch
+        self.batch_local = threading.local()
+        # per operation transfer counters: count, failed transfers, summed and max duration in seconds
+        self.transfer_stats = {
+            op: {"count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0}
+            for op in ("read", "write")
+        }
 
     def __del__(self):
         """Clean up any resources used by the PiJuice instance."""
@@ -85,6 +95,7 @@ class PiJuiceInterface(object):
     def _DoTransfer(self, oper):
         self.force =  True  if (self.t is not None and self.t.is_alive()) else None
         #_LOGGER.debug(f"_DoTransfer force={self.force}")
+        started = time.monotonic()
         self.t = threading.Thread(target=oper, args=())
         self.t.start()
 
@@ -92,6 +103,13 @@ class PiJuiceInterface(object):
         self.t.join(timeout=0.1)
 
         r_code = not (self.comError or self.t.is_alive())
+        elapsed = time.monotonic() - started
+        stats = self.transfer_stats["read" if oper == self._Read else "write"]
+        stats["count"] += 1
+        stats["seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+        if not r_code:
+            stats["errors"] += 1
         #_LOGGER.debug(f"_DoTransfer return code={r_code}")
         return r_code
 
@@ -113,6 +131,7 @@ class PiJuiceInterface(object):
             if self._GetChecksum(d[0:-1]) == d[-1]:
                 del d[-1]
                 return {"data": d, "error": "NO_ERROR"}
+            self.transfer_stats["read"]["errors"] += 1
             return {"error": "DATA_CORRUPTED"}
         del d[-1]
         return {"data": d, "error": "NO_ERROR"}
@@ -128,12 +147,44 @@ class PiJuiceInterface(object):
             if not self._DoTransfer(self._Write):
                 return {"error": "COMMUNICATION_ERROR"}
 
+        for listener in self.write_listeners:
+            listener(cmd)
         return {"error": "NO_ERROR"}
 
+    @property
+    def batch(self):
+        # batch opened by calling thread, writes from other threads are verified immediately
+        return getattr(self.batch_local, "writes", None)
+
+    def BeginBatch(self):
+        # WriteDataVerify only writes while batch is open, read-back is done by EndBatch
+        self.batch_local.writes = {}
+
+    def EndBatch(self):
+        # single settle delay (longest requested) and one read-back pass for all batched writes
+        batch = self.batch
+        self.batch_local.writes = None
+        if not batch:
+            return {"data": [], "error": "NO_ERROR"}
+        delays = [delay for _, delay in batch.values() if delay is not None]
+        if delays:
+            time.sleep(max(delays))
+        results = []
+        for cmd, (data, _) in batch.items():
+            ret = self.ReadData(cmd, len(data))
+            if ret["error"] == "NO_ERROR" and ret["data"] != data:
+                ret = {"error": "WRITE_FAILED"}
+            results.append({"cmd": cmd, "error": ret["error"]})
+        failed = any(r["error"] != "NO_ERROR" for r in results)
+        return {"data": results, "error": "WRITE_FAILED" if failed else "NO_ERROR"}
+
     def WriteDataVerify(self, cmd, data, delay=None):
         wresult = self.WriteData(cmd, data)
         if wresult["error"] != "NO_ERROR":
             return wresult
+        elif self.batch is not None:
+            self.batch[cmd] = (data, delay)
+            return wresult
         else:
             if delay is not None:
                 try:
@@ -1212,6 +1263,8 @@ class PiJuiceConfig(object):
             d = ret["data"]
             if all(v == 0 for v in d):
                 return {"data": "INVALID", "error": "NO_ERROR"}
+            import ctypes  # only custom battery profiles need it, loaded on first use
+
             profile = {}
             packed_u16 = (d[1] << 8) | d[0]
             profile["capacity"] = (
@@ -1232,6 +1285,8 @@ class PiJuiceConfig(object):
             return {"data": profile, "error": "NO_ERROR"}
 
     def SetCustomBatteryProfile(self, profile):
+        import ctypes
+
         d = [0x00] * 14
         try:
             cap = profile["capacity"]
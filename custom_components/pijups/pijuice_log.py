@@ -11,13 +11,17 @@
 # Use to read log messages from PiJuice, firmware version >= 1.6
 # if there is file path as input argument it will append messages
 # to file, otherwise will only print to screen
-# Usage:
-# 	Enable: python3 pijuice_log.py --enable "OTHER|5VREG_ON|5VREG_OFF|WAKEUP_EVT|ALARM_EVT|MCU_RESET"
-# 	Read: python3 pijuice_log.py
-# 	Read to file: python3 pijuice_log.py ./pijuice_log.txt
-# 	Disable logging: python3 pijuice_log.py --disable
-
+# Usage (run as module from directory containing pijups package):
+# 	Enable: python3 -m pijups.pijuice_log --enable "OTHER|5VREG_ON|5VREG_OFF|WAKEUP_EVT|ALARM_EVT|MCU_RESET"
+# 	Read: python3 -m pijups.pijuice_log
+# 	Read to file: python3 -m pijups.pijuice_log ./pijuice_log.txt
+# 	Read as JSON lines: python3 -m pijups.pijuice_log --jsonl
+# 	Follow new entries: python3 -m pijups.pijuice_log --follow --interval 30 --jsonl --since 2023-01-01T00:00:00
+# 	Disable logging: python3 -m pijups.pijuice_log --disable
+
+import argparse
 import datetime
+import json
 import sys
 import time
 from .pijuice import PiJuiceInterface
@@ -26,12 +30,26 @@ LOGGING_CMD = 0xF6  # 246
 LOG_MSG_FRAME_SIZE = 31
 LOG_READ_MSG_SIZE = LOG_MSG_FRAME_SIZE + 1
 
+# LOGGING_CMD responses are polled for instead of waiting fixed time: first read-back
+# after LOG_POLL_MIN_DELAY, then with doubling delay capped at LOG_POLL_MAX_DELAY until
+# response is valid or deadline expires. Deadlines keep within former fixed waits
+# (0.1s per configuration request, 0.5s + 2x0.01s for log read retry).
+LOG_POLL_MIN_DELAY = 0.005
+LOG_POLL_MAX_DELAY = 0.05
+LOG_CONFIG_DEADLINE = 0.3
+LOG_READ_DEADLINE = 1.0
+
 vbat = lambda x: ((x << 3) | 0x0800) / 4096 * 3.3 * 137.4 / 100
+v5v = lambda x: (x << 4) / 4096 * 3.3 * 2
+curr5v = (
+    lambda x: ((x & 0x7F) << 4) / 4096 * 3.3 * 1000 / 50 / 8
+    if (x & 0x80)
+    else x / 4096 * 2 * 3.3 * 100
+)  # (((x * 3300 * 25) >> 8)/1000) # else (( 1469 + ((2048*138)>>12) - (2048-((x&0x7F)<<4)) )*3300*10+1)>>14
 
 
 def Parse_5VREG_ON(data):
     t = GetDateTime(data[2:])
-    v5v = lambda x: (x << 4) / 4096 * 3.3 * 2
     # v = vbat(ret['data'][10])#d/4096 * 3.3 * 137.4/100
     bat = ["{0:.3f}".format(vbat(b)) for b in data[11:21]]
     reg5v = ["{0:.3f}".format(v5v(b)) for b in data[21:31]]
@@ -56,19 +74,13 @@ def Parse_5VREG_ON(data):
 
 def Parse_5VREG_OFF(data):
     t = GetDateTime(data[2:])
-    v5v = lambda x: (x << 4) / 4096 * 3.3 * 2
-    curr = (
-        lambda x: ((x & 0x7F) << 4) / 4096 * 3.3 * 1000 / 50 / 8
-        if (x & 0x80)
-        else x / 4096 * 2 * 3.3 * 100
-    )  # (((x * 3300 * 25) >> 8)/1000) # else (( 1469 + ((2048*138)>>12) - (2048-((x&0x7F)<<4)) )*3300*10+1)>>14
 
     curr5Vgpio = (
         0 if (data[13] & 0x80) else (data[13] << 5) / 1000
     )  # ((-data[13]-256) << 5)/1000 if (data[13] & 0x80) else (data[13] << 5)/1000
     gpio5V = "{0:.3f}".format(v5v(data[14]))
     batSignal = ["{0:.3f}".format(vbat(b)) for b in data[15:23]]
-    curr5vSignal = ["{0:.3f}".format(curr(b)) for b in data[23:31]]
+    curr5vSignal = ["{0:.3f}".format(curr5v(b)) for b in data[23:31]]
     logStr = (
         str(data[0])
         + " "
@@ -235,18 +247,108 @@ def Parse_MCU_RESET(data):
     return logStr
 
 
+# Structured (machine readable) counterparts of Parse_* routines, used for JSON output
+def _Int16(lo, hi):
+    i = (hi << 8) | lo
+    if i & (1 << 15):
+        i = i - (1 << 16)
+    return i
+
+
+def _WakeupOnCharge(data):
+    wkupOnChargeCfg = (data[14] << 8) | data[13]
+    return wkupOnChargeCfg if wkupOnChargeCfg != 0xFFFF else "DISABLED"
+
+
+def Record_5VREG_ON(data):
+    return {
+        "result": ["SUCCESS", "NO_ENOUGH_POWER"][data[10] & 0x01],
+        "battery_voltage": [round(vbat(b), 3) for b in data[11:21]],
+        "gpio_5v_voltage": [round(v5v(b), 3) for b in data[21:31]],
+    }
+
+
+def Record_5VREG_OFF(data):
+    return {
+        "charge": (data[11] << 2) / 10,
+        "temperature": data[12],
+        "gpio_5v_voltage": round(v5v(data[14]), 3),
+        "gpio_5v_current": 0 if (data[13] & 0x80) else (data[13] << 5) / 1000,
+        "battery_voltage": [round(vbat(b), 3) for b in data[15:23]],
+        "current": [round(curr5v(b), 3) for b in data[23:31]],
+    }
+
+
+def Record_WAKEUP_EVT(data):
+    status = GetStatus(data[11])
+    triggers = [
+        name
+        for name, mask in (
+            ("POWER_BUTTON", 0x10),
+            ("WATCHDOG", 0x08),
+            ("IO", 0x04),
+            ("RTC", 0x02),
+            ("ON_CHARGE", 0x01),
+        )
+        if data[10] & mask
+    ]
+    return {
+        "charge": (data[15] << 2) / 10,
+        "battery_voltage": ((data[18] << 8) | data[17]) / 1000,
+        "temperature": data[16],
+        "battery": status["battery"],
+        "regulator_on": bool(data[12] & 0x01),
+        "gpio_5v_voltage": ((data[20] << 8) | data[19]) / 1000,
+        "gpio_5v_current": _Int16(data[21], data[22]) / 1000,
+        "power_input_5v_io": status["powerInput5vIo"],
+        "triggers": triggers,
+        "wakeup_on_charge": _WakeupOnCharge(data),
+    }
+
+
+def Record_ALARM_EVT(data):
+    status = GetStatus(data[13])
+    return {
+        "charge": (data[14] << 2) / 10,
+        "battery_voltage": ((data[17] << 8) | data[16]) / 1000,
+        "temperature": data[15],
+        "battery": status["battery"],
+        "power_input_5v_io": status["powerInput5vIo"],
+        "power_input": status["powerInput"],
+        "alarm_status": GetAlarmStatus(data[10:]),
+        "alarm": GetAlarm(data[20:]),
+    }
+
+
+def Record_MCU_RESET(data):
+    status = GetStatus(data[11])
+    states = ["NORMAL", "POWER_ON", "POWER_RESET", "UPDATE", "CONFIG_RESET", "UNKNOWN"]
+    return {
+        "charge": (data[15] << 2) / 10,
+        "battery_voltage": ((data[18] << 8) | data[17]) / 1000,
+        "temperature": data[16],
+        "battery": status["battery"],
+        "regulator_on": bool(data[12] & 0x01),
+        "gpio_5v_voltage": ((data[20] << 8) | data[19]) / 1000,
+        "gpio_5v_current": _Int16(data[21], data[22]) / 1000,
+        "power_input_5v_io": status["powerInput5vIo"],
+        "state": states[data[10]] if data[10] < len(states) else "UNKNOWN",
+        "wakeup_on_charge": _WakeupOnCharge(data),
+    }
+
+
 LOG_MSG_DEFS = [
-    {"name": "NO_LOG   ", "parser": {}},
-    {"name": "MESSAGE  ", "parser": {}},
-    {"name": "VALUE	  ", "parser": {}},
-    {"name": "RESERVED1", "parser": {}},
-    {"name": "5VREG_ON ", "parser": Parse_5VREG_ON},
-    {"name": "5VREG_OFF", "parser": Parse_5VREG_OFF},
-    {"name": "WAKEUP_EVT  ", "parser": Parse_WAKEUP_EVT},
-    {"name": "ALARM_EVT  ", "parser": Parse_ALARM_EVT},
-    {"name": "MCU_RESET  ", "parser": Parse_MCU_RESET},
-    {"name": "RESERVED1", "parser": {}},
-    {"name": "ALARM_WRITE  ", "parser": Parse_ALARM_EVT},
+    {"name": "NO_LOG   ", "parser": {}, "record": None},
+    {"name": "MESSAGE  ", "parser": {}, "record": None},
+    {"name": "VALUE	  ", "parser": {}, "record": None},
+    {"name": "RESERVED1", "parser": {}, "record": None},
+    {"name": "5VREG_ON ", "parser": Parse_5VREG_ON, "record": Record_5VREG_ON},
+    {"name": "5VREG_OFF", "parser": Parse_5VREG_OFF, "record": Record_5VREG_OFF},
+    {"name": "WAKEUP_EVT  ", "parser": Parse_WAKEUP_EVT, "record": Record_WAKEUP_EVT},
+    {"name": "ALARM_EVT  ", "parser": Parse_ALARM_EVT, "record": Record_ALARM_EVT},
+    {"name": "MCU_RESET  ", "parser": Parse_MCU_RESET, "record": Record_MCU_RESET},
+    {"name": "RESERVED1", "parser": {}, "record": None},
+    {"name": "ALARM_WRITE  ", "parser": Parse_ALARM_EVT, "record": Record_ALARM_EVT},
 ]
 
 LOG_ENABLE_LIST = [
@@ -399,106 +501,216 @@ def GetDateTime(buf):
     return ts
 
 
-def GetPiJuiceLog(ifs):
-    logStrOut = []
-    # end = False
-    # i = 0
+def GetLogRecord(data):
+    t = GetDateTime(data[2:])
+    rec = {
+        "index": data[0],
+        "event": LOG_MSG_DEFS[data[1]]["name"].strip(),
+        "time": t.isoformat() if isinstance(t, datetime.datetime) else None,
+    }
+    if LOG_MSG_DEFS[data[1]]["record"]:
+        rec.update(LOG_MSG_DEFS[data[1]]["record"](data))
+    else:
+        rec["raw"] = list(data[0:LOG_MSG_FRAME_SIZE])
+    return rec
+
+
+def GetPiJuiceLogFrames(ifs):
+    frames = []
     while True:
         ret = ifs.ReadData(LOGGING_CMD, 31)
         if ret["error"] == "NO_ERROR":
             if ret["data"][1] == 0:
-                return {"data": logStrOut, "error": "NO_ERROR"}
-
-            s = LOG_MSG_DEFS[ret["data"][1]]["parser"](ret["data"])
-            logStrOut.insert(0, s)
-            # print(s)
-
-            time.sleep(0.01)
+                return {"data": frames, "error": "NO_ERROR"}
+            frames.insert(0, ret["data"])
         else:  # elif ret['error'] == 'COMMUNICATION_ERROR':
-            print(ret)
             return ret
-"""
-if __name__ == "__main__":
-    ifs = PiJuiceInterface(1,0x14)
 
-    if '--enable' in sys.argv:
-        ci = sys.argv.index('--enable')+1
-        cfgList = []
-        if len(sys.argv) > ci:
-            cfgList = sys.argv[ci].split('|')
-        else:
-            print('Missing parameter')
-            exit(-1)
-        config = 0x00
-        for i in range(0, len(LOG_ENABLE_LIST)):
-            if (LOG_ENABLE_LIST[i] in cfgList):
-                config |= 0x01<<i
-        if config == 0x00:
-            print('Invalid parameter')
-            exit(-1)
-        ifs.WriteData(LOGGING_CMD, [0x01, config])
-        time.sleep(0.1)
-        ret = ifs.ReadData(LOGGING_CMD, 31)
-        if ret['error'] == 'NO_ERROR':
-            d = ret['data']
-            if d[1] == 0 and d[2] == 0x01 and d[3] == config:
-                print ('Log enable configured successfully', hex(config))
-                exit(0)
-            else:
-                print ('Failed to configure log enable', hex(config), d)
-                exit(-1)
 
-    if '--get_config' in sys.argv:
-        ifs.WriteData(LOGGING_CMD, [0x02])
-        time.sleep(0.1)
-        ret = ifs.ReadData(LOGGING_CMD, 31)
-        if ret['error'] == 'NO_ERROR' and ret['data'][1]==0 and ret['data'][2]==1:
-            msk = 0x01
-            strOut = ''
-            #print(ret['data'][3])
-            for i in range(0, 7):
-                if msk&ret['data'][3]: strOut += ('|'if strOut else '') + LOG_ENABLE_LIST[i]
-                msk <<= 1
-            print(strOut)
-            exit(0)
-        else:
-            print(ret)
-            exit(-1)
-        exit(0)
+def GetPiJuiceLog(ifs):
+    ret = GetPiJuiceLogFrames(ifs)
+    if ret["error"] != "NO_ERROR":
+        print(ret)
+        return ret
+    logStrOut = [LOG_MSG_DEFS[d[1]]["parser"](d) for d in ret["data"]]
+    return {"data": logStrOut, "error": "NO_ERROR"}
+
+
+def IsLogConfigResponse(data):
+    return data[1] == 0 and data[2] == 1
+
+
+def LogRequest(ifs, request, valid=IsLogConfigResponse, deadline=LOG_CONFIG_DEADLINE):
+    # write request and poll read-back until valid() accepts response header
+    end = time.monotonic() + deadline
+    delay = LOG_POLL_MIN_DELAY
+    with ifs.bus_lock:
+        written = False
+        while True:
+            if not written:
+                ret = ifs.WriteData(LOGGING_CMD, request)
+                written = ret["error"] == "NO_ERROR"
+            if written:
+                time.sleep(delay)
+                ret = ifs.ReadData(LOGGING_CMD, 31)
+                if ret["error"] == "NO_ERROR":
+                    if valid(ret["data"]):
+                        return ret
+                    ret = {"data": ret["data"], "error": "INVALID_RESPONSE"}
+            if time.monotonic() + delay > end:
+                return ret
+            if not written:
+                time.sleep(delay)
+            delay = min(delay * 2, LOG_POLL_MAX_DELAY)
+
+
+def GetLogConfig(ifs):
+    ret = LogRequest(ifs, [0x02])
+    if ret["error"] != "NO_ERROR":
+        return ret
+    return {"data": [LOG_ENABLE_LIST[i] for i in range(0, 7) if ret["data"][3] & (0x01 << i)], "error": "NO_ERROR"}
+
+
+def SetLogConfig(ifs, cfgList):
+    config = 0x00
+    for i in range(0, len(LOG_ENABLE_LIST)):
+        if LOG_ENABLE_LIST[i] in cfgList:
+            config |= 0x01 << i
+    ret = LogRequest(ifs, [0x01, config], lambda d: IsLogConfigResponse(d) and d[3] == config)
+    if ret["error"] != "NO_ERROR":
+        return ret
+    return {"data": config, "error": "NO_ERROR"}
+
+
+def ReadPiJuiceLogFrames(ifs, deadline=LOG_READ_DEADLINE):
+    # whole read sequence holds bus lock so that other users of interface do not interleave,
+    # frame read failure restarts log read with backoff until deadline
+    end = time.monotonic() + deadline
+    delay = LOG_POLL_MIN_DELAY
+    with ifs.bus_lock:
+        while True:
+            ret = ifs.WriteData(LOGGING_CMD, [0])
+            if ret["error"] == "NO_ERROR":
+                ret = GetPiJuiceLogFrames(ifs)
+                if ret["error"] == "NO_ERROR":
+                    return ret
+            if time.monotonic() + delay > end:
+                return ret
+            time.sleep(delay)
+            delay = min(delay * 2, LOG_POLL_MAX_DELAY)
+
+
+def ReadPiJuiceLog(ifs):
+    ret = ReadPiJuiceLogFrames(ifs)
+    if ret["error"] != "NO_ERROR":
+        return ret
+    return {"data": [LOG_MSG_DEFS[d[1]]["parser"](d) for d in ret["data"]], "error": "NO_ERROR"}
+
+
+def FrameTime(data):
+    t = GetDateTime(data[2:])
+    return t if isinstance(t, datetime.datetime) else None
+
+
+def SinceTime(value):
+    # HAT RTC is kept in UTC, aware timestamps are compared as naive UTC
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    t = datetime.datetime.fromisoformat(value)
+    if t.tzinfo is not None:
+        t = t.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return t
+
+
+def FollowPiJuiceLog(ifs, interval, emit, since=None, polls=None):
+    # log buffer is circular, frames seen in previous poll are not emitted again
+    seen = set()
+    n = 0
+    while polls is None or n < polls:
+        if n > 0:
+            time.sleep(interval)
+        n += 1
+        ret = ReadPiJuiceLogFrames(ifs)
+        if ret["error"] != "NO_ERROR":
+            continue
+        current = set()
+        for data in ret["data"]:
+            key = bytes(data[0:LOG_MSG_FRAME_SIZE])
+            current.add(key)
+            if key in seen:
+                continue
+            if since is not None:
+                t = FrameTime(data)
+                if t is None or t < since:
+                    continue
+            emit(data)
+        seen = current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read PiJuice log, firmware version >= 1.6")
+    parser.add_argument("file", nargs="?", help="append messages to file")
+    parser.add_argument("--enable", metavar="LIST", help="'|' separated list of " + "|".join(LOG_ENABLE_LIST))
+    parser.add_argument("--disable", action="store_true")
+    parser.add_argument("--get_config", action="store_true")
+    parser.add_argument("--follow", action="store_true", help="poll log and emit new entries only")
+    parser.add_argument("--interval", type=float, default=10.0, help="follow poll interval, s")
+    parser.add_argument("--jsonl", action="store_true", help="emit one JSON record per line")
+    parser.add_argument("--since", type=SinceTime, help="skip entries older than ISO timestamp")
+    parser.add_argument("--bus", type=int, default=1)
+    parser.add_argument("--address", type=lambda x: int(x, 0), default=0x14)
+    args = parser.parse_args(argv)
+
+    ifs = PiJuiceInterface(args.bus, args.address)
+
+    if args.enable is not None or args.disable:
+        cfgList = args.enable.split("|") if args.enable is not None else []
+        if not args.disable and not any(c in LOG_ENABLE_LIST for c in cfgList):
+            print("Invalid parameter")
+            return -1
+        ret = SetLogConfig(ifs, cfgList)
+        if ret["error"] == "NO_ERROR":
+            print("Log enable configured successfully", hex(ret["data"]))
+            return 0
+        print("Failed to configure log enable", ret)
+        return -1
 
-    if '--disable' in sys.argv:
-        ifs.WriteData(LOGGING_CMD, [0x01, 0x00])
-        time.sleep(0.1)
-        ret = ifs.ReadData(LOGGING_CMD, 31)
-        if ret['error'] == 'NO_ERROR':
-            d = ret['data']
-            if d[1] == 0 and d[2] == 0x01 and d[3] == 0x00:
-                print ('Logging disabled successfully')
-                exit(0)
-            else:
-                print ('Failed to disable logging')
-                exit(-1)
-
-    ifs.WriteData(LOGGING_CMD, [0])
-    time.sleep(0.01)
-    ret = GetPiJuiceLog(ifs)
-    if ret['error'] != 'NO_ERROR':
-        time.sleep(0.5)
-        ifs.WriteData(LOGGING_CMD, [0])
-        time.sleep(0.01)
-        ret = GetPiJuiceLog(ifs)
-
-    if ret['error'] == 'NO_ERROR':
-        if len(sys.argv)>1:
-            fp = sys.argv[1]
-            #print(fp)
-            with open(fp, 'a') as file:
-                for s in (ret['data']):
-                    file.write(s+'\n')
+    if args.get_config:
+        ret = GetLogConfig(ifs)
+        if ret["error"] == "NO_ERROR":
+            print("|".join(ret["data"]))
+            return 0
+        print(ret)
+        return -1
+
+    file = open(args.file, "a") if args.file else sys.stdout
+
+    def emit(data):
+        if args.jsonl:
+            file.write(json.dumps(GetLogRecord(data)) + "\n")
         else:
-            for s in (ret['data']):
-                print(s)
-    else:
-        print ('failed to read log')
-        exit(-1)
-"""
+            file.write(LOG_MSG_DEFS[data[1]]["parser"](data) + "\n")
+        file.flush()
+
+    try:
+        if args.follow:
+            FollowPiJuiceLog(ifs, args.interval, emit, args.since)
+            return 0
+        ret = ReadPiJuiceLogFrames(ifs)
+        if ret["error"] != "NO_ERROR":
+            print("failed to read log")
+            return -1
+        for data in ret["data"]:
+            if args.since is not None and (FrameTime(data) is None or FrameTime(data) < args.since):
+                continue
+            emit(data)
+        return 0
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if file is not sys.stdout:
+            file.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""The PiJuPS HAT integration - sampling profiler of integration code in HAT executor and event loop threads."""
+
+from __future__ import annotations
+
+from collections import Counter
+import logging
+import os
+import sys
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILER_INTERVAL = 0.005
+PROFILER_REPORT_TOP = 30
+PROFILER_SUMMARY_TOP = 5
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def frame_function(frame):
+    """Return 'module.py:Class.function' of frame."""
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+class SamplingProfiler:
+    """Periodically sample stacks of all threads, only samples with integration code on stack are counted.
+
+    Own count goes to innermost integration function (time spent in it or in library/bus code it
+    called), cumulative count to every integration function on stack. Nothing is hooked, so there
+    is no cost outside run().
+    """
+
+    def __init__(self, interval=PROFILER_INTERVAL, loop_thread_id=None, package_dir=PACKAGE_DIR) -> None:
+        """Initialize counters."""
+        self.interval = interval
+        self.loop_thread_id = loop_thread_id
+        self.package_dir = package_dir
+        self.own = Counter()
+        self.cumulative = Counter()
+        self.threads = Counter()
+        self.samples = 0
+        self.active_samples = 0
+        self.cycles = 0
+        self.stop_event = threading.Event()
+
+    def sample(self):
+        """Take one sample of all threads except profiler thread."""
+        self.samples += 1
+        own_thread = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if thread_id == own_thread:
+                continue
+            innermost = None
+            functions = set()
+            while frame is not None:
+                if frame.f_code.co_filename.startswith(self.package_dir):
+                    function = frame_function(frame)
+                    if innermost is None:
+                        innermost = function
+                    functions.add(function)
+                frame = frame.f_back
+            if innermost is None:
+                continue
+            self.active_samples += 1
+            self.own[innermost] += 1
+            self.cumulative.update(functions)
+            self.threads["event_loop" if thread_id == self.loop_thread_id else "executor"] += 1
+
+    def run(self, duration, cycles=None, cycle_marker=None):
+        """Sample until duration elapsed, cycles poll cycles seen (cycle_marker value changes) or stopped."""
+        started = time.monotonic()
+        deadline = started + duration
+        marker = cycle_marker() if cycle_marker is not None else None
+        next_sample = started
+        while not self.stop_event.is_set():
+            self.sample()
+            if cycle_marker is not None:
+                current = cycle_marker()
+                if current != marker:
+                    marker = current
+                    self.cycles += 1
+                    if cycles is not None and self.cycles >= cycles:
+                        break
+            next_sample += self.interval
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if next_sample < now:
+                next_sample = now
+            self.stop_event.wait(min(next_sample, deadline) - now)
+        elapsed = time.monotonic() - started
+        stats = {
+            "elapsed_s": round(elapsed, 3),
+            "samples": self.samples,
+            "active_samples": self.active_samples,
+            "cycles": self.cycles,
+            "threads": dict(self.threads),
+            "top": self.top(PROFILER_SUMMARY_TOP),
+        }
+        _LOGGER.debug("Profiler completed: %s", stats)
+        return stats
+
+    def stop(self):
+        """Request profiling stop."""
+        self.stop_event.set()
+
+    def top(self, count):
+        """Return most frequent functions by own samples as function -> share of all samples in %."""
+        return {
+            function: round(100 * hits / self.samples, 2) if self.samples else 0.0
+            for function, hits in self.own.most_common(count)
+        }
+
+    def write_report(self, file_name, stats):
+        """Write text report with own and cumulative sample counts."""
+        total = max(self.samples, 1)
+        lines = [
+            f"PiJups sampling profile, {stats['elapsed_s']} s, {self.samples} samples every "
+            f"{self.interval * 1000:g} ms, {self.cycles} poll cycles",
+            f"Samples with integration code on stack: {self.active_samples} {dict(self.threads)}",
+            "",
+            f"{'own':>8} {'own %':>7} {'cum':>8} {'cum %':>7}  function",
+        ]
+        for function, hits in self.own.most_common(PROFILER_REPORT_TOP):
+            cumulative = self.cumulative[function]
+            lines.append(
+                f"{hits:8d} {100 * hits / total:7.2f} "
+                f"{cumulative:8d} {100 * cumulative / total:7.2f}  {function}"
+            )
+        lines.append("")
+        lines.append("Cumulative (function or its callees on stack)")
+        for function, hits in self.cumulative.most_common(PROFILER_REPORT_TOP):
+            lines.append(f"{hits:8d} {100 * hits / total:7.2f}  {function}")
+        with open(file_name, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
@@ -0,0 +1,150 @@
+"""The PiJuPS HAT integration - HAT register snapshots and shadow cache."""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from .pijuice import PiJuiceConfig, PiJuicePower, PiJuiceRtcAlarm, PiJuiceStatus
+
+_LOGGER = logging.getLogger(__name__)
+
+# register read-back polling: doubling back-off between reads until deadline
+POLL_MIN_DELAY = 0.005
+POLL_MAX_DELAY = 0.05
+POLL_DEADLINE = 0.5
+
+SECTION_STATUS = "status"
+SECTION_CONFIG = "configuration"
+
+# registers read by snapshot, ordered by priority within read burst; volatile registers are
+# always read from device, others are served from shadow cache while not invalidated by writes
+REGISTERS = [
+    {"name": "status", "cmd": PiJuiceStatus.STATUS_CMD, "length": 1, "section": SECTION_STATUS, "volatile": True},
+    {"name": "faults", "cmd": PiJuiceStatus.FAULT_EVENT_CMD, "length": 1, "section": SECTION_STATUS, "volatile": True},
+    {"name": "buttons", "cmd": PiJuiceStatus.BUTTON_EVENT_CMD, "length": 2, "section": SECTION_STATUS, "volatile": True},
+    {"name": "eeprom_address", "cmd": PiJuiceConfig.ID_EEPROM_ADDRESS_CMD, "length": 1, "section": SECTION_CONFIG},
+    {"name": "profile_id", "cmd": PiJuiceConfig.BATTERY_PROFILE_ID_CMD, "length": 1, "section": SECTION_CONFIG},
+    {"name": "profile", "cmd": PiJuiceConfig.BATTERY_PROFILE_CMD, "length": 14, "section": SECTION_CONFIG, "invalidated_by": [PiJuiceConfig.BATTERY_PROFILE_ID_CMD]},
+    {"name": "ext_profile", "cmd": PiJuiceConfig.BATTERY_EXT_PROFILE_CMD, "length": 17, "section": SECTION_CONFIG, "invalidated_by": [PiJuiceConfig.BATTERY_PROFILE_ID_CMD]},
+    {"name": "power_inputs", "cmd": PiJuiceConfig.POWER_INPUTS_CONFIG_CMD, "length": 1, "section": SECTION_CONFIG},
+    {"name": "regulator", "cmd": PiJuiceConfig.POWER_REGULATOR_CONFIG_CMD, "length": 1, "section": SECTION_CONFIG},
+    {"name": "run_pin", "cmd": PiJuiceConfig.RUN_PIN_CONFIG_CMD, "length": 1, "section": SECTION_CONFIG},
+    {"name": "sw1", "cmd": PiJuiceConfig.BUTTON_CONFIGURATION_CMD, "length": 12, "section": SECTION_CONFIG},
+    {"name": "sw2", "cmd": PiJuiceConfig.BUTTON_CONFIGURATION_CMD + 1, "length": 12, "section": SECTION_CONFIG},
+    {"name": "sw3", "cmd": PiJuiceConfig.BUTTON_CONFIGURATION_CMD + 2, "length": 12, "section": SECTION_CONFIG},
+    {"name": "power_off", "cmd": PiJuicePower.POWER_OFF_CMD, "length": 1, "section": SECTION_CONFIG},
+    {"name": "wakeup_on_charge", "cmd": PiJuicePower.WAKEUP_ON_CHARGE_CMD, "length": 1, "section": SECTION_CONFIG},
+    {"name": "system_switch", "cmd": PiJuicePower.SYSTEM_POWER_SWITCH_CTRL_CMD, "length": 1, "section": SECTION_CONFIG},
+]
+
+
+class RegisterCache:
+    """Shadow copy of HAT configuration registers, entries are dropped on register writes."""
+
+    def __init__(self, interface) -> None:
+        """Initialize cache and subscribe to interface writes."""
+        self.interface = interface
+        self.registers = {}
+        interface.write_listeners.append(self.invalidate)
+
+    def get(self, cmd):
+        """Get cached register data, None if not cached."""
+        return self.registers.get(cmd)
+
+    def put(self, cmd, data):
+        """Store register data."""
+        self.registers[cmd] = list(data)
+
+    def invalidate(self, cmd=None):
+        """Drop register written (and registers depending on it), all registers if cmd is None."""
+        if cmd is None or cmd == PiJuiceConfig.RESET_TO_DEFAULT_CMD:
+            self.registers.clear()
+            return
+        self.registers.pop(cmd, None)
+        for reg in REGISTERS:
+            if cmd in reg.get("invalidated_by", []):
+                self.registers.pop(reg["cmd"], None)
+
+
+class SnapshotInterface:
+    """PiJuiceInterface look-alike serving reads from snapshot data, lets PiJuice API decode registers."""
+
+    def __init__(self, registers) -> None:
+        """Initialize with cmd->data dictionary."""
+        self.registers = registers
+
+    def ReadData(self, cmd, length):
+        """Return snapshot register data in PiJuice API format."""
+        data = self.registers.get(cmd)
+        if data is None or len(data) < length:
+            return {"error": "COMMUNICATION_ERROR"}
+        return {"data": list(data[0:length]), "error": "NO_ERROR"}
+
+
+class RegisterSnapshot:
+    """Registers read in one bus lock held burst with PiJuice API decoders bound to result."""
+
+    def __init__(self, registers, timing, failed) -> None:
+        """Initialize snapshot and decoders."""
+        self.registers = registers
+        self.timing = timing
+        self.failed = failed
+        interface = SnapshotInterface(registers)
+        self.status = PiJuiceStatus(interface)
+        self.config = PiJuiceConfig(interface)
+        self.power = PiJuicePower(interface)
+        self.rtcalarm = PiJuiceRtcAlarm(interface)
+
+
+def read_register_snapshot(interface, cache: RegisterCache | None, registers=None):
+    """Read registers in priority order holding bus lock, failed reads get single retry pass, no caching if cache is None."""
+    registers = REGISTERS if registers is None else registers
+    data = {}
+    timing = {}
+    pending = []
+    with interface.bus_lock:
+        for reg in registers:
+            started = time.monotonic()
+            cached = None if reg.get("volatile") or cache is None else cache.get(reg["cmd"])
+            if cached is not None:
+                data[reg["cmd"]] = cached
+            else:
+                ret = interface.ReadData(reg["cmd"], reg["length"])
+                if ret["error"] == "NO_ERROR":
+                    data[reg["cmd"]] = ret["data"]
+                    if not reg.get("volatile") and cache is not None:
+                        cache.put(reg["cmd"], ret["data"])
+                else:
+                    pending.append(reg)
+            timing[reg["section"]] = timing.get(reg["section"], 0) + time.monotonic() - started
+        started = time.monotonic()
+        failed = []
+        for reg in pending:
+            ret = interface.ReadData(reg["cmd"], reg["length"])
+            if ret["error"] == "NO_ERROR":
+                data[reg["cmd"]] = ret["data"]
+                if not reg.get("volatile") and cache is not None:
+                    cache.put(reg["cmd"], ret["data"])
+            else:
+                failed.append(reg["name"])
+        if pending:
+            timing["retry"] = time.monotonic() - started
+    _LOGGER.debug("read_register_snapshot failed=%s timing=%s", failed, timing)
+    return RegisterSnapshot(data, timing, failed)
+
+
+def poll_register(interface, cmd, length, check, deadline=POLL_DEADLINE):
+    """Read register with short doubling back-off until check(data) passes, replaces fixed settle sleeps."""
+    deadline = time.monotonic() + deadline
+    delay = POLL_MIN_DELAY
+    while True:
+        ret = interface.ReadData(cmd, length)
+        if ret["error"] == "NO_ERROR":
+            if check(ret["data"]):
+                return ret
+            ret = {"error": "WRITE_FAILED"}
+        if time.monotonic() + delay > deadline:
+            return ret
+        time.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_DELAY)
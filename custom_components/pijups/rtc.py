@@ -0,0 +1,157 @@
+"""The PiJuPS HAT integration - drift aware HAT RTC synchronisation."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import UTC
+import logging
+import time
+
+from .const import DEFAULT_RTC_DRIFT_THRESHOLD
+from .pijuice import PiJuiceRtcAlarm
+from .registers import poll_register
+
+_LOGGER = logging.getLogger(__name__)
+
+# write read-back polling deadline, replaces SetTime fixed 200 ms sleep
+RTC_VERIFY_DEADLINE = 0.5
+# drift rate is reported only if measured over at least this span, RTC resolution is 1 s
+RTC_DRIFT_RATE_MIN_SPAN = 3600
+RTC_TIME_LENGTH = 9
+
+BCD = [((value // 10) << 4) | (value % 10) for value in range(100)]
+
+
+def from_bcd(value, mask=0xFF):
+    """Convert BCD register field to int."""
+    value &= mask
+    return (value >> 4) * 10 + (value & 0x0F)
+
+
+def encode_rtc_time(when: datetime):
+    """Build RTC time register image for UTC time, 24h format, no daylight saving adjustments."""
+    return [
+        BCD[when.second],
+        BCD[when.minute],
+        BCD[when.hour],
+        (when.weekday() + 1) % 7 + 1,
+        BCD[when.day],
+        BCD[when.month],
+        BCD[when.year - 2000],
+        0,
+        0,
+    ]
+
+
+def decode_rtc_time(data):
+    """Convert RTC time register image to UTC datetime, None if register holds invalid time."""
+    hour = data[2]
+    if hour & 0x40:  # 12h format
+        hour = from_bcd(hour, 0x1F) % 12 + (12 if hour & 0x20 else 0)
+    else:
+        hour = from_bcd(hour, 0x3F)
+    try:
+        return datetime(
+            from_bcd(data[6]) + 2000,
+            from_bcd(data[5], 0x1F),
+            from_bcd(data[4], 0x3F),
+            hour,
+            from_bcd(data[1], 0x7F),
+            from_bcd(data[0], 0x7F),
+            tzinfo=UTC,
+        )
+    except ValueError:
+        return None
+
+
+class RtcSync:
+    """HAT RTC synchronisation: measure drift first, write aligned to second boundary only if needed."""
+
+    def __init__(self, interface, threshold=DEFAULT_RTC_DRIFT_THRESHOLD) -> None:
+        """Initialize synchronisation state."""
+        self.interface = interface
+        self.threshold = threshold
+        self.drift = None
+        self.drift_rate = None
+        self.reference = None  # (host time, drift) drift rate is measured from
+        self.measured_at = None
+        self.synced_at = None
+        self.writes = 0
+
+    def measure(self):
+        """Read RTC and return drift (RTC - host) in seconds, None if RTC not readable or invalid."""
+        with self.interface.bus_lock:
+            before = time.time()
+            ret = self.interface.ReadData(PiJuiceRtcAlarm.RTC_TIME_CMD, RTC_TIME_LENGTH)
+            after = time.time()
+        if ret["error"] != "NO_ERROR":
+            _LOGGER.debug("RTC read failed: %s", ret["error"])
+            return None
+        rtc_time = decode_rtc_time(ret["data"])
+        if rtc_time is None:
+            return None
+        # RTC is read with 1 s resolution, take middle of second as estimate
+        host_time = datetime.fromtimestamp((before + after) / 2, UTC)
+        return (rtc_time - host_time).total_seconds() + 0.5
+
+    def write_aligned(self):
+        """Write host time at next second boundary, verify by polling read-back."""
+        now = time.time()
+        boundary = int(now) + 1
+        data = encode_rtc_time(datetime.fromtimestamp(boundary, UTC))
+        time.sleep(boundary - now)
+        with self.interface.bus_lock:
+            ret = self.interface.WriteData(PiJuiceRtcAlarm.RTC_TIME_CMD, data)
+            if ret["error"] != "NO_ERROR":
+                return ret
+            return self.verify(data)
+
+    def verify(self, data):
+        """Poll RTC until it reports written time (seconds may have advanced by one)."""
+        written = decode_rtc_time(data)
+
+        def check(read):
+            rtc_time = decode_rtc_time(read)
+            return rtc_time is not None and 0 <= (rtc_time - written).total_seconds() <= 1
+
+        ret = poll_register(
+            self.interface, PiJuiceRtcAlarm.RTC_TIME_CMD, RTC_TIME_LENGTH, check, RTC_VERIFY_DEADLINE
+        )
+        return {"error": ret["error"]}
+
+    def sync(self, force=False):
+        """Measure drift and correct RTC if drift exceeds threshold (or forced), returns API style result."""
+        drift = self.measure()
+        now = datetime.now(UTC)
+        if drift is not None:
+            self.drift = drift
+            self.measured_at = now
+            if self.reference is None:
+                self.reference = (now, drift)
+            else:
+                span = (now - self.reference[0]).total_seconds()
+                if span >= RTC_DRIFT_RATE_MIN_SPAN:
+                    self.drift_rate = (drift - self.reference[1]) / span * 86400
+        if not force and drift is not None and abs(drift) <= self.threshold:
+            _LOGGER.debug("RTC drift %.1f s within threshold, not written", drift)
+            return {"data": {"drift": drift, "written": False}, "error": "NO_ERROR"}
+        ret = self.write_aligned()
+        if ret["error"] != "NO_ERROR":
+            _LOGGER.warning("RTC synchronisation failed: %s", ret["error"])
+            return ret
+        self.writes += 1
+        self.synced_at = datetime.now(UTC)
+        # drift rate continues to be measured from corrected clock
+        self.reference = (self.synced_at, 0.0)
+        _LOGGER.debug("RTC synchronised, drift was %s s", drift)
+        return {"data": {"drift": drift, "written": True}, "error": "NO_ERROR"}
+
+    def get_diagnostics(self):
+        """Return synchronisation state for diagnostics."""
+        return {
+            "drift, s": None if self.drift is None else round(self.drift, 1),
+            "drift rate, s/day": None if self.drift_rate is None else round(self.drift_rate, 2),
+            "measured at": None if self.measured_at is None else self.measured_at.isoformat(),
+            "synchronised at": None if self.synced_at is None else self.synced_at.isoformat(),
+            "writes": self.writes,
+        }
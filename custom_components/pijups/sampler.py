@@ -0,0 +1,134 @@
+"""The PiJuPS HAT integration - high-rate battery sampling for battery characterisation."""
+
+from __future__ import annotations
+
+from array import array
+import csv
+import logging
+import math
+import threading
+import time
+
+from .const import SAMPLER_MAX_DURATION, SAMPLER_MAX_RATE
+from .pijuice import PiJuiceStatus
+
+_LOGGER = logging.getLogger(__name__)
+
+SAMPLER_MAX_SAMPLES = SAMPLER_MAX_RATE * SAMPLER_MAX_DURATION
+SAMPLER_CSV_HEADER = ["time_s", "battery_voltage_mv", "battery_current_ma"]
+
+
+class RingBuffer:
+    """Fixed capacity sample store backed by typed arrays, oldest samples are overwritten when full."""
+
+    def __init__(self, capacity) -> None:
+        """Preallocate arrays."""
+        self.capacity = capacity
+        self.times = array("d", [0.0]) * capacity
+        self.voltages = array("l", [0]) * capacity
+        self.currents = array("l", [0]) * capacity
+        self.count = 0
+
+    def append(self, timestamp, voltage, current):
+        """Store sample in O(1)."""
+        index = self.count % self.capacity
+        self.times[index] = timestamp
+        self.voltages[index] = voltage
+        self.currents[index] = current
+        self.count += 1
+
+    def __len__(self) -> int:
+        """Return number of samples held."""
+        return min(self.count, self.capacity)
+
+    def __iter__(self):
+        """Iterate samples oldest first."""
+        start = self.count - len(self)
+        for position in range(start, self.count):
+            index = position % self.capacity
+            yield self.times[index], self.voltages[index], self.currents[index]
+
+
+def decode_current(data):
+    """Convert battery current register to signed mA."""
+    current = (data[1] << 8) | data[0]
+    return current - (1 << 16) if current & (1 << 15) else current
+
+
+class Sampler:
+    """Battery voltage/current sampler on fixed schedule (absolute deadlines, no cumulative drift)."""
+
+    def __init__(self, interface, rate, duration) -> None:
+        """Initialize sampler, buffer holds at most SAMPLER_MAX_SAMPLES."""
+        self.interface = interface
+        self.rate = rate
+        self.duration = duration
+        self.buffer = RingBuffer(min(int(rate * duration), SAMPLER_MAX_SAMPLES))
+        self.errors = 0
+        self.stop_event = threading.Event()
+
+    def read_sample(self):
+        """Read battery voltage and current, bus lock is held per sample only."""
+        with self.interface.bus_lock:
+            voltage = self.interface.ReadData(PiJuiceStatus.BATTERY_VOLTAGE_CMD, 2)
+            current = self.interface.ReadData(PiJuiceStatus.BATTERY_CURRENT_CMD, 2)
+        if voltage["error"] != "NO_ERROR" or current["error"] != "NO_ERROR":
+            return None
+        return (voltage["data"][1] << 8) | voltage["data"][0], decode_current(current["data"])
+
+    def run(self):
+        """Sample until duration elapsed or stopped, returns achieved rate and jitter statistics."""
+        period = 1.0 / self.rate
+        samples = int(self.rate * self.duration)
+        started = time.monotonic()
+        previous = None
+        intervals = 0
+        interval_sum = 0.0
+        interval_sq_sum = 0.0
+        max_interval = 0.0
+        for number in range(samples):
+            delay = started + number * period - time.monotonic()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+            if self.stop_event.is_set():
+                break
+            now = time.monotonic()
+            sample = self.read_sample()
+            if sample is None:
+                self.errors += 1
+                continue
+            self.buffer.append(now - started, *sample)
+            if previous is not None:
+                interval = now - previous
+                intervals += 1
+                interval_sum += interval
+                interval_sq_sum += interval * interval
+                max_interval = max(max_interval, interval)
+            previous = now
+        elapsed = time.monotonic() - started
+        mean = interval_sum / intervals if intervals else 0.0
+        jitter = math.sqrt(max(interval_sq_sum / intervals - mean * mean, 0.0)) if intervals else 0.0
+        stats = {
+            "requested_rate": self.rate,
+            "achieved_rate": round(intervals / interval_sum, 2) if interval_sum else 0.0,
+            "jitter_ms": round(jitter * 1000, 3),
+            "max_interval_ms": round(max_interval * 1000, 3),
+            "samples": self.buffer.count,
+            "stored": len(self.buffer),
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 3),
+        }
+        _LOGGER.debug("Sampler completed: %s", stats)
+        return stats
+
+    def stop(self):
+        """Request sampling stop."""
+        self.stop_event.set()
+
+    def dump_csv(self, file_name):
+        """Write buffered samples to CSV file."""
+        with open(file_name, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(SAMPLER_CSV_HEADER)
+            for timestamp, voltage, current in self.buffer:
+                writer.writerow([f"{timestamp:.6f}", voltage, current])
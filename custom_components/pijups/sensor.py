@@ -1,6 +1,7 @@
 """The PiJuPS HAT integration - sensor platform implementation."""
 
 from dataclasses import dataclass
+from datetime import timedelta
 import logging
 from typing import Any
 
@@ -22,9 +23,12 @@ from homeassistant.const import (
     EVENT_HOMEASSISTANT_STOP,
     PERCENTAGE,
     RESTART_EXIT_CODE,
+    Platform,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
+    UnitOfPower,
     UnitOfTemperature,
+    UnitOfTime,
 )
 from homeassistant.components.homeassistant.const import (
     SERVICE_HOMEASSISTANT_RESTART,
@@ -33,28 +37,38 @@ from homeassistant.components.homeassistant.const import (
 from homeassistant.core import DOMAIN as HOMEASSISTANT_DOMAIN, Event, HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 
 from .const import (
     BASE,
     CONF_UPS_DELAY,
     CONF_UPS_WAKEON_DELTA,
     DEFAULT_FAST_SCAN_COUNT,
+    DEFAULT_RTC_SYNC_INTERVAL,
     DEFAULT_SLOW_SCAN_COUNT,
     DOMAIN,
     PIJU_SENSOR_BATTERY_CURRENT,
+    PIJU_SENSOR_BATTERY_POWER,
     PIJU_SENSOR_BATTERY_STATUS,
     PIJU_SENSOR_BATTERY_VOLTAGE,
     PIJU_SENSOR_CHARGE,
+    PIJU_SENSOR_DISCHARGE_CURRENT,
     PIJU_SENSOR_EXTERNAL_POWER,
     PIJU_SENSOR_IO_CURRENT,
     PIJU_SENSOR_IO_VOLTAGE,
     PIJU_SENSOR_POWER_INPUT_IO_STATUS,
     PIJU_SENSOR_POWER_INPUT_STATUS,
     PIJU_SENSOR_TEMPERATURE,
+    PIJU_SENSOR_TIME_TO_EMPTY,
+    PIJU_SENSOR_TIME_TO_FULL,
     SENSOR_ENTITY,
+    WATCHDOG_CHECKS_PER_PERIOD,
 )
 from .interface import PiJups, bat_status_enum, power_in_status_enum
+from .io_pins import PiJuiceIoPinEntity, async_get_io_pins
+from .loopwatch import watch_loop
 from .pijuice import PiJuiceStatus
+from .stats import STATS_ATTRIBUTES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -95,6 +109,7 @@ EXTERNAL_POWER_STATUS_ICON_DICT = dict(
 )
 
 
+@watch_loop
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -112,10 +127,20 @@ async def async_setup_entry(
     hass.data[DOMAIN][config_entry.entry_id][SENSOR_ENTITY] = sensors
     async_add_entities(sensors, True)
     _LOGGER.debug("async_setup_entry %s sensors added", len(sensors))
+    async_add_entities(
+        [
+            PiJuiceSensor(hass, config_entry, sensor)
+            for sensor in PiJuiceSensor.ESTIMATOR_SENSOR_LIST
+        ],
+        True,
+    )
+    pins = await async_get_io_pins(hass, pijups, Platform.SENSOR)
+    async_add_entities([PiJuiceIoSensor(hass, config_entry, pin) for pin in pins], True)
 
     # flag array to track callback event types and decide if shutdown sequence execution is needed
     services_noticed = [False, False]
 
+    @watch_loop
     async def check_service_calls(event: Event) -> None:
         """Collect shutdown/re-start source information."""
         if (event.data.get(ATTR_DOMAIN) == HASSIO_DOMAIN) and (
@@ -132,6 +157,7 @@ async def async_setup_entry(
 
     hass.bus.async_listen(EVENT_CALL_SERVICE, check_service_calls)
 
+    @watch_loop
     async def process_ups_event(event: Event) -> None:
         """Process shutdown request."""
         _LOGGER.debug("homeassistant stop event received: %s", event)
@@ -161,6 +187,31 @@ async def async_setup_entry(
         _LOGGER.debug("homeassistant stop event processing completed")
 
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, process_ups_event)
+
+    @watch_loop
+    async def sync_rtc(_now) -> None:
+        """Keep HAT RTC accurate for wake-up alarms, written only if drifted."""
+        await hass.async_add_executor_job(pijups.sync_rtc)
+
+    config_entry.async_on_unload(
+        async_track_time_interval(
+            hass, sync_rtc, timedelta(seconds=DEFAULT_RTC_SYNC_INTERVAL)
+        )
+    )
+
+    @watch_loop
+    async def watchdog_heartbeat(_now) -> None:
+        """Kick HAT watchdog if status was not read by polling recently."""
+        await hass.async_add_executor_job(pijups.watchdog_heartbeat)
+
+    if pijups.watchdog_period:
+        config_entry.async_on_unload(
+            async_track_time_interval(
+                hass,
+                watchdog_heartbeat,
+                timedelta(minutes=pijups.watchdog_period / WATCHDOG_CHECKS_PER_PERIOD),
+            )
+        )
     await hass.async_add_executor_job(
         pijups.set_led_ha_active
     )  # set LED to indicate HA is running - set-up completed
@@ -181,11 +232,14 @@ class PiJuiceSensorEntityDescription(SensorEntityDescription):
     icon_callback: Any = None  # routine to get icon depending on sensor status
     value_callback: Any = None  # routine to get sensor native value
     update_frequency: int = None  # frquencey rate to update sensor value (1 - on each update, 2 - every 2nd time,...)
+    stats_channel: str = None  # telemetry channel with rolling window statistics exposed as state attributes
 
 
 class PiJuiceSensor(SensorEntity):
     """Implementation of PiJuiceUPS sensor."""
 
+    _unrecorded_attributes = frozenset(STATS_ATTRIBUTES)
+
     # sensor icon selection routines
     def get_battery_status_icon(self):
         """PiJuiceUPS."""
@@ -238,49 +292,37 @@ class PiJuiceSensor(SensorEntity):
 
     def get_charge(self):
         """PiJuiceUPS."""
-        charge = self._pijups.call_pijuice_with_error_check(
-            self._pijups.status.GetChargeLevel
-        )
+        charge = self._pijups.get_telemetry_value("GetChargeLevel")
         if charge is not None:
             self._attr_native_value = charge
 
     def get_temp(self):
         """PiJuiceUPS."""
-        temperature = self._pijups.call_pijuice_with_error_check(
-            self._pijups.status.GetBatteryTemperature
-        )
+        temperature = self._pijups.get_telemetry_value("GetBatteryTemperature")
         if temperature is not None:
             self._attr_native_value = temperature
 
     def get_battery_voltage(self):
         """Pi JuiceUPS ."""
-        voltage = self._pijups.call_pijuice_with_error_check(
-            self._pijups.status.GetBatteryVoltage
-        )
+        voltage = self._pijups.get_telemetry_value("GetBatteryVoltage")
         if voltage is not None:
             self._attr_native_value = voltage
 
     def get_io_voltage(self):
         """PiJuiceUPS."""
-        voltage = self._pijups.call_pijuice_with_error_check(
-            self._pijups.status.GetIoVoltage
-        )
+        voltage = self._pijups.get_telemetry_value("GetIoVoltage")
         if voltage is not None:
             self._attr_native_value = voltage
 
     def get_battery_current(self):
         """Pi JuiceUPS - get battery current value."""
-        current = self._pijups.call_pijuice_with_error_check(
-            self._pijups.status.GetBatteryCurrent
-        )
+        current = self._pijups.get_telemetry_value("GetBatteryCurrent")
         if current is not None:
             self._attr_native_value = current
 
     def get_io_current(self):
         """Pi JuiceUPS - get io current sensor value."""
-        current = self._pijups.call_pijuice_with_error_check(
-            self._pijups.status.GetIoCurrent
-        )
+        current = self._pijups.get_telemetry_value("GetIoCurrent")
         if current is not None:
             self._attr_native_value = current
 
@@ -290,6 +332,23 @@ class PiJuiceSensor(SensorEntity):
         if status is not None:
             self._attr_native_value = self._pijups.powered
 
+    # runtime estimates derived from telemetry, unknown while battery is idle
+    def get_battery_power(self):
+        """Pi JuiceUPS - get battery power (V x I) value."""
+        self._attr_native_value = self._pijups.get_estimate("power")
+
+    def get_discharge_current(self):
+        """Pi JuiceUPS - get smoothed battery current value."""
+        self._attr_native_value = self._pijups.get_estimate("discharge_current")
+
+    def get_time_to_empty(self):
+        """Pi JuiceUPS - get estimated minutes to empty battery."""
+        self._attr_native_value = self._pijups.get_estimate("time_to_empty")
+
+    def get_time_to_full(self):
+        """Pi JuiceUPS - get estimated minutes to full battery."""
+        self._attr_native_value = self._pijups.get_estimate("time_to_full")
+
     SENSOR_LIST = [
         PiJuiceSensorEntityDescription(
             name=PIJU_SENSOR_BATTERY_STATUS,
@@ -314,6 +373,7 @@ class PiJuiceSensor(SensorEntity):
             icon_callback=get_static_icon,
             value_callback=get_temp,
             update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+            stats_channel="GetBatteryTemperature",
         ),
         PiJuiceSensorEntityDescription(
             name=PIJU_SENSOR_POWER_INPUT_STATUS,
@@ -338,6 +398,7 @@ class PiJuiceSensor(SensorEntity):
             icon_callback=get_charge_icon,
             value_callback=get_charge,
             update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+            stats_channel="GetChargeLevel",
         ),
         PiJuiceSensorEntityDescription(
             name=PIJU_SENSOR_BATTERY_VOLTAGE,
@@ -349,6 +410,7 @@ class PiJuiceSensor(SensorEntity):
             icon_callback=get_static_icon,
             value_callback=get_battery_voltage,
             update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+            stats_channel="GetBatteryVoltage",
         ),
         PiJuiceSensorEntityDescription(
             name=PIJU_SENSOR_BATTERY_CURRENT,
@@ -360,6 +422,7 @@ class PiJuiceSensor(SensorEntity):
             icon_callback=get_static_icon,
             value_callback=get_battery_current,
             update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+            stats_channel="GetBatteryCurrent",
         ),
         PiJuiceSensorEntityDescription(
             name=PIJU_SENSOR_POWER_INPUT_IO_STATUS,
@@ -384,6 +447,7 @@ class PiJuiceSensor(SensorEntity):
             icon_callback=get_static_icon,
             value_callback=get_io_voltage,
             update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+            stats_channel="GetIoVoltage",
         ),
         PiJuiceSensorEntityDescription(
             name=PIJU_SENSOR_IO_CURRENT,
@@ -395,6 +459,7 @@ class PiJuiceSensor(SensorEntity):
             icon_callback=get_static_icon,
             value_callback=get_io_current,
             update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+            stats_channel="GetIoCurrent",
         ),
         PiJuiceSensorEntityDescription(
             name=PIJU_SENSOR_EXTERNAL_POWER,
@@ -411,6 +476,53 @@ class PiJuiceSensor(SensorEntity):
         ),
     ]
 
+    ESTIMATOR_SENSOR_LIST = [
+        PiJuiceSensorEntityDescription(
+            name=PIJU_SENSOR_BATTERY_POWER,
+            key="battery_power",
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfPower.WATT,
+            icon="mdi:flash",
+            icon_callback=get_static_icon,
+            value_callback=get_battery_power,
+            update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+        ),
+        PiJuiceSensorEntityDescription(
+            name=PIJU_SENSOR_DISCHARGE_CURRENT,
+            key="discharge_current",
+            device_class=SensorDeviceClass.CURRENT,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfElectricCurrent.MILLIAMPERE,
+            icon="mdi:current-dc",
+            icon_callback=get_static_icon,
+            value_callback=get_discharge_current,
+            update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+        ),
+        PiJuiceSensorEntityDescription(
+            name=PIJU_SENSOR_TIME_TO_EMPTY,
+            key="time_to_empty",
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.MINUTES,
+            icon="mdi:battery-clock-outline",
+            icon_callback=get_static_icon,
+            value_callback=get_time_to_empty,
+            update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+        ),
+        PiJuiceSensorEntityDescription(
+            name=PIJU_SENSOR_TIME_TO_FULL,
+            key="time_to_full",
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.MINUTES,
+            icon="mdi:battery-clock",
+            icon_callback=get_static_icon,
+            value_callback=get_time_to_full,
+            update_frequency=DEFAULT_SLOW_SCAN_COUNT,
+        ),
+    ]
+
     def __init__(self, hass, config, sensor: PiJuiceSensorEntityDescription):
         """Initialize the sensor."""
         self.hass = hass
@@ -428,9 +540,10 @@ class PiJuiceSensor(SensorEntity):
         self._attr_options = sensor.options  # Entity
         self._get_icon = sensor.icon_callback
         self._get_value = sensor.value_callback
+        self._stats_channel = sensor.stats_channel
         self._attr_native_value = None  # SensorEntity
         self._attr_max_rate = sensor.update_frequency
-        self._attr_cur_rate = self._attr_max_rate - 1
+        self._slow_read_at = None
         self._attr_device_info: DeviceInfo = self._pijups.piju_device_info  # Entity
         self._attr_unique_id = sensor.key
 
@@ -441,7 +554,39 @@ class PiJuiceSensor(SensorEntity):
         return icon_val
 
     def update(self) -> None:
-        """Set up the sensor."""
-        self._attr_cur_rate = (self._attr_cur_rate + 1) % self._attr_max_rate
-        if self._attr_cur_rate == 0 and self._pijups.piju_enabled:
-            self._get_value(self)
+        """Set up the sensor, slow changing values are taken once per burst that read slow registers."""
+        if not self._pijups.piju_enabled:
+            return
+        if self._attr_max_rate > 1:
+            self._pijups.get_piju_status()
+            if (
+                self._slow_read_at is not None
+                and self._pijups.telemetry_slow_read_at == self._slow_read_at
+            ):
+                return
+            self._slow_read_at = self._pijups.telemetry_slow_read_at
+        previous_value = self._attr_native_value
+        self._get_value(self)
+        if self._stats_channel is not None and (
+            self._attr_native_value != previous_value
+            or not getattr(self, "_attr_extra_state_attributes", None)
+        ):
+            # refreshed with value only, so unchanged value does not produce new state
+            self._attr_extra_state_attributes = self._pijups.get_telemetry_statistics(
+                self._stats_channel
+            )
+
+
+class PiJuiceIoSensor(PiJuiceIoPinEntity, SensorEntity):
+    """PiJuice IO pin in analog input mode."""
+
+    _attr_device_class = SensorDeviceClass.VOLTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfElectricPotential.MILLIVOLT
+    _attr_icon = "mdi:flash"
+
+    def update(self) -> None:
+        """Update analog input value."""
+        value = self.read_pin("GetIoAnalogInput")
+        if value is not None:
+            self._attr_native_value = value
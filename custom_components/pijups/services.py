@@ -0,0 +1,333 @@
+"""The PiJuPS HAT integration - services."""
+
+import asyncio
+from datetime import datetime
+import importlib
+import logging
+import threading
+
+import voluptuous as vol
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+
+from .const import (
+    ATTR_AT,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CRON,
+    ATTR_CYCLES,
+    ATTR_DURATION,
+    ATTR_ENABLE,
+    ATTR_FILE,
+    ATTR_RATE,
+    ATTR_SAVE_LAST,
+    BASE,
+    DEFAULT_CAPTURE_DURATION,
+    DEFAULT_CAPTURE_FILE,
+    DEFAULT_PROFILER_DURATION,
+    DEFAULT_PROFILER_FILE,
+    DEFAULT_SAMPLER_DURATION,
+    DEFAULT_SAMPLER_FILE,
+    DEFAULT_SAMPLER_RATE,
+    DOMAIN,
+    PROFILER_MAX_DURATION,
+    SAMPLER_MAX_DURATION,
+    SAMPLER_MAX_RATE,
+    SERVICE_BACKUP_CONFIG,
+    SERVICE_CAPTURE_I2C,
+    SERVICE_CLEAR_FAULTS,
+    SERVICE_PROFILE,
+    SERVICE_RESTORE_CONFIG,
+    SERVICE_SAMPLE_BATTERY,
+    SERVICE_SCHEDULE_WAKEUP,
+)
+from .interface import PiJups
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAX_DURATION = 3600
+
+FILE_SERVICE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+SCHEDULE_WAKEUP_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_AT, "wakeup"): cv.datetime,
+            vol.Exclusive(ATTR_CRON, "wakeup"): cv.string,
+            vol.Optional(ATTR_ENABLE, default=True): cv.boolean,
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_AT, ATTR_CRON),
+)
+
+SAMPLE_BATTERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_RATE, default=DEFAULT_SAMPLER_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=SAMPLER_MAX_RATE)
+        ),
+        vol.Optional(ATTR_DURATION, default=DEFAULT_SAMPLER_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=SAMPLER_MAX_DURATION)
+        ),
+        vol.Optional(ATTR_SAVE_LAST, default=False): cv.boolean,
+        vol.Optional(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+CAPTURE_I2C_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_CAPTURE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=CAPTURE_MAX_DURATION)
+        ),
+        vol.Optional(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=PROFILER_MAX_DURATION)
+        ),
+        vol.Optional(ATTR_CYCLES): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+ENTRY_SERVICE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+def get_service_pijups(hass: HomeAssistant, call: ServiceCall, bus_access=True) -> PiJups:
+    """Find PiJups instance addressed by service call, entry id is optional for single HAT set-ups.
+
+    Calls accessing HAT are rejected while device requests are disabled for firmware upgrade.
+    """
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None and len(entries) == 1:
+        entry_id = next(iter(entries))
+    if entry_id not in entries:
+        raise HomeAssistantError(f"PiJuice HAT configuration entry not found: {entry_id}")
+    pijups: PiJups = entries[entry_id][BASE]
+    if bus_access and not pijups.piju_enabled:
+        raise HomeAssistantError("PiJuice HAT is being upgraded")
+    return pijups
+
+
+def get_service_file(hass: HomeAssistant, call: ServiceCall, default=None) -> str:
+    """Get file name from service call, file must be in allowed directories."""
+    file_name = hass.config.path(call.data.get(ATTR_FILE, default))
+    if not hass.config.is_allowed_path(file_name):
+        raise HomeAssistantError(f"Access to {file_name} not allowed")
+    return file_name
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration services once for all config entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_BACKUP_CONFIG):
+        return
+
+    async def async_backup_config(call: ServiceCall) -> None:
+        """Save HAT configuration to file."""
+        backup = await hass.async_add_executor_job(importlib.import_module, ".backup", __package__)
+        pijups = get_service_pijups(hass, call)
+        file_name = get_service_file(hass, call)
+        try:
+            ret = await hass.async_add_executor_job(backup.backup_config, pijups, file_name)
+        except OSError as exc:
+            raise HomeAssistantError(f"Cannot write {file_name}: {exc}") from exc
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJuice HAT configuration backup failed: {ret}")
+
+    async def async_restore_config(call: ServiceCall) -> None:
+        """Restore HAT configuration from file."""
+        backup = await hass.async_add_executor_job(importlib.import_module, ".backup", __package__)
+        pijups = get_service_pijups(hass, call)
+        file_name = get_service_file(hass, call)
+        try:
+            ret = await hass.async_add_executor_job(backup.restore_config, pijups, file_name)
+        except (OSError, ValueError) as exc:
+            raise HomeAssistantError(f"Cannot read {file_name}: {exc}") from exc
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJuice HAT configuration restore failed: {ret}")
+        _LOGGER.info("PiJuice HAT configuration restored, written registers: %s", ret["written"])
+
+    async def async_schedule_wakeup(call: ServiceCall) -> None:
+        """Set HAT wake-up alarm."""
+        alarm = await hass.async_add_executor_job(importlib.import_module, ".alarm", __package__)
+        pijups = get_service_pijups(hass, call)
+        if ATTR_AT in call.data:
+            spec: datetime | str = dt_util.as_utc(call.data[ATTR_AT]).replace(microsecond=0)
+            now = dt_util.utcnow()
+            if spec <= now:
+                raise HomeAssistantError(f"Wake-up time {spec} is in the past")
+            if spec > (match := alarm.first_match(spec, now)):
+                raise HomeAssistantError(
+                    f"Wake-up time {spec} can not be set, HAT alarm matches day of month and fires at {match} first"
+                )
+        else:
+            spec = call.data[ATTR_CRON]
+        try:
+            alarm.compile_alarm(spec)
+        except ValueError as exc:
+            raise HomeAssistantError(f"Invalid wake-up schedule {spec}: {exc}") from exc
+        ret = await hass.async_add_executor_job(
+            pijups.schedule_wakeup, spec, call.data[ATTR_ENABLE]
+        )
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJuice HAT wake-up scheduling failed: {ret}")
+        _LOGGER.debug("Wake-up scheduled for %s: %s", spec, ret["data"])
+
+    async def async_sample_battery(call: ServiceCall) -> ServiceResponse:
+        """Sample battery voltage and current at high rate to CSV file, or save last samples not saved."""
+        pijups = get_service_pijups(hass, call, bus_access=not call.data[ATTR_SAVE_LAST])
+        file_name = get_service_file(
+            hass, call, DEFAULT_SAMPLER_FILE.format(time=dt_util.now().strftime("%Y%m%d_%H%M%S"))
+        )
+        try:
+            if call.data[ATTR_SAVE_LAST]:
+                ret = await hass.async_add_executor_job(pijups.save_samples, file_name)
+            else:
+                ret = await hass.async_add_executor_job(
+                    pijups.run_sampler, call.data[ATTR_RATE], call.data[ATTR_DURATION], file_name
+                )
+        except OSError as exc:
+            raise HomeAssistantError(
+                f"Cannot write {file_name}: {exc}, samples are kept, call with {ATTR_SAVE_LAST} to save them"
+            ) from exc
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJuice HAT battery sampling failed: {ret}")
+        _LOGGER.info("Battery samples saved to %s: %s", file_name, ret["data"])
+        return ret["data"]
+
+    async def async_capture_i2c(call: ServiceCall) -> ServiceResponse:
+        """Record HAT bus transactions to capture file for duration."""
+        pijups = get_service_pijups(hass, call, bus_access=False)
+        file_name = get_service_file(
+            hass, call, DEFAULT_CAPTURE_FILE.format(time=dt_util.now().strftime("%Y%m%d_%H%M%S"))
+        )
+        try:
+            ret = await hass.async_add_executor_job(pijups.start_capture, file_name)
+        except OSError as exc:
+            raise HomeAssistantError(f"Cannot create {file_name}: {exc}") from exc
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJuice HAT I2C capture failed: {ret}")
+        try:
+            await asyncio.sleep(call.data[ATTR_DURATION])
+        finally:
+            ret = await hass.async_add_executor_job(pijups.stop_capture)
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJuice HAT I2C capture stopped early: {ret}")
+        _LOGGER.info("I2C capture saved to %s: %s", file_name, ret["data"])
+        return ret["data"]
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile integration code in executor and event loop threads, report top functions."""
+        pijups = get_service_pijups(hass, call, bus_access=False)
+        file_name = get_service_file(
+            hass, call, DEFAULT_PROFILER_FILE.format(time=dt_util.now().strftime("%Y%m%d_%H%M%S"))
+        )
+        cycles = call.data.get(ATTR_CYCLES)
+        duration = call.data.get(
+            ATTR_DURATION, PROFILER_MAX_DURATION if cycles else DEFAULT_PROFILER_DURATION
+        )
+        try:
+            ret = await hass.async_add_executor_job(
+                pijups.run_profiler, duration, cycles, threading.get_ident(), file_name
+            )
+        except OSError as exc:
+            raise HomeAssistantError(f"Cannot write {file_name}: {exc}") from exc
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJups profiling failed: {ret}")
+        stats = ret["data"]
+        top = "\n".join(f"- {share}% {function}" for function, share in stats["top"].items())
+        persistent_notification.async_create(
+            hass,
+            f"{stats['samples']} samples in {stats['elapsed_s']} s, {stats['cycles']} poll cycles, "
+            f"integration code active in {stats['active_samples']}:\n{top}\n\nReport: {file_name}",
+            title="PiJups profile",
+            notification_id="pijups_profile",
+        )
+        _LOGGER.info("Profile saved to %s: %s", file_name, stats)
+        return stats
+
+    async def async_clear_faults(call: ServiceCall) -> ServiceResponse:
+        """Clear HAT fault events with one write, fault conditions still present are returned."""
+        pijups = get_service_pijups(hass, call)
+        ret = await hass.async_add_executor_job(pijups.clear_faults)
+        if ret["error"] != "NO_ERROR":
+            raise HomeAssistantError(f"PiJuice HAT fault clearing failed: {ret}")
+        return {"faults": ret["data"]}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKUP_CONFIG, async_backup_config, schema=FILE_SERVICE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RESTORE_CONFIG, async_restore_config, schema=FILE_SERVICE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SCHEDULE_WAKEUP, async_schedule_wakeup, schema=SCHEDULE_WAKEUP_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SAMPLE_BATTERY,
+        async_sample_battery,
+        schema=SAMPLE_BATTERY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE_I2C,
+        async_capture_i2c,
+        schema=CAPTURE_I2C_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAR_FAULTS,
+        async_clear_faults,
+        schema=ENTRY_SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove integration services when last config entry is unloaded."""
+    if hass.data.get(DOMAIN):
+        return
+    for service in (
+        SERVICE_BACKUP_CONFIG,
+        SERVICE_RESTORE_CONFIG,
+        SERVICE_SCHEDULE_WAKEUP,
+        SERVICE_SAMPLE_BATTERY,
+        SERVICE_CAPTURE_I2C,
+        SERVICE_PROFILE,
+        SERVICE_CLEAR_FAULTS,
+    ):
+        hass.services.async_remove(DOMAIN, service)
@@ -0,0 +1,93 @@
+"""The PiJuPS HAT integration - rolling window statistics for telemetry channels."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+import math
+
+# samples kept per channel, channels are sampled with slow telemetry registers
+STATS_WINDOW = 60
+# state attributes of telemetry sensors, excluded from recorder
+STATS_ATTRIBUTES = ("min", "max", "mean", "stddev", "samples")
+
+
+class RollingWindow:
+    """Fixed size window over last samples with min/max/mean/stddev kept up to date incrementally.
+
+    Integer samples (as decoded from HAT registers) are held in preallocated array, exact sum and sum
+    of squares are updated on append/evict and min/max are tracked by monotonic queues of sample
+    positions, so each append is amortized O(1).
+    """
+
+    def __init__(self, size=STATS_WINDOW) -> None:
+        """Preallocate window."""
+        self.size = size
+        self.values = array("l", [0]) * size
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min_queue = deque()
+        self.max_queue = deque()
+
+    def append(self, value):
+        """Add sample, oldest one is evicted if window is full."""
+        index = self.count % self.size
+        if self.count >= self.size:
+            evicted = self.values[index]
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+            oldest = self.count - self.size
+            if self.min_queue[0] == oldest:
+                self.min_queue.popleft()
+            if self.max_queue[0] == oldest:
+                self.max_queue.popleft()
+        self.values[index] = value
+        self.total += value
+        self.total_sq += value * value
+        while self.min_queue and self.values[self.min_queue[-1] % self.size] >= value:
+            self.min_queue.pop()
+        self.min_queue.append(self.count)
+        while self.max_queue and self.values[self.max_queue[-1] % self.size] <= value:
+            self.max_queue.pop()
+        self.max_queue.append(self.count)
+        self.count += 1
+
+    def __len__(self) -> int:
+        """Return number of samples in window."""
+        return min(self.count, self.size)
+
+    @property
+    def minimum(self):
+        """Smallest sample in window."""
+        return self.values[self.min_queue[0] % self.size] if self.count else None
+
+    @property
+    def maximum(self):
+        """Largest sample in window."""
+        return self.values[self.max_queue[0] % self.size] if self.count else None
+
+    @property
+    def mean(self):
+        """Mean of samples in window."""
+        return self.total / len(self) if self.count else None
+
+    @property
+    def stddev(self):
+        """Population standard deviation of samples in window."""
+        if not self.count:
+            return None
+        mean = self.mean
+        return math.sqrt(max(self.total_sq / len(self) - mean * mean, 0.0))
+
+    def get_statistics(self):
+        """Return window statistics as state attributes, empty if no samples yet."""
+        if not self.count:
+            return {}
+        return {
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": round(self.mean, 2),
+            "stddev": round(self.stddev, 2),
+            "samples": len(self),
+        }
@@ -0,0 +1,51 @@
+"""The PiJuPS HAT integration - switch platform implementation."""
+
+import logging
+from typing import Any
+
+from homeassistant.components.switch import SwitchEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import BASE, DOMAIN
+from .io_pins import PiJuiceIoPinEntity, async_get_io_pins
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = None  # value set in __init__.py async_setup_entry
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add entities for IO pins configured as digital outputs."""
+    pijups = hass.data[DOMAIN][config_entry.entry_id][BASE]
+    pins = await async_get_io_pins(hass, pijups, Platform.SWITCH)
+    async_add_entities([PiJuiceIoSwitch(hass, config_entry, pin) for pin in pins], True)
+    _LOGGER.debug("async_setup_entry switches added for IO pins %s", pins)
+
+
+class PiJuiceIoSwitch(PiJuiceIoPinEntity, SwitchEntity):
+    """PiJuice IO pin in digital output mode."""
+
+    _attr_icon = "mdi:electric-switch"
+
+    def update(self) -> None:
+        """Update output state."""
+        value = self.read_pin("GetIoDigitalOutput")
+        if value is not None:
+            self._attr_is_on = value == 1
+
+    def turn_on(self, **kwargs: Any) -> None:
+        """Set output high."""
+        if self.write_pin("SetIoDigitalOutput", 1):
+            self._attr_is_on = True
+
+    def turn_off(self, **kwargs: Any) -> None:
+        """Set output low."""
+        if self.write_pin("SetIoDigitalOutput", 0):
+            self._attr_is_on = False
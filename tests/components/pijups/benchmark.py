@@ -0,0 +1,205 @@
+"""Benchmarks of PiJuice protocol stack with emulated HAT (smbus2.py) as device.
+
+Run from HA core root, results are written as JSON for comparison between releases:
+    python -m tests.components.pijups.benchmark --output bench.json [--compare previous.json]
+Emulated device profile (see smbus2.DEVICE_PROFILES) is selected with --profile, HAT capture
+(services capture_i2c) is replayed instead of emulated HAT with --replay. Integration import time
+(python -X importtime in fresh interpreter) is reported as import_time.
+"""
+import argparse
+from datetime import UTC, datetime
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from homeassistant.components.pijups import pijuice_log
+from homeassistant.components.pijups.capture import ReplayBus, read_capture
+import homeassistant.components.pijups.pijuice as pi
+from homeassistant.components.pijups.const import BASE, DOMAIN
+from homeassistant.components.pijups.diagnostics import get_config_entry_diagnostics
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.components.pijups.sensor import PiJuiceSensor
+
+from .common import CONFIG_DATA, CONFIG_OPTIONS
+from .smbus2 import DEVICE_PROFILES, SMBus
+
+from tests.common import MockConfigEntry
+
+DEFAULT_REPEAT = 200
+# slow benchmarks (many transfers per call) are repeated less
+SLOW_REPEAT_DIVIDER = 20
+CHECKSUM_DATA = list(range(32))
+PACKAGE = "homeassistant.components.pijups"
+
+
+def measure(func, repeat):
+    """Call func repeat times, return duration statistics in microseconds."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000000)
+    durations.sort()
+    return {
+        "repeat": repeat,
+        "min_us": round(durations[0], 2),
+        "median_us": round(statistics.median(durations), 2),
+        "mean_us": round(statistics.fmean(durations), 2),
+        "p95_us": round(durations[int(0.95 * (repeat - 1))], 2),
+        "max_us": round(durations[-1], 2),
+        "ops_per_s": round(1000000 / statistics.fmean(durations), 1),
+    }
+
+
+def measure_import_time(module=PACKAGE):
+    """Import module in fresh interpreter with -X importtime, return integration modules and times in us."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        name = name.strip()
+        if name == PACKAGE or name.startswith(PACKAGE + "."):
+            modules[name[len(PACKAGE) + 1 :] or "__init__"] = {
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            }
+    return {
+        "cumulative_us": modules.get("__init__", {}).get("cumulative_us"),
+        "self_us": sum(times["self_us"] for times in modules.values()),
+        "modules": modules,
+    }
+
+
+def create_pijups():
+    """Create PiJups with HA parts it uses replaced by plain objects, config entry is not loaded."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="benchmark", data=CONFIG_DATA, options=CONFIG_OPTIONS
+    )
+    hass = SimpleNamespace(data={DOMAIN: {}}, bus=SimpleNamespace(fire=lambda *args: None))
+    pijups = PiJups(hass, entry)
+    hass.data[DOMAIN][entry.entry_id] = {BASE: pijups}
+    pijups.configure_device(hass, entry)
+    pijups.get_piju_status(True)
+    return hass, entry, pijups
+
+
+def get_benchmarks(hass, entry, pijups):
+    """Return benchmark name -> (callable, slow) mapping."""
+    ifs = pijups.interface
+    bus = ifs.i2cbus
+    status = pi.PiJuiceStatus.STATUS_CMD
+    voltage = pi.PiJuiceStatus.BATTERY_VOLTAGE_CMD
+    snapshot = pijups.get_register_snapshot()
+    sensors = [PiJuiceSensor(hass, entry, sensor) for sensor in PiJuiceSensor.SENSOR_LIST]
+
+    def read_with_error():
+        bus.io_error_next_read_call()
+        pijups.call_pijuice_with_error_check(pijups.status.GetStatus)
+
+    def sensor_poll_cycle():
+        pijups.get_piju_status(True)
+        for sensor in sensors:
+            sensor._get_value(sensor)
+
+    benchmarks = {
+        "read_data": (lambda: ifs.ReadData(status, 1), False),
+        "write_data": (lambda: ifs.WriteData(voltage, [0xB4, 0x0F]), False),
+        "checksum_32_bytes": (lambda: ifs._GetChecksum(CHECKSUM_DATA), False),
+        "decode_status": (lambda: PiJups.decode_snapshot(snapshot.status.GetStatus), False),
+        "decode_battery_profile": (
+            lambda: PiJups.decode_snapshot(snapshot.config.GetBatteryProfile),
+            False,
+        ),
+        "call_with_error_check": (
+            lambda: pijups.call_pijuice_with_error_check(pijups.status.GetStatus),
+            False,
+        ),
+        "call_with_error_check_retry": (read_with_error, False),
+        "sensor_poll_cycle": (sensor_poll_cycle, False),
+        "find_piju_bus_addr": (lambda: PiJups.find_piju_bus_addr(hass), True),
+        "circular_log_read": (lambda: pijuice_log.ReadPiJuiceLog(ifs), True),
+        "diagnostics": (lambda: get_config_entry_diagnostics(hass, entry), True),
+    }
+    if not isinstance(bus, SMBus):
+        # error injection needs emulated HAT
+        del benchmarks["call_with_error_check_retry"]
+    return benchmarks
+
+
+def run_benchmarks(repeat=DEFAULT_REPEAT, selected=None, profile=None, replay=None):
+    """Run benchmarks with optional device profile or against replayed capture file, return results dictionary."""
+    SMBus.SIM_BUS = 1
+    results = {}
+    logging.getLogger("homeassistant.components.pijups").setLevel(logging.WARNING)
+    bus_class = SMBus
+    if replay is not None:
+        address, _, records = read_capture(replay)
+        bus_class = lambda bus: ReplayBus(address, records)  # noqa: E731
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=bus_class):
+        hass, entry, pijups = create_pijups()
+        if profile is not None:
+            profile = pijups.interface.i2cbus.set_profile(profile).name
+        for name, (func, slow) in get_benchmarks(hass, entry, pijups).items():
+            if selected and name not in selected:
+                continue
+            func()  # warm up
+            results[name] = measure(func, max(repeat // SLOW_REPEAT_DIVIDER, 1) if slow else repeat)
+    return {
+        "time": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "profile": profile or "ideal",
+        "replay": replay,
+        "benchmarks": results,
+        "import_time": measure_import_time(),
+    }
+
+
+def compare(previous, current):
+    """Return median ratio current/previous per benchmark present in both results."""
+    return {
+        name: round(result["median_us"] / previous["benchmarks"][name]["median_us"], 3)
+        for name, result in current["benchmarks"].items()
+        if name in previous["benchmarks"] and previous["benchmarks"][name]["median_us"]
+    }
+
+
+def main():
+    """Command line entry."""
+    parser = argparse.ArgumentParser(description="PiJuice protocol stack benchmarks")
+    parser.add_argument("--output", help="JSON file to write results to")
+    parser.add_argument("--compare", help="JSON file with previous results")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    device = parser.add_mutually_exclusive_group()
+    device.add_argument("--profile", choices=sorted(DEVICE_PROFILES), help="emulated device profile")
+    device.add_argument("--replay", help="capture file to replay instead of emulated HAT")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run, all by default")
+    args = parser.parse_args()
+    results = run_benchmarks(args.repeat, args.benchmarks, args.profile, args.replay)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            results["ratio_to_previous"] = compare(json.load(file), results)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
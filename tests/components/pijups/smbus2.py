@@ -1,5 +1,6 @@
 """Implement PiJuice h/w behaviour via smbus2 SMBus class."""
 import logging
+import random
 import time
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,6 +25,144 @@ LOGGING_BUFFER_INDEX = 0
 CMD_NSUPP_RESPONSE = [0, 255]
 
 
+class DeviceProfile:
+    """Declarative emulated device behaviour for load and recovery tests.
+
+    Latency specs are (kind, *params) tuples: ("fixed", s), ("uniform", low, high),
+    ("gauss", mean, sigma) or ("expo", mean); cmd_latency overrides latency per command.
+    nack_rate, corrupt_rate and msbit_flip_rate are per transfer probabilities of IOError,
+    bit flip after checksum and cleared MSbit of 1st byte (recoverable by PiJuice API).
+    Transfers started within hang_windows ((start, end) seconds since profile activation)
+    block until window end, stretch_rate/stretch_time add clock stretching spikes.
+    Random sequence is seeded, so profile run is repeatable.
+    """
+
+    def __init__(
+        self,
+        name="custom",
+        latency=None,
+        cmd_latency=None,
+        nack_rate=0.0,
+        corrupt_rate=0.0,
+        msbit_flip_rate=0.0,
+        hang_windows=(),
+        stretch_rate=0.0,
+        stretch_time=0.0,
+        seed=0,
+    ):
+        """Initialize profile."""
+        self.name = name
+        self.latency = latency
+        self.cmd_latency = cmd_latency or {}
+        self.nack_rate = nack_rate
+        self.corrupt_rate = corrupt_rate
+        self.msbit_flip_rate = msbit_flip_rate
+        self.hang_windows = [tuple(window) for window in hang_windows]
+        self.stretch_rate = stretch_rate
+        self.stretch_time = stretch_time
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.started = None
+        self.injected = {"nack": 0, "corrupt": 0, "msbit_flip": 0, "hang": 0, "stretch": 0}
+
+    @staticmethod
+    def from_dict(spec):
+        """Create profile from JSON compatible dictionary, command keys may be strings like '0x40'."""
+        spec = dict(spec)
+        if "cmd_latency" in spec:
+            spec["cmd_latency"] = {
+                int(cmd, 0) if isinstance(cmd, str) else cmd: tuple(latency)
+                for cmd, latency in spec["cmd_latency"].items()
+            }
+        if "latency" in spec and spec["latency"] is not None:
+            spec["latency"] = tuple(spec["latency"])
+        return DeviceProfile(**spec)
+
+    def activate(self):
+        """Start profile clock and random sequence."""
+        self.random = random.Random(self.seed)
+        self.started = time.monotonic()
+
+    def sample_latency(self, cmd):
+        """Draw transfer latency in seconds for command."""
+        spec = self.cmd_latency.get(cmd, self.latency)
+        if spec is None:
+            return 0.0
+        kind, *params = spec
+        if kind == "fixed":
+            value = params[0]
+        elif kind == "uniform":
+            value = self.random.uniform(*params)
+        elif kind == "gauss":
+            value = self.random.gauss(*params)
+        elif kind == "expo":
+            value = self.random.expovariate(1 / params[0])
+        else:
+            raise ValueError(f"unknown latency distribution {kind}")
+        return max(value, 0.0)
+
+    def before_transfer(self, cmd):
+        """Apply hang, latency and clock stretching delays, raise IOError on NACK."""
+        elapsed = time.monotonic() - self.started
+        for start, end in self.hang_windows:
+            if start <= elapsed < end:
+                self.injected["hang"] += 1
+                time.sleep(end - elapsed)
+                break
+        delay = self.sample_latency(cmd)
+        if self.stretch_rate and self.random.random() < self.stretch_rate:
+            self.injected["stretch"] += 1
+            delay += self.stretch_time
+        if delay > 0:
+            time.sleep(delay)
+        if self.nack_rate and self.random.random() < self.nack_rate:
+            self.injected["nack"] += 1
+            raise IOError
+
+    def after_read(self, data):
+        """Damage read data: bit flip after checksum or cleared MSbit of 1st byte."""
+        if self.corrupt_rate and self.random.random() < self.corrupt_rate:
+            self.injected["corrupt"] += 1
+            data[self.random.randrange(len(data))] ^= 1 << self.random.randrange(8)
+        elif self.msbit_flip_rate and data[0] & 0x80 and self.random.random() < self.msbit_flip_rate:
+            self.injected["msbit_flip"] += 1
+            data[0] &= 0x7F
+        return data
+
+
+# named profiles for tests and benchmarks
+DEVICE_PROFILES = {
+    "ideal": {"name": "ideal"},
+    "typical": {"name": "typical", "latency": ("gauss", 0.0008, 0.0002)},
+    "noisy": {
+        "name": "noisy",
+        "latency": ("gauss", 0.001, 0.0003),
+        "nack_rate": 0.02,
+        "corrupt_rate": 0.02,
+        "msbit_flip_rate": 0.05,
+        "stretch_rate": 0.01,
+        "stretch_time": 0.02,
+    },
+    "flaky": {
+        "name": "flaky",
+        "latency": ("expo", 0.002),
+        "nack_rate": 0.1,
+        "corrupt_rate": 0.05,
+        "stretch_rate": 0.05,
+        "stretch_time": 0.15,
+    },
+}
+
+
+def get_device_profile(profile):
+    """Get profile by name, from dictionary or profile itself."""
+    if isinstance(profile, DeviceProfile):
+        return profile
+    if isinstance(profile, str):
+        profile = DEVICE_PROFILES[profile]
+    return DeviceProfile.from_dict(profile)
+
+
 class SMBus:
     """Implement read_i2c_block_data, write_i2c_block_data functions for use with PiJuice API."""
 
@@ -31,6 +170,12 @@ class SMBus:
     SIM_ADDR = 0x14
     INIT_ADJUSTMENTS = {}
     INIT_CMD_DELAYS = {}
+    INIT_PROFILE = None
+
+    @staticmethod
+    def add_init_profile(profile):
+        """Set device profile for next opened connection."""
+        SMBus.INIT_PROFILE = profile
 
     @staticmethod
     def add_init_adjustments(cmd, data):
@@ -72,6 +217,7 @@ class SMBus:
         self.simulate_data_curruption = False
         self.temp_read_cmd = 0
         self.temp_read_cmd_buff = None
+        self.profile = None
         self.reset_device()
 
     def io_buffer_next_read_call(self, cmd, data):
@@ -98,6 +244,13 @@ class SMBus:
         self.err_sim[cmd] = [counter, time_out]
         #_LOGGER.info(f"add_cmd_delays {cmd:02x} {self.err_sim[cmd]}")
 
+    def set_profile(self, profile=None):
+        """Activate device profile (name, dictionary or DeviceProfile), None restores ideal device."""
+        self.profile = get_device_profile(profile) if profile is not None else None
+        if self.profile is not None:
+            self.profile.activate()
+        return self.profile
+
     def enable_delay(self, io_delay):
         """Enable delay in read/write responses."""
         self.read_write_delay = io_delay
@@ -1099,6 +1252,10 @@ class SMBus:
                 self.err_sim[cmd] = del_cmd
             SMBus.INIT_CMD_DELAYS = {}
 
+        if SMBus.INIT_PROFILE is not None:
+            self.set_profile(SMBus.INIT_PROFILE)
+            SMBus.INIT_PROFILE = None
+
     def set_power(self, io_on=False, input_on=False):
         """Set requested power states - to be used from test script."""
         _d = [0, 0]
@@ -1154,6 +1311,8 @@ class SMBus:
             self.signal_error_next_read_call = False
             raise IOError
         self.delay_if_needed(cmd)
+        if self.profile is not None:
+            self.profile.before_transfer(cmd)
         if cmd == LOGGING_CMD:
             if self.logging_type == 0:  # read log buffers
                 _d = self.logging_buffers[self.logging_buffer_index].copy()
@@ -1177,6 +1336,8 @@ class SMBus:
         _d[-1] = self._get_check_sum(_d[0:-1])
         if self.simulate_recoverable_chksum_issue and (_d[0]&0x80) != 0:
             _d[0] &= 0x7f
+        if self.profile is not None:
+            _d = self.profile.after_read(_d)
         if self.read_write_delay > 0:
             time.sleep(self.read_write_delay)
         return _d
@@ -1187,13 +1348,15 @@ class SMBus:
             self.signal_error_next_write_call = False
             raise IOError
         self.delay_if_needed(cmd)
+        if self.profile is not None:
+            self.profile.before_transfer(cmd)
         if cmd == LOGGING_CMD:
             self.logging_type = data[0]
             if self.logging_type == 0:
                 self.logging_buffer_index = 0  # requested read diag log buffer
             if self.logging_type == 1:  # requested set logging flags
                 self.logging_config = data[1] & 0x7F
-                self.logging_type = 0
+                self.logging_type = 2  # configuration flags are returned as response
         else:
             if addr == SMBus.SIM_ADDR:
                 if cmd in (BUTTON_EVENT_CMD, FAULT_EVENT_CMD):
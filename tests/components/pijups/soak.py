@@ -0,0 +1,160 @@
+"""Accelerated time soak run of PiJups polling with emulated HAT (smbus2.py) as device.
+
+Sensor update loop is driven at configured scan interval by virtual clock, so weeks of polling
+run in minutes. RTC sync runs at its interval and HAT log is read at every checkpoint. Run from HA core root:
+    python -m tests.components.pijups.soak --days 14 [--profile noisy] [--output soak.json]
+Report holds CPU time per simulated hour, peak RSS, thread counts and object count growth.
+"""
+import argparse
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+import gc
+import json
+import logging
+import resource
+import threading
+import time
+from unittest.mock import patch
+
+from homeassistant.components.pijups import pijuice_log
+from homeassistant.components.pijups.const import DEFAULT_RTC_SYNC_INTERVAL
+from homeassistant.components.pijups.sensor import PiJuiceSensor
+from homeassistant.const import CONF_SCAN_INTERVAL
+
+from .benchmark import create_pijups
+from .smbus2 import DEVICE_PROFILES, SMBus
+
+DEFAULT_DAYS = 14
+CHECKPOINT_INTERVAL = 86400
+OBJECT_GROWTH_TOP = 10
+SECONDS_PER_HOUR = 3600
+
+
+class VirtualClock:
+    """Virtual wall clock, advanced by soak loop instead of sleeping."""
+
+    def __init__(self) -> None:
+        """Start at current time."""
+        self.time = datetime.now(UTC)
+
+    def advance(self, seconds):
+        """Move clock forward."""
+        self.time += timedelta(seconds=seconds)
+
+    def datetime_class(self):
+        """Return datetime replacement with now() served from this clock."""
+        clock = self
+
+        class VirtualDatetime(datetime):
+            """Datetime with virtual now()."""
+
+            @classmethod
+            def now(cls, tz=None):
+                """Return virtual time."""
+                return clock.time if tz is not None else clock.time.replace(tzinfo=None)
+
+        return VirtualDatetime
+
+
+def count_objects():
+    """Count live objects by type name."""
+    gc.collect()
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in kB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_soak(days=DEFAULT_DAYS, profile=None, checkpoint_interval=CHECKPOINT_INTERVAL):
+    """Run polling for simulated days, return report dictionary."""
+    SMBus.SIM_BUS = 1
+    logging.getLogger("homeassistant.components.pijups").setLevel(logging.CRITICAL)
+    clock = VirtualClock()
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus), patch(
+        "homeassistant.components.pijups.interface.datetime", new=clock.datetime_class()
+    ):
+        hass, entry, pijups = create_pijups()
+        if profile is not None:
+            pijups.interface.i2cbus.set_profile(profile)
+        scan_interval = entry.options[CONF_SCAN_INTERVAL]
+        sensors = [
+            PiJuiceSensor(hass, entry, sensor)
+            for sensor in PiJuiceSensor.SENSOR_LIST + PiJuiceSensor.ESTIMATOR_SENSOR_LIST
+        ]
+        ticks = int(days * 86400 / scan_interval)
+        ticks_per_checkpoint = max(int(checkpoint_interval / scan_interval), 1)
+        ticks_per_rtc_sync = max(int(DEFAULT_RTC_SYNC_INTERVAL / scan_interval), 1)
+
+        objects_before = count_objects()
+        threads_before = threading.active_count()
+        cpu_started = time.process_time()
+        wall_started = time.monotonic()
+        max_threads = threads_before
+        state_changes = 0
+        checkpoints = []
+        for tick in range(1, ticks + 1):
+            clock.advance(scan_interval)
+            for sensor in sensors:
+                value = sensor.native_value
+                sensor.update()
+                if sensor.native_value != value:
+                    state_changes += 1
+            if tick % ticks_per_rtc_sync == 0:
+                pijups.sync_rtc()
+            max_threads = max(max_threads, threading.active_count())
+            if tick % ticks_per_checkpoint == 0 or tick == ticks:
+                pijuice_log.ReadPiJuiceLog(pijups.interface)
+                checkpoints.append(
+                    {
+                        "simulated_hours": round(tick * scan_interval / SECONDS_PER_HOUR, 2),
+                        "cpu_s": round(time.process_time() - cpu_started, 3),
+                        "peak_rss_kb": peak_rss_kb(),
+                        "threads": threading.active_count(),
+                        "objects": len(gc.get_objects()),
+                    }
+                )
+        cpu = time.process_time() - cpu_started
+        wall = time.monotonic() - wall_started
+        growth = count_objects()
+        growth.subtract(objects_before)
+    simulated_hours = ticks * scan_interval / SECONDS_PER_HOUR
+    return {
+        "time": datetime.now(UTC).isoformat(),
+        "profile": pijups.interface.i2cbus.profile.name if profile is not None else "ideal",
+        "scan_interval_s": scan_interval,
+        "simulated_hours": round(simulated_hours, 2),
+        "polls": ticks,
+        "wall_s": round(wall, 3),
+        "speedup": round(simulated_hours * SECONDS_PER_HOUR / wall, 1) if wall else None,
+        "cpu_ms_per_simulated_hour": round(cpu * 1000 / simulated_hours, 3) if simulated_hours else None,
+        "peak_rss_kb": peak_rss_kb(),
+        "threads_before": threads_before,
+        "threads_max": max_threads,
+        "threads_after": threading.active_count(),
+        "state_changes": state_changes,
+        "i2c_transfers": {op: stats["count"] for op, stats in pijups.interface.transfer_stats.items()},
+        "object_growth": dict(
+            (name, count) for name, count in growth.most_common(OBJECT_GROWTH_TOP) if count > 0
+        ),
+        "checkpoints": checkpoints,
+    }
+
+
+def main():
+    """Command line entry."""
+    parser = argparse.ArgumentParser(description="PiJups accelerated time soak run")
+    parser.add_argument("--days", type=float, default=DEFAULT_DAYS, help="simulated days")
+    parser.add_argument("--profile", choices=sorted(DEVICE_PROFILES), help="emulated device profile")
+    parser.add_argument("--output", help="JSON file to write report to")
+    args = parser.parse_args()
+    text = json.dumps(run_soak(args.days, args.profile), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
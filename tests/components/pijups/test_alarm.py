@@ -0,0 +1,103 @@
+"""Test PiJups wake-up alarm scheduling."""
+from datetime import datetime, timedelta, timezone
+from datetime import UTC
+from unittest.mock import patch
+
+import pytest
+
+import homeassistant.components.pijups.pijuice as pi
+from homeassistant.components.pijups.alarm import (
+    compile_alarm,
+    compile_cron,
+    first_match,
+    schedule_wakeup,
+)
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+
+def test_compile_alarm(hass: HomeAssistant):
+    """Test compiled alarm images match ones written by PiJuice API SetAlarm."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuice(1, 0x14) as pijuice:
+            for spec, alarm in (
+                ("30 6 * * *", {"second": 0, "minute": 30, "hour": 6, "day": "EVERY_DAY"}),
+                ("*/10 * * * *", {"second": 0, "minute_period": 10, "hour": "EVERY_HOUR", "day": "EVERY_DAY"}),
+                ("* 1,13,23 15 * *", {"second": 0, "hour": "1;13;23", "day": 15}),
+                ("0 22 * * 0", {"second": 0, "minute": 0, "hour": 22, "weekday": 1}),
+                ("0 22 * * 1,7,5", {"second": 0, "minute": 0, "hour": 22, "weekday": "1;2;6"}),
+            ):
+                assert pijuice.rtcAlarm.SetAlarm(alarm) == {"error": "NO_ERROR"}
+                assert list(compile_alarm(spec)) == pijuice.interface.i2cbus._get_buff(0xB9)[:-1]
+
+            when = datetime(2024, 3, 5, 8, 15, 30, tzinfo=timezone(timedelta(hours=2)))
+            assert pijuice.rtcAlarm.SetAlarm(
+                {"second": 30, "minute": 15, "hour": 6, "day": 5}
+            ) == {"error": "NO_ERROR"}
+            assert list(compile_alarm(when)) == pijuice.interface.i2cbus._get_buff(0xB9)[:-1]
+
+    # compiled once, white space does not matter
+    compile_cron.cache_clear()
+    compile_alarm("30  6 * * *")
+    compile_alarm(" 30 6 * * * ")
+    assert compile_cron.cache_info().hits == 1
+
+    for spec in (
+        "30 6 * *",
+        "30 6 * 1 *",
+        "30 6 1 * 1",
+        "1,2 6 * * *",
+        "30 */2 * * *",
+        "30 24 * * *",
+        "30 6 1,2 * *",
+        "x 6 * * *",
+    ):
+        with pytest.raises(ValueError):
+            compile_alarm(spec)
+
+
+def test_first_match(hass: HomeAssistant):
+    """Test alarm compiled from time matches same day of month and time in earlier months."""
+    now = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+    assert compile_alarm(datetime(2026, 11, 20, 6, tzinfo=UTC)) == compile_alarm(
+        datetime(2027, 3, 20, 6, tzinfo=UTC)
+    )
+    assert first_match(datetime(2026, 11, 20, 6, tzinfo=UTC), now) == datetime(2026, 10, 20, 6, tzinfo=UTC)
+    assert first_match(datetime(2026, 11, 19, 6, tzinfo=UTC), now) == datetime(2026, 11, 19, 6, tzinfo=UTC)
+    assert first_match(datetime(2026, 10, 19, 14, tzinfo=timezone(timedelta(hours=2))), now) == datetime(
+        2026, 11, 19, 12, tzinfo=UTC
+    )
+    # day missing in next months
+    assert first_match(datetime(2027, 3, 31, 6, tzinfo=UTC), datetime(2027, 1, 31, 12, tzinfo=UTC)) == datetime(
+        2027, 3, 31, 6, tzinfo=UTC
+    )
+
+
+def test_schedule_wakeup(hass: HomeAssistant):
+    """Test alarm and wake-up flag are written only if changed."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuice(1, 0x14) as pijuice:
+            image = compile_alarm(datetime.now(UTC) + timedelta(hours=1))
+            ret = schedule_wakeup(pijuice.interface, image)
+            assert ret == {"data": {"alarm_written": True, "wakeup_written": True}, "error": "NO_ERROR"}
+            assert pijuice.rtcAlarm.GetControlStatus()["data"]["alarm_wakeup_enabled"]
+
+            pijuice.interface.i2cbus.set_write_log(True)
+            ret = schedule_wakeup(pijuice.interface, image)
+            assert ret == {"data": {"alarm_written": False, "wakeup_written": False}, "error": "NO_ERROR"}
+            assert pijuice.interface.i2cbus.set_write_log(False) == {}
+
+            ret = schedule_wakeup(pijuice.interface, image, False)
+            assert ret == {"data": {"alarm_written": False, "wakeup_written": True}, "error": "NO_ERROR"}
+            assert not pijuice.rtcAlarm.GetControlStatus()["data"]["alarm_wakeup_enabled"]
+
+            # read-back mismatch
+            with patch(
+                "homeassistant.components.pijups.alarm.poll_register",
+                return_value={"error": "WRITE_FAILED"},
+            ):
+                ret = schedule_wakeup(pijuice.interface, compile_alarm("0 5 * * *"))
+                assert ret == {"error": "WRITE_FAILED"}
@@ -0,0 +1,61 @@
+"""Test PiJups benchmark suite runs and produces comparable results."""
+import json
+from unittest.mock import patch
+
+from homeassistant.components.pijups.capture import CaptureBus
+from homeassistant.components.pijups.const import DEFAULT_I2C_ADDRESS
+
+from . import benchmark
+from .smbus2 import SMBus
+
+
+def test_benchmarks(hass):
+    """Run all benchmarks with few repeats."""
+    results = benchmark.run_benchmarks(repeat=20)
+    json.dumps(results)
+    assert set(results["benchmarks"]) == {
+        "read_data",
+        "write_data",
+        "checksum_32_bytes",
+        "decode_status",
+        "decode_battery_profile",
+        "call_with_error_check",
+        "call_with_error_check_retry",
+        "sensor_poll_cycle",
+        "find_piju_bus_addr",
+        "circular_log_read",
+        "diagnostics",
+    }
+    read = results["benchmarks"]["read_data"]
+    assert read["repeat"] == 20
+    assert read["min_us"] <= read["median_us"] <= read["max_us"]
+    assert results["benchmarks"]["find_piju_bus_addr"]["repeat"] == 1
+
+    selected = benchmark.run_benchmarks(repeat=4, selected=["read_data"], profile="typical")
+    assert list(selected["benchmarks"]) == ["read_data"]
+    assert selected["profile"] == "typical"
+    assert benchmark.compare(results, selected) == {
+        "read_data": round(
+            selected["benchmarks"]["read_data"]["median_us"] / read["median_us"], 3
+        )
+    }
+
+
+def test_benchmarks_replay(hass, tmp_path):
+    """Run benchmarks against replayed capture."""
+    capture_file = str(tmp_path / "hat.cap")
+    buses = []
+
+    def capture_bus(bus):
+        buses.append(CaptureBus(SMBus(bus), DEFAULT_I2C_ADDRESS, capture_file))
+        return buses[-1]
+
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=capture_bus):
+        benchmark.create_pijups()
+    buses[0].close()
+
+    results = benchmark.run_benchmarks(repeat=20, replay=capture_file)
+    assert results["replay"] == capture_file
+    assert "call_with_error_check_retry" not in results["benchmarks"]
+    assert results["benchmarks"]["sensor_poll_cycle"]["repeat"] == 20
@@ -0,0 +1,111 @@
+"""Test PiJups I2C capture and replay."""
+import time
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.components.pijups.capture import (
+    CAPTURE_HEADER,
+    CaptureBus,
+    CaptureRecord,
+    ReplayBus,
+    read_capture,
+)
+from homeassistant.components.pijups.const import DEFAULT_I2C_ADDRESS
+from homeassistant.components.pijups.diagnostics import get_config_entry_diagnostics
+from homeassistant.components.pijups.pijuice import PiJuiceStatus
+from homeassistant.components.pijups.sensor import PiJuiceSensor
+
+from .benchmark import create_pijups
+from .smbus2 import SMBus
+
+
+def poll_sensors(hass, entry, pijups):
+    """Read status and all sensor values."""
+    pijups.get_piju_status(True)
+    values = {}
+    for description in PiJuiceSensor.SENSOR_LIST:
+        sensor = PiJuiceSensor(hass, entry, description)
+        sensor.update()
+        values[description.name] = sensor.native_value
+    return values
+
+
+def test_capture_replay(hass, tmp_path):
+    """Record full stack traffic on emulated HAT and replay it without HAT."""
+    SMBus.SIM_BUS = 1
+    capture_file = str(tmp_path / "hat.cap")
+    buses = []
+
+    def capture_bus(bus):
+        buses.append(CaptureBus(SMBus(bus), DEFAULT_I2C_ADDRESS, capture_file))
+        return buses[-1]
+
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=capture_bus):
+        hass_rec, entry_rec, pijups = create_pijups()
+        recorded = [poll_sensors(hass_rec, entry_rec, pijups) for _ in range(3)]
+        buses[0].bus.io_error_next_read_call()
+        assert pijups.interface.ReadData(PiJuiceStatus.STATUS_CMD, 1)["error"] != "NO_ERROR"
+        get_config_entry_diagnostics(hass_rec, entry_rec)
+    stats = buses[0].close()
+    assert stats["records"] > 10
+
+    address, started, records = read_capture(capture_file)
+    assert address == DEFAULT_I2C_ADDRESS
+    assert started == pytest.approx(time.time(), abs=60)
+    assert len(records) == stats["records"]
+    assert any(record.write for record in records)
+    assert sum(record.error for record in records) == 1
+    assert all(b.time <= a.time for b, a in zip(records, records[1:]))
+
+    with patch(
+        "homeassistant.components.pijups.pijuice.SMBus",
+        new=lambda bus: ReplayBus(address, records),
+    ):
+        hass_rep, entry_rep, pijups = create_pijups()
+        replayed = [poll_sensors(hass_rep, entry_rep, pijups) for _ in range(3)]
+        assert pijups.interface.ReadData(PiJuiceStatus.STATUS_CMD, 1)["error"] != "NO_ERROR"
+        assert pijups.interface.ReadData(PiJuiceStatus.STATUS_CMD, 1)["error"] == "NO_ERROR"
+        assert get_config_entry_diagnostics(hass_rep, entry_rep)
+    assert replayed == recorded
+
+
+def test_replay_bus(tmp_path):
+    """Test replay bus rules, pacing and capture file checks."""
+    records = [
+        CaptureRecord(0.0, 0x40, False, False, b"\x01\xfe"),
+        CaptureRecord(0.1, 0x41, True, False, b"\x02\xfd"),
+        CaptureRecord(0.2, 0x40, False, True, b""),
+        CaptureRecord(0.3, 0x40, False, False, b"\x03\xfc"),
+    ]
+    bus = ReplayBus(0x14, records)
+    assert bus.read_i2c_block_data(0x14, 0x40, 2) == [1, 0xFE]
+    with pytest.raises(OSError):
+        bus.read_i2c_block_data(0x14, 0x40, 2)
+    assert bus.read_i2c_block_data(0x14, 0x40, 2) == [3, 0xFC]
+    # records used up, last read repeated
+    assert bus.read_i2c_block_data(0x14, 0x40, 2) == [3, 0xFC]
+    with pytest.raises(OSError):
+        bus.read_i2c_block_data(0x14, 0x41, 2)
+    with pytest.raises(OSError):
+        bus.read_i2c_block_data(0x15, 0x40, 2)
+    bus.write_i2c_block_data(0x14, 0x41, [2, 0xFD])
+    assert bus.writes == [(0x41, [2, 0xFD])]
+
+    bus = ReplayBus(0x14, records, speed=3)
+    started = time.monotonic()
+    bus.read_i2c_block_data(0x14, 0x40, 2)
+    with pytest.raises(OSError):
+        bus.read_i2c_block_data(0x14, 0x40, 2)
+    bus.read_i2c_block_data(0x14, 0x40, 2)
+    assert time.monotonic() - started >= 0.09
+
+    bad_file = tmp_path / "bad.cap"
+    bad_file.write_bytes(b"PJCP")
+    with pytest.raises(ValueError):
+        read_capture(str(bad_file))
+    bad_file.write_bytes(CAPTURE_HEADER.pack(b"XXXX", 1, 0x14, 0.0))
+    with pytest.raises(ValueError):
+        read_capture(str(bad_file))
+    bad_file.write_bytes(CAPTURE_HEADER.pack(b"PJCP", 1, 0x14, 0.0) + b"\x00\x00\x00\x00\x40\x00\x05\x01")
+    assert read_capture(str(bad_file))[2][0].data == b"\x01"
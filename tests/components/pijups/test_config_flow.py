@@ -192,6 +192,41 @@ async def test_entry_options_with_update(hass):
     )
 
 
+async def test_entry_options_with_write_failure(hass):
+    """Test that settings not accepted by device are reported on options form."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_entry_options_with_write_failure(hass, entry):
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        user_input = {
+            CONF_UPS_DELAY: DEFAULT_UPS_DELAY,
+            CONF_UPS_WAKEON_DELTA: DEFAULT_UPS_WAKEON_DELTA,
+            CONF_SCAN_INTERVAL: DEFAULT_SCAN_INTERVAL,
+            CONF_DIAG_LOG_CONFIG: ["5VREG_OFF"],
+            CONF_BATTERY_PROFILE: "SNN5843_2300",
+            CONF_BATTERY_TEMP_SENSE_CONFIG: "NTC",
+        }
+        with patch(
+            "homeassistant.components.pijups.interface.PiJups.apply_selections",
+            return_value={CONF_BATTERY_TEMP_SENSE_CONFIG: False, CONF_DIAG_LOG_CONFIG: True},
+        ):
+            result = await hass.config_entries.options.async_configure(
+                result["flow_id"], user_input=user_input
+            )
+        assert result["type"] == data_entry_flow.FlowResultType.FORM
+        assert result["step_id"] == "init"
+        assert result["errors"] == {CONF_BATTERY_TEMP_SENSE_CONFIG: "write_failed"}
+
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"], user_input=user_input
+        )
+        assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+
+    await common.pijups_setup_and_run_test(
+        hass, True, run_test_entry_options_with_write_failure
+    )
+
+
 async def test_entry_options_with_firmware_upgrade(hass: HomeAssistant):
     """Test PiJups interface settings for emulated h/w with default configuration.
 
@@ -211,6 +246,7 @@ async def test_entry_options_with_firmware_upgrade(hass: HomeAssistant):
                 entry.entry_id
             )
             pijups: interface.PiJups = await common.get_pijups(hass, entry)
+            assert await hass.async_add_executor_job(pijups.arm_watchdog, 3)
 
             fw_upgrade_configuration = {
                     CONF_UPS_DELAY: DEFAULT_UPS_DELAY,
@@ -234,6 +270,9 @@ async def test_entry_options_with_firmware_upgrade(hass: HomeAssistant):
             )
             assert fw_upgrade_progress
             assert not pijups.piju_enabled
+            # watchdog disarmed for upgrade, heartbeat does not access device
+            assert pijups.watchdog_period == 0
+            assert pijups.interface.i2cbus._get_buff(0x61)[:2] == [0, 0]
             last_progress_action = ""
             while fw_upgrade_progress["type"] == FlowResultType.SHOW_PROGRESS:
                 await asyncio.sleep(0.3)
@@ -254,6 +293,9 @@ async def test_entry_options_with_firmware_upgrade(hass: HomeAssistant):
             assert fw_firmware_finish["type"] == FlowResultType.CREATE_ENTRY
             assert fw_firmware_finish["data"] == fw_upgrade_configuration
             assert pijups.piju_enabled
+            # watchdog re-armed after HAT reset
+            assert pijups.watchdog_period == 3
+            assert pijups.interface.i2cbus._get_buff(0x61)[:2] == [3, 0]
 
         await common.pijups_setup_and_run_test(
             hass, True, run_test_entry_options_with_firmware_upgrade
@@ -0,0 +1,101 @@
+"""Test PiJups behaviour with emulated device latency and fault profiles."""
+from unittest.mock import patch
+
+import pytest
+
+import homeassistant.components.pijups.pijuice as pi
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import DeviceProfile, SMBus, get_device_profile
+
+from tests.components.pijups import common
+
+
+def test_device_profile():
+    """Test profile creation and repeatable random sequence."""
+    profile = DeviceProfile.from_dict(
+        {"latency": ["uniform", 0.001, 0.002], "cmd_latency": {"0x40": ["fixed", 0.01]}, "seed": 7}
+    )
+    assert profile.cmd_latency == {0x40: ("fixed", 0.01)}
+    assert profile.sample_latency(0x40) == 0.01
+    profile.activate()
+    first = [profile.sample_latency(0x41) for _ in range(5)]
+    profile.activate()
+    assert [profile.sample_latency(0x41) for _ in range(5)] == first
+    assert all(0.001 <= latency <= 0.002 for latency in first)
+    assert get_device_profile("noisy").nack_rate > 0
+    assert get_device_profile(profile) is profile
+    with pytest.raises(ValueError):
+        DeviceProfile(latency=("poisson", 1)).sample_latency(0x40)
+
+
+def test_profile_faults():
+    """Test injected faults are seen by PiJuice API as real ones."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuiceInterface(1, 0x14) as ifs:
+            bus = ifs.i2cbus
+            bus.set_profile({"nack_rate": 1.0})
+            assert ifs.ReadData(0x40, 1) == {"error": "COMMUNICATION_ERROR"}
+            assert ifs.WriteData(0x49, [0, 0]) == {"error": "COMMUNICATION_ERROR"}
+
+            bus.set_profile({"corrupt_rate": 1.0})
+            assert ifs.ReadData(0x4F, 2) == {"error": "DATA_CORRUPTED"}
+
+            # MSbit of 1st byte is restored by PiJuice API
+            bus.set_profile({"msbit_flip_rate": 1.0})
+            assert ifs.ReadData(0x4F, 2) == {"data": [146, 251], "error": "NO_ERROR"}
+            assert bus.profile.injected["msbit_flip"] == 1
+
+            # clock stretching beyond transfer timeout
+            bus.set_profile({"stretch_rate": 1.0, "stretch_time": 0.15})
+            assert ifs.ReadData(0x40, 1) == {"error": "COMMUNICATION_ERROR"}
+            bus.set_profile()
+            ifs.t.join()
+
+            # bus hang: transfers time out until window ends
+            profile = bus.set_profile({"hang_windows": [(0, 0.3)]})
+            assert ifs.ReadData(0x40, 1) == {"error": "COMMUNICATION_ERROR"}
+            ifs.t.join()
+            assert ifs.ReadData(0x40, 1)["error"] == "NO_ERROR"
+            assert profile.injected["hang"] == 1
+
+
+async def test_setup_with_bus_hang(hass: HomeAssistant):
+    """Test startup readiness polling outlasts bus hang."""
+    SMBus.SIM_BUS = 1
+    SMBus.add_init_profile({"hang_windows": [(0, 0.3)]})
+
+    async def run_test_setup_with_bus_hang(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        assert pijups.startup_timing["address"] >= 250
+        assert pijups.interface.i2cbus.profile.injected["hang"] >= 1
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_setup_with_bus_hang)
+
+
+async def test_polling_with_noisy_profile(hass: HomeAssistant):
+    """Test retries keep sensor values available on noisy bus."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_polling_with_noisy_profile(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        profile = pijups.interface.i2cbus.set_profile(
+            {"latency": ("gauss", 0.001, 0.0003), "nack_rate": 0.1, "corrupt_rate": 0.1, "seed": 3}
+        )
+
+        def poll():
+            # flipped checksum MSbit passes PiJuice API MSbit recovery with wrong 1st byte,
+            # so only availability is checked
+            for _ in range(20):
+                pijups.get_piju_status(True)
+                assert pijups.get_telemetry_value("GetBatteryVoltage") is not None
+                assert pijups.get_telemetry_value("GetChargeLevel") is not None
+
+        await hass.async_add_executor_job(poll)
+        assert profile.injected["nack"] > 0
+        assert profile.injected["corrupt"] > 0
+        pijups.interface.i2cbus.set_profile()
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_polling_with_noisy_profile)
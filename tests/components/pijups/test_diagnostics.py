@@ -67,3 +67,36 @@ async def test_with_fw15_minus(hass: HomeAssistant):
         check_diag_log(diag_log)
 
     await common.pijups_setup_and_run_test(hass, True, run_test_with_fw15_minus)
+
+
+async def test_snapshot_cache(hass: HomeAssistant):
+    """Test diagnostics configuration registers are served from cache until written."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_snapshot_cache(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        diag_log = await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+        assert diag_log.get("Timing, ms") is not None
+        assert "configuration" in diag_log["Timing, ms"]
+        assert "total" in diag_log["Timing, ms"]
+        assert diag_log.get("Unavailable registers") is None
+        power_inputs = diag_log["HAT power inputs"]
+
+        # device side change is not visible, register is cached
+        pijups.interface.i2cbus._set_buff(0x5E, [0x00, 0])
+        diag_log = await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+        assert diag_log["HAT power inputs"] == power_inputs
+
+        # status is volatile and always read from device
+        pijups.interface.i2cbus._set_buff(0x44, [0b11101111, 0])
+        diag_log = await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+        assert diag_log.get("Reported faults") is not None
+
+        # write through interface invalidates cached copy
+        await hass.async_add_executor_job(
+            pijups.interface.WriteData, 0x5E, [0x00]
+        )
+        diag_log = await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+        assert diag_log["HAT power inputs"] != power_inputs
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_snapshot_cache)
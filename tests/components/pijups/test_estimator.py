@@ -0,0 +1,77 @@
+"""Test PiJups battery runtime estimation."""
+import pytest
+
+from homeassistant.components.pijups.estimator import RuntimeEstimator
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+from tests.components.pijups import common
+
+
+def test_runtime_estimator():
+    """Test smoothing and time to empty/full estimates."""
+    estimator = RuntimeEstimator(time_constant=60)
+    assert estimator.time_to_empty is None
+    estimator.update(0, 4000, 500, 50)
+    assert estimator.power == 2.0
+    assert estimator.discharge_current == 500
+    # capacity unknown
+    assert estimator.time_to_empty is None
+    estimator.capacity = 1000
+    assert estimator.time_to_empty == 60
+    assert estimator.time_to_full is None
+
+    # after one time constant ~63% of step change is applied
+    estimator.update(60, 4000, 1000)
+    assert estimator.discharge_current == pytest.approx(816, abs=1)
+    assert estimator.power == 4.0
+    # samples out of order restart smoothing
+    estimator.update(30, 4000, 200)
+    assert estimator.discharge_current == 200
+
+    # charging
+    estimator.update(90, 4100, -500, 75)
+    estimator.update(900, 4100, -500)
+    assert estimator.time_to_empty is None
+    assert estimator.time_to_full == pytest.approx(30, abs=1)
+
+    # idle battery has no estimate
+    estimator.update(2000, 4100, 2)
+    estimator.update(3000, 4100, 2)
+    assert estimator.time_to_empty is None
+    assert estimator.time_to_full is None
+    assert estimator.get_diagnostics()["samples"] == 7
+
+
+async def test_runtime_estimate_sensors(hass: HomeAssistant):
+    """Test estimate sensors are fed from telemetry burst."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_runtime_estimate_sensors(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        # emulated battery: 4020 mV, 12 mA discharge, 82% of 1820 mAh
+        assert pijups.estimator.capacity == 1820
+        assert hass.states.get("sensor.pijups_battery_power").state == "0.048"
+        assert hass.states.get("sensor.pijups_discharge_current").state == "12.0"
+        assert hass.states.get("sensor.pijups_time_to_empty").state == "7462"
+        assert hass.states.get("sensor.pijups_time_to_full").state == "unknown"
+
+        samples = pijups.estimator.samples
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        assert pijups.estimator.samples == samples + 1
+
+        # battery profile change makes capacity to be re-read
+        bus = pijups.interface.i2cbus
+        profile = bus._get_buff(0x53)[:-1]
+        profile[0:2] = [0xE8, 0x03]
+        bus._set_buff(0x53, profile + [bus._get_check_sum(profile)])
+        await hass.async_add_executor_job(
+            pijups.call_pijuice_with_error_check, pijups.config.SetBatteryProfile, "PJZERO_1000"
+        )
+        assert not pijups.battery_capacity_known
+        await hass.async_add_executor_job(pijups.get_estimate, "time_to_empty")
+        assert pijups.estimator.capacity == 1000
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_runtime_estimate_sensors)
@@ -0,0 +1,88 @@
+"""Test PiJups telemetry fan-out socket."""
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import pytest_socket
+
+from homeassistant.components.pijups.const import CONF_TELEMETRY_SOCKET
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+from tests.components.pijups import common
+
+
+async def test_telemetry_fanout(hass: HomeAssistant, tmp_path):
+    """Test clients get telemetry frames and snapshots without own bus access."""
+    SMBus.SIM_BUS = 1
+    # test harness blocks socket connects, local clients are needed here
+    pytest_socket.socket_allow_hosts(["127.0.0.1"], allow_unix_socket=True)
+    socket_path = str(tmp_path / "pijups.sock")
+
+    async def run_test_telemetry_fanout(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        assert pijups.publisher is not None
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        other_reader, other_writer = await asyncio.open_unix_connection(socket_path)
+
+        while len(pijups.publisher.clients) < 2:
+            await asyncio.sleep(0.01)
+        # snapshot answered from last frame
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_block_till_done()
+        frame = json.loads(await asyncio.wait_for(reader.readline(), 1))
+        assert json.loads(await asyncio.wait_for(other_reader.readline(), 1)) == frame
+        assert frame["values"]["battery_voltage"] == 4020
+        assert frame["status"]["battery"] == "NORMAL"
+        assert frame["estimate"]["time_to_empty"] == 7462
+
+        writer.write(b"snapshot\n")
+        await writer.drain()
+        assert json.loads(await asyncio.wait_for(reader.readline(), 1)) == frame
+        published = pijups.publisher.published
+
+        # each burst is published
+        pijups.interface.i2cbus._set_buff(0x41, [50, 0])
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_block_till_done()
+        frame = json.loads(await asyncio.wait_for(reader.readline(), 1))
+        assert frame["values"]["charge"] == 50
+        assert pijups.publisher.published == published + 1
+
+        # burst without status is not published
+        def failed_get_status():
+            return {"error": "COMMUNICATION_ERROR"}
+
+        with patch.object(pijups, "decode_snapshot", return_value=None), patch.object(
+            pijups.status, "GetStatus", new=failed_get_status
+        ):
+            assert await hass.async_add_executor_job(pijups.get_piju_status, True) is None
+        await hass.async_block_till_done()
+        assert pijups.publisher.published == published + 1
+
+        # client sending line over stream limit is dropped, others still served
+        writer.write(b"x" * (2**16 + 1))
+        await writer.drain()
+        assert await asyncio.wait_for(reader.read(), 1) == b""
+        while len(pijups.publisher.clients) > 1:
+            await asyncio.sleep(0.01)
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_block_till_done()
+        assert json.loads(await asyncio.wait_for(other_reader.readline(), 1))
+        writer.close()
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        while len(pijups.publisher.clients) < 2:
+            await asyncio.sleep(0.01)
+
+        other_writer.close()
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        assert await reader.readline() == b""
+        writer.close()
+        assert not os.path.exists(socket_path)
+
+    with patch.dict(common.CONFIG_OPTIONS, {CONF_TELEMETRY_SOCKET: socket_path}):
+        await common.pijups_setup_and_run_test(hass, True, run_test_telemetry_fanout)
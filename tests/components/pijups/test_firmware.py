@@ -0,0 +1,55 @@
+"""Test PiJups firmware image catalogue."""
+import hashlib
+import os
+
+from homeassistant.components.pijups.firmware import FirmwareCatalogue, parse_version
+
+
+def test_firmware_catalogue(tmp_path):
+    """Test images are indexed, versions compared and hashes reused for unchanged files."""
+    (tmp_path / "pijuiceboot").write_bytes(b"")
+    (tmp_path / "PiJuice-V1.6_2021_09_10.elf.binary").write_bytes(b"v16")
+    (tmp_path / "PiJuice-V1.5_2020_01_01.elf.binary").write_bytes(b"v15")
+    (tmp_path / "PiJuice-V1.10_2023_01_01.elf.binary").write_bytes(b"v110")
+    (tmp_path / "readme.txt").write_bytes(b"")
+
+    assert parse_version("1.6") == (1, 6)
+    assert parse_version(None) == ()
+
+    catalogue = FirmwareCatalogue()
+    images = catalogue.refresh(str(tmp_path))
+    assert catalogue.utility_found
+    assert sorted(images) == [
+        "PiJuice-V1.10_2023_01_01.elf.binary",
+        "PiJuice-V1.5_2020_01_01.elf.binary",
+        "PiJuice-V1.6_2021_09_10.elf.binary",
+    ]
+    image = images["PiJuice-V1.6_2021_09_10.elf.binary"]
+    assert image["version"] == (1, 6)
+    assert image["size"] == 3
+    assert image["sha256"] == hashlib.sha256(b"v16").hexdigest()
+
+    upgrades = catalogue.get_upgrades("1.6")
+    assert list(upgrades) == [
+        "PiJuice-V1.10_2023_01_01.elf.binary",
+        "PiJuice-V1.6_2021_09_10.elf.binary",
+    ]
+    assert upgrades["PiJuice-V1.10_2023_01_01.elf.binary"]["newer"]
+    assert not upgrades["PiJuice-V1.6_2021_09_10.elf.binary"]["newer"]
+
+    # unchanged files are not hashed again
+    image["sha256"] = "cached"
+    catalogue.refresh(str(tmp_path))
+    assert images["PiJuice-V1.6_2021_09_10.elf.binary"]["sha256"] == "cached"
+
+    # modified and removed files are detected
+    file_path = tmp_path / "PiJuice-V1.6_2021_09_10.elf.binary"
+    file_path.write_bytes(b"v16 new")
+    os.utime(file_path, ns=(1, 1))
+    os.remove(tmp_path / "PiJuice-V1.5_2020_01_01.elf.binary")
+    images = catalogue.refresh(str(tmp_path))
+    assert images["PiJuice-V1.6_2021_09_10.elf.binary"]["sha256"] == hashlib.sha256(b"v16 new").hexdigest()
+    assert "PiJuice-V1.5_2020_01_01.elf.binary" not in images
+
+    assert catalogue.refresh(str(tmp_path / "missing")) == {}
+    assert not catalogue.utility_found
@@ -0,0 +1,61 @@
+"""Test PiJups import time and that optional modules are loaded lazily."""
+import ast
+import importlib
+import inspect
+
+from . import benchmark
+
+# modules needed by integration set-up: transport, interface and what they depend on
+SETUP_MODULES = {
+    "__init__",
+    "const",
+    "estimator",
+    "interface",
+    "loopwatch",
+    "pijuice",
+    "registers",
+    "rtc",
+    "services",
+    "stats",
+}
+
+# callbacks importing module already imported in executor by entry set-up
+PREIMPORTED_IN = {"config_flow.async_get_options_flow"}
+
+
+def test_import_time():
+    """Import integration in fresh interpreter, only set-up modules are loaded."""
+    result = benchmark.measure_import_time()
+    assert set(result["modules"]) == SETUP_MODULES
+    assert result["cumulative_us"] > 0
+    assert 0 < result["self_us"] <= sum(
+        times["cumulative_us"] for times in result["modules"].values()
+    )
+
+
+def test_platform_import_time():
+    """Config flow and diagnostics platforms (imported by HA at set-up) do not pull in optional modules."""
+    for platform in ("config_flow", "diagnostics"):
+        result = benchmark.measure_import_time(f"{benchmark.PACKAGE}.{platform}")
+        assert set(result["modules"]) == SETUP_MODULES | {platform}
+
+
+def test_no_import_in_event_loop():
+    """Lazily loaded modules are imported in executor, not by coroutines or callbacks run in event loop."""
+    for module_name in ("__init__", "config_flow", "services"):
+        module = importlib.import_module(
+            benchmark.PACKAGE if module_name == "__init__" else f"{benchmark.PACKAGE}.{module_name}"
+        )
+        for node in ast.walk(ast.parse(inspect.getsource(module))):
+            if isinstance(node, ast.AsyncFunctionDef) or any(
+                isinstance(decorator, ast.Name) and decorator.id == "callback"
+                for decorator in getattr(node, "decorator_list", ())
+            ):
+                imports = [
+                    child
+                    for child in ast.walk(node)
+                    if isinstance(child, ast.Import | ast.ImportFrom)
+                ]
+                assert not imports or f"{module_name}.{node.name}" in PREIMPORTED_IN, (
+                    f"{module_name}.{node.name} imports in event loop"
+                )
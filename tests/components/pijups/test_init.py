@@ -1,9 +1,11 @@
 """Test PiJups initilization path initiated from __init__.py."""
+from datetime import timedelta
 from unittest.mock import patch
 from homeassistant.components.hassio import (
     DOMAIN as HASSIO_DOMAIN,
     SERVICE_HOST_SHUTDOWN,
 )
+from homeassistant.components.pijups import diagnostics
 from homeassistant.components.pijups.interface import PiJups
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import RESTART_EXIT_CODE
@@ -17,10 +19,14 @@ from homeassistant.core import (
 )
 from homeassistant.components.pijups.const import (
     CONF_UPS_WAKEON_DELTA,
+    CONF_WATCHDOG_PERIOD,
+    DOMAIN,
 )
+import homeassistant.util.dt as dt_util
 
 from .smbus2 import SMBus
 
+from tests.common import MockConfigEntry, async_fire_time_changed
 from tests.components.pijups import common
 
 
@@ -48,6 +54,30 @@ async def test_async_setup_entry_default_with_conn_err(hass: HomeAssistant):
     )
 
 
+async def test_startup_timing(hass: HomeAssistant):
+    """Test HAT readiness polling and startup phase timing breakdown."""
+    SMBus.SIM_BUS = 1
+    SMBus.add_init_cmd_delays(0x7C, 2, 0.11)    # I2C_ADDRESS_CMD
+
+    async def run_test_startup_timing(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        assert list(pijups.startup_timing) == ["address", "initial reads", "led", "rtc", "faults"]
+        assert pijups.startup_timing["address"] >= 200
+        assert pijups.fw_version == "1.6"
+        assert pijups.piju_status is not None
+        assert pijups.powered is not None
+        diag_log = await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+        assert diag_log["Startup timing, ms"] == pijups.startup_timing
+        assert diag_log["RTC synchronisation"]["writes"] == 1
+        # no RTC access while device requests are disabled (firmware upgrade)
+        pijups.piju_enabled = False
+        assert await hass.async_add_executor_job(pijups.sync_rtc, True) is None
+        assert pijups.rtc_sync.writes == 1
+        pijups.piju_enabled = True
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_startup_timing)
+
+
 async def test_entry_setup_unload(hass):
     """Test if PiJups unloads for standard emulated h/w configuration with default configuration."""
     SMBus.SIM_BUS = 1
@@ -62,6 +92,59 @@ async def test_entry_setup_unload(hass):
     await common.pijups_setup_and_run_test(hass, True, run_test_entry_setup_unload)
 
 
+async def test_watchdog(hass: HomeAssistant):
+    """Test HAT watchdog is armed by option, kicked only if polling does not read status and disarmed."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            unique_id="watchdog",
+            data=common.CONFIG_DATA,
+            options={**common.CONFIG_OPTIONS, CONF_WATCHDOG_PERIOD: 2},
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        assert pijups.watchdog_period == 2
+        assert pijups.interface.i2cbus._get_buff(0x61)[:2] == [2, 0]
+
+        status_reads = []
+        get_status = pijups.status.GetStatus
+
+        def counted_get_status():
+            status_reads.append(1)
+            return get_status()
+
+        with patch.object(pijups.status, "GetStatus", new=counted_get_status):
+            # status read by polling within half period, no extra read
+            await hass.async_add_executor_job(pijups.watchdog_heartbeat)
+            assert status_reads == []
+            # no status reads for a minute, heartbeat timer reads status
+            pijups.watchdog_kicked_at -= 61
+            kicked_at = pijups.watchdog_kicked_at
+            async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=31))
+            await hass.async_block_till_done()
+            assert status_reads == [1]
+            assert pijups.watchdog_kicked_at > kicked_at
+            # no heartbeat while device requests are disabled (firmware upgrade)
+            pijups.piju_enabled = False
+            pijups.watchdog_kicked_at -= 61
+            await hass.async_add_executor_job(pijups.watchdog_heartbeat)
+            assert status_reads == [1]
+            pijups.piju_enabled = True
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        assert pijups.watchdog_period == 0
+        assert pijups.interface.i2cbus._get_buff(0x61)[:2] == [0, 0]
+
+        # shutdown path disarms watchdog too
+        assert await hass.async_add_executor_job(pijups.arm_watchdog, 5)
+        assert pijups.interface.i2cbus._get_buff(0x61)[:2] == [5, 0]
+        await hass.async_add_executor_job(pijups.process_power_off, 0, 0, False)
+        assert pijups.interface.i2cbus._get_buff(0x61)[:2] == [0, 0]
+
+
 async def test_with_bad_firmware(hass: HomeAssistant):
     """Test integration initialization with wrong firmware version - pre 1.0 ."""
     SMBus.SIM_BUS = 1
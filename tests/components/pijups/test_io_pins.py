@@ -0,0 +1,81 @@
+"""Test PiJups IO pin entities."""
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+from tests.components.pijups import common
+
+
+async def test_io_analog_in_digital_out(hass: HomeAssistant):
+    """Test analog input sensor and digital output switch entities."""
+    SMBus.SIM_BUS = 1
+    SMBus.add_init_adjustments(0x72, [0x81, 0, 0, 0, 0, 0])  # IO1 ANALOG_IN
+    SMBus.add_init_adjustments(0x77, [0x03, 0, 0, 0, 0, 0])  # IO2 DIGITAL_OUT_PUSHPULL
+
+    async def run_test_io_analog_in_digital_out(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        assert hass.states.get("sensor.pijups_io1").state == "13685"
+        assert hass.states.get("sensor.pijups_io1").attributes["mode"] == "ANALOG_IN"
+        assert hass.states.get("switch.pijups_io2").state == "off"
+        assert hass.states.get("binary_sensor.pijups_io1") is None
+        assert hass.states.get("number.pijups_io2") is None
+
+        # pins are read with telemetry burst
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        assert 0x75 in pijups.telemetry.registers
+        assert 0x7A in pijups.telemetry.registers
+
+        await hass.services.async_call(
+            "switch", "turn_on", {"entity_id": "switch.pijups_io2"}, blocking=True
+        )
+        assert pijups.interface.i2cbus._get_buff(0x7A)[:2] == [0, 1]
+        assert hass.states.get("switch.pijups_io2").state == "on"
+        # written register is dropped from telemetry until next burst
+        assert 0x7A not in pijups.telemetry.registers
+        await hass.services.async_call(
+            "switch", "turn_off", {"entity_id": "switch.pijups_io2"}, blocking=True
+        )
+        assert pijups.interface.i2cbus._get_buff(0x7A)[:2] == [0, 0]
+        assert hass.states.get("switch.pijups_io2").state == "off"
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_io_analog_in_digital_out)
+
+
+async def test_io_digital_in_pwm(hass: HomeAssistant):
+    """Test digital input binary sensor and PWM number entities."""
+    SMBus.SIM_BUS = 1
+    SMBus.add_init_adjustments(0x72, [0x02, 0, 0, 0, 0, 0])  # IO1 DIGITAL_IN
+    SMBus.add_init_adjustments(0x77, [0x05, 0, 0, 0, 0, 0])  # IO2 PWM_OUT_PUSHPULL
+
+    async def run_test_io_digital_in_pwm(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        assert hass.states.get("binary_sensor.pijups_io1").state == "off"
+        assert hass.states.get("number.pijups_io2").state == "20.0"
+        assert hass.states.get("sensor.pijups_io1") is None
+
+        await hass.services.async_call(
+            "number",
+            "set_value",
+            {"entity_id": "number.pijups_io2", "value": 50},
+            blocking=True,
+        )
+        assert pijups.interface.i2cbus._get_buff(0x7A)[:2] == [0xFF, 0x7F]
+        assert hass.states.get("number.pijups_io2").state == "50.0"
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_io_digital_in_pwm)
+
+
+async def test_io_not_used(hass: HomeAssistant):
+    """Test unused IO pins have no entities and are not read."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_io_not_used(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        assert pijups.io_config[1]["mode"] == "NOT_USED"
+        for entity_id in ("sensor.pijups_io1", "binary_sensor.pijups_io1", "switch.pijups_io2", "number.pijups_io2"):
+            assert hass.states.get(entity_id) is None
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        assert 0x75 not in pijups.telemetry.registers
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_io_not_used)
@@ -0,0 +1,97 @@
+"""Test PiJups event loop blocking detector."""
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+from homeassistant.components.pijups import diagnostics, loopwatch
+from homeassistant.components.pijups.const import CONF_LOOP_BLOCK_THRESHOLD, DOMAIN
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+from tests.common import MockConfigEntry
+from tests.components.pijups import common
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@loopwatch.watch_loop
+async def blocking_entry(delay):
+    """Block event loop between two awaits."""
+    await asyncio.sleep(0)
+    time.sleep(delay)
+    await asyncio.sleep(0)
+    return delay
+
+
+async def test_blocking_detected(hass: HomeAssistant):
+    """Blocking step is timed and its stack is logged."""
+    assert await blocking_entry(0) == 0
+    with loopwatch.detect_loop_blocking(hass.loop, 0.05, TEST_DIR) as detector:
+        await asyncio.sleep(0.1)
+        assert await blocking_entry(0.3) == 0.3
+        await asyncio.sleep(0.1)
+    assert loopwatch.ACTIVE_DETECTOR is None
+    stats = detector.entry_stats["test_loopwatch.blocking_entry"]
+    assert stats["steps"] == 3
+    assert stats["max_step_ms"] >= 300
+    entries = [block["entry"] for block in detector.blocks]
+    assert "test_loopwatch.blocking_entry" in entries
+    stacks = [block["stack"] for block in detector.blocks if block["stack"]]
+    assert len(stacks) == 1
+    assert "time.sleep(delay)" in stacks[0]
+
+    # exceptions and cancellation pass through timed coroutine
+    with loopwatch.detect_loop_blocking(hass.loop, 0.05, TEST_DIR):
+        task = hass.loop.create_task(blocking_entry(0))
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert task.cancelled()
+
+
+async def test_integration_does_not_block(hass: HomeAssistant):
+    """Set-up, options form and diagnostics do not hold event loop."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_integration_does_not_block(hass, entry):
+        await hass.async_block_till_done()
+        with loopwatch.detect_loop_blocking(hass.loop, 0.5) as detector:
+            result = await hass.config_entries.options.async_init(entry.entry_id)
+            hass.config_entries.options.async_abort(result["flow_id"])
+            await diagnostics.async_get_config_entry_diagnostics(hass, entry)
+        assert detector.blocks == []
+        assert set(detector.entry_stats) == {
+            "options_flow.PiJuOptionsFlowHandler.async_step_init",
+            "diagnostics.async_get_config_entry_diagnostics",
+        }
+
+    with loopwatch.detect_loop_blocking(hass.loop, 0.5) as detector:
+        await common.pijups_setup_and_run_test(hass, True, run_test_integration_does_not_block)
+    assert detector.blocks == []
+    assert "sensor.async_setup_entry" in detector.entry_stats
+    assert "diagnostics.async_get_config_entry_diagnostics" not in detector.entry_stats
+
+
+async def test_detector_option(hass: HomeAssistant):
+    """Detector is started by option and stopped on unload."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            unique_id="loopwatch",
+            data=common.CONFIG_DATA,
+            options={**common.CONFIG_OPTIONS, CONF_LOOP_BLOCK_THRESHOLD: 500},
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        detector = loopwatch.ACTIVE_DETECTOR
+        assert detector.threshold == 0.5
+        assert "sensor.async_setup_entry" in detector.entry_stats
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        assert loopwatch.ACTIVE_DETECTOR is None
+        assert detector.blocks == []
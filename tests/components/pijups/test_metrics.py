@@ -0,0 +1,70 @@
+"""Test PiJups OpenMetrics view."""
+from http import HTTPStatus
+from unittest.mock import patch
+
+from homeassistant.components.pijups.const import CONF_METRICS
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from .smbus2 import SMBus
+
+from tests.components.pijups import common
+
+
+async def test_metrics_view(hass: HomeAssistant, hass_client):
+    """Test metrics are rendered from cached telemetry without bus access."""
+    SMBus.SIM_BUS = 1
+    assert await async_setup_component(hass, "http", {})
+
+    async def run_test_metrics_view(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        client = await hass_client()
+        counters = {op: dict(stats) for op, stats in pijups.interface.transfer_stats.items()}
+
+        response = await client.get("/api/pijups/metrics")
+        assert response.status == HTTPStatus.OK
+        assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+        text = await response.text()
+        device = f'device="{entry.unique_id}"'
+        assert text.endswith("# EOF\n")
+        assert "# TYPE pijups_battery_voltage_volts gauge" in text
+        assert "# UNIT pijups_battery_voltage_volts volts" in text
+        assert f"pijups_battery_voltage_volts{{{device}}} 4.02" in text
+        assert f"pijups_battery_charge_ratio{{{device}}} 0.82" in text
+        assert f"pijups_battery_time_to_empty_seconds{{{device}}} 447720" in text
+        assert "pijups_battery_time_to_full_seconds" not in text
+        assert f'pijups_health{{{device},pijups_health="fault"}} 0' in text
+        assert f'pijups_health{{{device},pijups_health="ok"}} 1' in text
+        reads = counters["read"]["count"]
+        assert f'pijups_i2c_transfer_seconds_count{{{device},op="read"}} {reads}' in text
+        assert f'pijups_i2c_errors_total{{{device},op="read"}} 0' in text
+        # scrape did not touch the bus
+        assert pijups.interface.transfer_stats == counters
+
+        pijups.piju_enabled = False
+        text = await (await client.get("/api/pijups/metrics")).text()
+        assert f'pijups_health{{{device},pijups_health="unavailable"}} 1' in text
+        pijups.piju_enabled = True
+
+        # failed transfers are counted
+        pijups.interface.i2cbus.io_error_next_read_call()
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        assert pijups.interface.transfer_stats["read"]["errors"] == 1
+
+    with patch.dict(common.CONFIG_OPTIONS, {CONF_METRICS: True}):
+        await common.pijups_setup_and_run_test(hass, True, run_test_metrics_view)
+
+
+async def test_metrics_view_disabled(hass: HomeAssistant, hass_client):
+    """Test metrics are not served if not enabled."""
+    SMBus.SIM_BUS = 1
+    assert await async_setup_component(hass, "http", {})
+
+    async def run_test_metrics_view_disabled(hass, entry):
+        client = await hass_client()
+        response = await client.get("/api/pijups/metrics")
+        assert response.status == HTTPStatus.NOT_FOUND
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_metrics_view_disabled)
@@ -1,4 +1,5 @@
 """Test PiJups initilization path initiated from __init__.py."""
+import threading
 import time
 import inspect
 from unittest.mock import patch
@@ -3237,3 +3238,44 @@ def test_pijuice_different_independent_funcs(hass: HomeAssistant):
         assert len(version_info) > 0
         assert firmware_version is None
         assert len(os_version) > 0
+
+def test_pijuice_batch_verify(hass: HomeAssistant):
+    """Test batched writes are verified together after single settle delay."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuice(1, 0x14) as pijuice:
+            pijuice.interface.BeginBatch()
+            start = time.monotonic()
+            assert pijuice.config.SetLedConfiguration("D1", {"function": "USER_LED", "parameter": {"r": 1, "g": 2, "b": 3}}) == {"error": "NO_ERROR"}
+            assert pijuice.config.SetIoConfiguration(1, {"mode": "DIGITAL_IN", "pull": "NOPULL", "wakeup": "NO_WAKEUP"}) == {"error": "NO_ERROR"}
+            assert pijuice.interface.WriteDataVerify(0x5D, [0x00]) == {"error": "NO_ERROR"}
+            assert time.monotonic() - start < 0.2
+            ret = pijuice.interface.EndBatch()
+            assert ret == {
+                "data": [
+                    {"cmd": 0x6A, "error": "NO_ERROR"},
+                    {"cmd": 0x72, "error": "NO_ERROR"},
+                    {"cmd": 0x5D, "error": "NO_ERROR"},
+                ],
+                "error": "NO_ERROR",
+            }
+            assert time.monotonic() - start < 0.4
+            # read-back mismatch is reported per register
+            pijuice.interface.BeginBatch()
+            pijuice.interface.WriteDataVerify(0x5D, [0x00])
+            pijuice.interface.i2cbus.io_buffer_next_read_call(0x5D, [0x01, 0])
+            assert pijuice.interface.EndBatch() == {
+                "data": [{"cmd": 0x5D, "error": "WRITE_FAILED"}],
+                "error": "WRITE_FAILED",
+            }
+            assert pijuice.interface.EndBatch() == {"data": [], "error": "NO_ERROR"}
+            # batch belongs to thread that opened it, other threads write and verify immediately
+            pijuice.interface.BeginBatch()
+            other = []
+            thread = threading.Thread(
+                target=lambda: other.append(pijuice.interface.WriteDataVerify(0x5D, [0x01]))
+            )
+            thread.start()
+            thread.join()
+            assert other == [{"error": "NO_ERROR"}]
+            assert pijuice.interface.EndBatch() == {"data": [], "error": "NO_ERROR"}
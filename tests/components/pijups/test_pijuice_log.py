@@ -0,0 +1,139 @@
+"""Test PiJuice diagnostic log reader and command line interface."""
+from datetime import datetime
+import json
+import time
+from unittest.mock import patch
+
+import homeassistant.components.pijups.pijuice as pi
+from homeassistant.components.pijups import pijuice_log
+
+from .smbus2 import SMBus
+
+LOG_RECORDS = 24
+
+
+def test_pijuice_log_records():
+    """Test structured records built from emulated log buffers."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuiceInterface(1, 0x14) as ifs:
+            ret = pijuice_log.ReadPiJuiceLogFrames(ifs)
+            assert ret["error"] == "NO_ERROR"
+            records = [pijuice_log.GetLogRecord(d) for d in ret["data"]]
+            assert len(records) == LOG_RECORDS
+            json.dumps(records)
+            assert records[0]["event"] == "ALARM_WRITE"
+            assert records[-1] == {
+                "index": 0,
+                "event": "WAKEUP_EVT",
+                "time": "2022-12-07T14:47:40.917968",
+                "charge": 77.6,
+                "battery_voltage": 4.001,
+                "temperature": 52,
+                "battery": "CHARGING_FROM_5V_IO",
+                "regulator_on": True,
+                "gpio_5v_voltage": 5.184,
+                "gpio_5v_current": 0.38,
+                "power_input_5v_io": "PRESENT",
+                "triggers": ["ON_CHARGE"],
+                "wakeup_on_charge": 240,
+            }
+            # invalid timestamps are reported as None
+            assert [r["time"] for r in records].count(None) == 2
+
+            # string output keeps its original format
+            ifs.WriteData(pijuice_log.LOGGING_CMD, [0])
+            log = pijuice_log.GetPiJuiceLog(ifs)
+            assert log["error"] == "NO_ERROR"
+
+
+def test_pijuice_log_follow():
+    """Test follow mode emits only new frames and honours since filter."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuiceInterface(1, 0x14) as ifs:
+            emitted = []
+            pijuice_log.FollowPiJuiceLog(ifs, 0, emitted.append, polls=3)
+            assert len(emitted) == LOG_RECORDS
+
+            # new frame appears in buffer after first poll, only this one is emitted again
+            def emit_and_add(data):
+                emitted.append(data)
+                if len(emitted) == LOG_RECORDS:
+                    new_frame = ifs.i2cbus.logging_buffers[0].copy()
+                    new_frame[0] = 200
+                    ifs.i2cbus.logging_buffers.insert(0, new_frame)
+
+            emitted = []
+            pijuice_log.FollowPiJuiceLog(ifs, 0, emit_and_add, polls=3)
+            assert len(emitted) == LOG_RECORDS + 1
+            assert emitted[-1][0] == 200
+            ifs.i2cbus.logging_buffers.pop(0)
+
+            emitted = []
+            pijuice_log.FollowPiJuiceLog(
+                ifs, 0, emitted.append, since=datetime(2022, 12, 7), polls=2
+            )
+            assert len(emitted) == LOG_RECORDS - 2
+            emitted = []
+            pijuice_log.FollowPiJuiceLog(
+                ifs, 0, emitted.append, since=datetime(2023, 1, 1), polls=1
+            )
+            assert emitted == []
+
+
+def test_pijuice_log_main(tmp_path, capsys):
+    """Test command line interface output options."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        log_file = tmp_path / "pijuice_log.jsonl"
+        assert pijuice_log.main(["--jsonl", str(log_file)]) == 0
+        lines = log_file.read_text().splitlines()
+        assert len(lines) == LOG_RECORDS
+        assert json.loads(lines[-1])["event"] == "WAKEUP_EVT"
+
+        assert pijuice_log.main(["--since", "2022-12-07T00:00:00"]) == 0
+        out = capsys.readouterr().out
+        assert out.count("WAKEUP_EVT") == 2
+        assert "5VREG_ON" in out
+
+        assert pijuice_log.main(["--since", "2022-12-07T02:00:00+02:00"]) == 0
+        assert capsys.readouterr().out == out
+        assert pijuice_log.main(["--since", "2022-12-07T00:00:00Z"]) == 0
+        assert capsys.readouterr().out == out
+
+        assert pijuice_log.main(["--get_config"]) == 0
+        assert capsys.readouterr().out == "5VREG_ON|RESERVED2\n"
+
+        assert pijuice_log.main(["--enable", "UNKNOWN"]) == -1
+        assert pijuice_log.main(["--enable", "5VREG_OFF|MCU_RESET"]) == 0
+        assert pijuice_log.main(["--disable"]) == 0
+
+
+def test_pijuice_log_request_polling():
+    """Test LOGGING_CMD requests poll for valid response instead of fixed sleeps."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuiceInterface(1, 0x14) as ifs:
+            start = time.monotonic()
+            assert pijuice_log.SetLogConfig(ifs, ["5VREG_OFF", "MCU_RESET"]) == {
+                "data": 0x24,
+                "error": "NO_ERROR",
+            }
+            assert pijuice_log.GetLogConfig(ifs) == {
+                "data": ["5VREG_OFF", "MCU_RESET"],
+                "error": "NO_ERROR",
+            }
+            assert time.monotonic() - start < 0.1
+
+            # response never becomes valid, request gives up at deadline
+            start = time.monotonic()
+            ret = pijuice_log.LogRequest(ifs, [0], deadline=0.1)
+            assert ret["error"] == "INVALID_RESPONSE"
+            assert time.monotonic() - start < 0.2
+
+            # communication failure on log read restarts it
+            ifs.i2cbus.add_cmd_delays(pijuice_log.LOGGING_CMD, 1, 0.11)
+            ret = pijuice_log.ReadPiJuiceLogFrames(ifs)
+            assert ret["error"] == "NO_ERROR"
+            assert len(ret["data"]) == LOG_RECORDS
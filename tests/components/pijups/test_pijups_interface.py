@@ -1,8 +1,10 @@
 """Test PiJups interface class methods."""
 import asyncio
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from datetime import UTC
 import os
+import time
 from unittest.mock import patch
 
 from homeassistant.components.pijups import interface
@@ -15,9 +17,12 @@ from homeassistant.components.pijups.const import (
     DEFAULT_I2C_ADDRESS,
     DEFAULT_I2C_BUS,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_COUNT,
+    EVENT_PIJUPS_FAULT,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_component import async_update_entity
 from .smbus2 import SMBus
 
 from tests.components.pijups import common
@@ -76,6 +81,53 @@ async def test_interface_auto_search(hass: HomeAssistant):
         assert device_addresses.get("address_options") == [DEFAULT_I2C_ADDRESS]
 
 
+async def test_interface_option_snapshot(hass: HomeAssistant):
+    """Test options flow defaults are cached and dropped on related writes."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_interface_option_snapshot(hass, entry):
+        pijups: interface.PiJups = await common.get_pijups(hass, entry)
+        snapshot = await hass.async_add_executor_job(
+            pijups.get_option_snapshot, hass, entry
+        )
+        assert snapshot["defaults"][CONF_BATTERY_TEMP_SENSE_CONFIG]["default"] == "ON_BOARD"
+        assert snapshot["logging"][CONF_DIAG_LOG_CONFIG]["default"] == ["5VREG_ON"]
+        assert snapshot["fw_options"].get(CONF_FIRMWARE_SELECTION) is not None
+        assert snapshot["fw_path"].get(CONF_FW_UPGRADE_PATH) is not None
+        assert (
+            await hass.async_add_executor_job(pijups.get_option_snapshot, hass, entry)
+            is snapshot
+        )
+
+        # unrelated write keeps cached data
+        await hass.async_add_executor_job(pijups.set_led_ha_active)
+        assert pijups.option_snapshot is snapshot
+
+        await hass.async_add_executor_job(
+            pijups.config.SetBatteryTempSenseConfig, "NTC"
+        )
+        assert pijups.option_snapshot is None
+        snapshot = await hass.async_add_executor_job(
+            pijups.get_option_snapshot, hass, entry
+        )
+        assert snapshot["defaults"][CONF_BATTERY_TEMP_SENSE_CONFIG]["default"] == "NTC"
+
+        await hass.async_add_executor_job(pijups.set_diag_log_config, ["5VREG_OFF"])
+        snapshot = await hass.async_add_executor_job(
+            pijups.get_option_snapshot, hass, entry
+        )
+        assert snapshot["logging"][CONF_DIAG_LOG_CONFIG]["default"] == ["5VREG_OFF"]
+
+        # cached data expires
+        pijups.option_snapshot_read_at -= 3600
+        assert (
+            await hass.async_add_executor_job(pijups.get_option_snapshot, hass, entry)
+            is not snapshot
+        )
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_interface_option_snapshot)
+
+
 async def test_interface_configuration_options(hass: HomeAssistant):
     """Test PiJups interface settings for emulated h/w with default configuration.
 
@@ -437,6 +489,145 @@ async def test_interface_fault_event(hass: HomeAssistant):
     await common.pijups_setup_and_run_test(hass, True, run_test_interface_fault_event)
 
 
+async def test_interface_single_burst_per_poll(hass: HomeAssistant):
+    """Test parallel entity updates on stale status share one telemetry burst."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_interface_single_burst_per_poll(hass, entry):
+        pijups: interface.PiJups = await common.get_pijups(hass, entry)
+        bursts = []
+        read_telemetry = pijups.read_telemetry
+
+        def slow_read_telemetry(time_now, read_all=False):
+            bursts.append(time_now)
+            time.sleep(0.1)
+            read_telemetry(time_now, read_all)
+
+        pijups.piju_status_read_at -= timedelta(seconds=DEFAULT_SCAN_INTERVAL * 2)
+        with patch.object(pijups, "read_telemetry", new=slow_read_telemetry):
+            statuses = await asyncio.gather(
+                *(hass.async_add_executor_job(pijups.get_piju_status) for _ in range(4))
+            )
+        assert len(bursts) == 1
+        assert all(status == statuses[0] for status in statuses)
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_interface_single_burst_per_poll)
+
+async def test_interface_fault_monitoring(hass: HomeAssistant):
+    """Test faults follow status fault bit, fault register is read when bit flips or on slow cadence while set."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_interface_fault_monitoring(hass, entry):
+        pijups: interface.PiJups = await common.get_pijups(hass, entry)
+        # faults set by emulation at startup are reported and cleared
+        assert pijups.faults == {}
+        assert pijups.interface.i2cbus._get_buff(0x44)[0] == 0
+        await async_update_entity(hass, "binary_sensor.pijups_fault_watchdog_reset")
+        assert hass.states.get("binary_sensor.pijups_fault_watchdog_reset").state == "off"
+        events = []
+        hass.bus.async_listen(EVENT_PIJUPS_FAULT, events.append)
+
+        pijups.interface.i2cbus._set_buff(0x44, [0b10001000, 0])  # watchdog reset, COOL
+        fault_reads = []
+        get_fault_status = pijups.status.GetFaultStatus
+
+        def counted_get_fault_status():
+            fault_reads.append(1)
+            return get_fault_status()
+
+        with patch.object(pijups.status, "GetFaultStatus", new=counted_get_fault_status):
+            for _ in range(3):
+                await hass.async_add_executor_job(pijups.get_piju_status, True)
+            assert len(fault_reads) == 1
+            assert pijups.faults == {"watchdog_reset": True, "charging_temperature_fault": "COOL"}
+            assert pijups.get_health() == interface.HEALTH_FAULT
+            await hass.async_block_till_done()
+            assert len(events) == 1
+            assert events[0].data["faults"] == pijups.faults
+            for fault in ("watchdog_reset", "charging_temperature_fault", "forced_power_off"):
+                await async_update_entity(hass, f"binary_sensor.pijups_fault_{fault}")
+            assert hass.states.get("binary_sensor.pijups_fault_watchdog_reset").state == "on"
+            state = hass.states.get("binary_sensor.pijups_fault_charging_temperature_fault")
+            assert state.state == "on"
+            assert state.attributes["state"] == "COOL"
+            assert hass.states.get("binary_sensor.pijups_fault_forced_power_off").state == "off"
+
+            # fault events cleared with one write, condition is left
+            pijups.interface.i2cbus.set_write_log(True)
+            ret = await hass.async_add_executor_job(pijups.clear_faults)
+            assert list(pijups.interface.i2cbus.set_write_log(False)) == [0x44]
+            assert ret["data"] == {"charging_temperature_fault": "COOL"}
+            assert len(fault_reads) == 2
+            await hass.async_add_executor_job(pijups.get_piju_status, True)
+            assert len(fault_reads) == 2
+
+            # fault raised while condition is still set is read on slow cadence, only new one is fired
+            pijups.interface.i2cbus._set_buff(0x44, [0b10000010, 0])  # forced power off, COOL
+            await hass.async_add_executor_job(pijups.get_piju_status, True)
+            assert len(fault_reads) == 2
+            pijups.faults_read_at -= timedelta(seconds=DEFAULT_SCAN_INTERVAL * DEFAULT_SLOW_SCAN_COUNT)
+            await hass.async_add_executor_job(pijups.get_piju_status, True)
+            assert len(fault_reads) == 3
+            assert pijups.faults == {"forced_power_off": True, "charging_temperature_fault": "COOL"}
+            await hass.async_block_till_done()
+            assert len(events) == 2
+            assert events[1].data["faults"] == {"forced_power_off": True}
+
+            pijups.interface.i2cbus._set_buff(0x44, [0, 0])
+            await hass.async_add_executor_job(pijups.get_piju_status, True)
+            assert pijups.faults == {}
+            assert len(fault_reads) == 3
+        await hass.async_block_till_done()
+        assert len(events) == 2
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_interface_fault_monitoring)
+
+
+async def test_interface_apply_selections_batch(hass: HomeAssistant):
+    """Test batched selections: failed verification is left to setter, foreign writes are not batched."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_interface_apply_selections_batch(hass, entry):
+        pijups: interface.PiJups = await common.get_pijups(hass, entry)
+        ifs = pijups.interface
+        setter_results = []
+
+        def tolerant_setter(value):
+            # maps read-back mismatch to success like SetChargingConfig does
+            ret = ifs.WriteDataVerify(0x5D, [value])
+            setter_results.append(ret["error"])
+            if ret["error"] == "WRITE_FAILED":
+                ret = {"error": "NO_ERROR"}
+            return ret
+
+        def setter_with_foreign_write(value):
+            # write from other thread while batch is open is verified on its own
+            other = []
+            with ThreadPoolExecutor(1) as executor:
+                executor.submit(lambda: other.append(ifs.WriteDataVerify(0x5E, [0x0B]))).result()
+            assert other == [{"error": "NO_ERROR"}]
+            return ifs.WriteDataVerify(0x72, [value, 0, 0, 0, 0])
+
+        defaults_list = [
+            {
+                "tolerant": {"default": 0, "setter": tolerant_setter},
+                "io1": {"default": 0, "setter": setter_with_foreign_write},
+            }
+        ]
+
+        def apply_with_mismatch():
+            ifs.i2cbus.io_buffer_next_read_call(0x5D, [0x07, 0])
+            return pijups.apply_selections(defaults_list, {"tolerant": 1, "io1": 2})
+
+        results = await hass.async_add_executor_job(apply_with_mismatch)
+        assert results == {"tolerant": True, "io1": True}
+        # batched write reported NO_ERROR, setter was called again after failed batch verification
+        assert setter_results == ["NO_ERROR", "NO_ERROR"]
+        assert ifs.batch is None
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_interface_apply_selections_batch)
+
+
 def sync_wake_with_kwd_prm(pijups: interface.PiJups, on_charge_level):
     """Call with kwd paramater for task."""
     return pijups.call_pijuice_with_error_check(
@@ -0,0 +1,52 @@
+"""Test PiJups sampling profiler."""
+import os
+import threading
+import time
+
+from homeassistant.components.pijups.profiler import SamplingProfiler
+
+
+def busy_wait(stop_event):
+    """Keep thread in this function until stopped."""
+    while not stop_event.is_set():
+        time.sleep(0.001)
+
+
+def test_sampling_profiler(tmp_path):
+    """Sample thread running code from selected package directory."""
+    stop_event = threading.Event()
+    worker = threading.Thread(target=busy_wait, args=(stop_event,))
+    worker.start()
+    markers = iter(range(1000))
+    try:
+        profiler = SamplingProfiler(
+            interval=0.002,
+            loop_thread_id=worker.ident,
+            package_dir=os.path.dirname(os.path.abspath(__file__)),
+        )
+        stats = profiler.run(0.2)
+        assert stats["samples"] > 10
+        assert stats["cycles"] == 0
+        assert stats["active_samples"] >= stats["samples"] - 1
+        assert stats["threads"] == {"event_loop": stats["active_samples"]}
+        assert list(stats["top"]) == ["test_profiler.py:busy_wait"]
+
+        # stop after poll cycles, marker changes on every call
+        profiler = SamplingProfiler(interval=0.002)
+        stats = profiler.run(10, 3, lambda: next(markers))
+        assert stats["cycles"] == 3
+        assert stats["elapsed_s"] < 5
+    finally:
+        stop_event.set()
+        worker.join()
+
+    report = tmp_path / "profile.txt"
+    profiler.write_report(str(report), stats)
+    assert "poll cycles" in report.read_text(encoding="utf-8")
+
+    # stopped before start
+    profiler = SamplingProfiler()
+    profiler.stop()
+    stats = profiler.run(10)
+    assert stats["samples"] == 0
+    profiler.write_report(str(report), stats)
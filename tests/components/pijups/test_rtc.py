@@ -0,0 +1,73 @@
+"""Test PiJups drift aware RTC synchronisation."""
+from datetime import datetime, timedelta
+from datetime import UTC
+from unittest.mock import patch
+
+import homeassistant.components.pijups.pijuice as pi
+from homeassistant.components.pijups.rtc import (
+    RtcSync,
+    decode_rtc_time,
+    encode_rtc_time,
+)
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+
+def test_rtc_time_encoding():
+    """Test RTC register image conversions."""
+    when = datetime(2024, 2, 29, 23, 59, 58, tzinfo=UTC)
+    data = encode_rtc_time(when)
+    assert data == [0x58, 0x59, 0x23, 5, 0x29, 0x02, 0x24, 0, 0]
+    assert decode_rtc_time(data) == when
+    # 12h format
+    assert decode_rtc_time([0, 0, 0x40 | 0x20 | 0x11, 5, 0x29, 0x02, 0x24, 0, 0]).hour == 23
+    assert decode_rtc_time([0, 0, 0x40 | 0x12, 5, 0x29, 0x02, 0x24, 0, 0]).hour == 0
+    # invalid date
+    assert decode_rtc_time([0, 0, 0, 5, 0x31, 0x02, 0x24, 0, 0]) is None
+
+
+def test_rtc_sync(hass: HomeAssistant):
+    """Test RTC is written only if drifted and drift rate is measured."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuice(1, 0x14) as pijuice:
+            rtc_sync = RtcSync(pijuice.interface)
+            # emulator RTC is years behind
+            ret = rtc_sync.sync()
+            assert ret["error"] == "NO_ERROR"
+            assert ret["data"]["written"]
+            assert ret["data"]["drift"] < -86400
+            assert rtc_sync.writes == 1
+            rtc_time = decode_rtc_time(pijuice.interface.i2cbus._get_buff(0xB0))
+            assert abs((rtc_time - datetime.now(UTC)).total_seconds()) <= 2
+
+            # within threshold, not written
+            pijuice.interface.i2cbus.set_write_log(True)
+            ret = rtc_sync.sync()
+            assert ret["error"] == "NO_ERROR"
+            assert not ret["data"]["written"]
+            assert abs(ret["data"]["drift"]) <= rtc_sync.threshold
+            assert pijuice.interface.i2cbus.set_write_log(False) == {}
+            assert rtc_sync.drift_rate is None
+
+            # drift rate is reported once measured over long enough span
+            rtc_sync.reference = (datetime.now(UTC) - timedelta(days=1), -5.0)
+            rtc_sync.sync()
+            assert 3 < rtc_sync.drift_rate < 7
+            diagnostics = rtc_sync.get_diagnostics()
+            assert diagnostics["writes"] == 1
+            assert diagnostics["drift rate, s/day"] == round(rtc_sync.drift_rate, 2)
+
+            # forced write
+            ret = rtc_sync.sync(force=True)
+            assert ret["data"]["written"]
+            assert rtc_sync.writes == 2
+
+            # read-back mismatch
+            with patch("homeassistant.components.pijups.rtc.RTC_VERIFY_DEADLINE", 0.05):
+                with patch(
+                    "homeassistant.components.pijups.rtc.decode_rtc_time",
+                    side_effect=[datetime(2022, 1, 1, tzinfo=UTC), None, None, None, None, None],
+                ):
+                    assert rtc_sync.write_aligned() == {"error": "WRITE_FAILED"}
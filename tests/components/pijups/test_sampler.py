@@ -0,0 +1,59 @@
+"""Test PiJups high-rate battery sampler."""
+import csv
+import threading
+from unittest.mock import patch
+
+import homeassistant.components.pijups.pijuice as pi
+from homeassistant.components.pijups.sampler import RingBuffer, Sampler
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+
+def test_ring_buffer():
+    """Test ring buffer keeps latest samples in order."""
+    buffer = RingBuffer(3)
+    assert len(buffer) == 0
+    assert list(buffer) == []
+    for sample in range(5):
+        buffer.append(sample / 10, sample, -sample)
+    assert len(buffer) == 3
+    assert buffer.count == 5
+    assert list(buffer) == [(0.2, 2, -2), (0.3, 3, -3), (0.4, 4, -4)]
+
+
+def test_sampler(hass: HomeAssistant, tmp_path):
+    """Test sampler rate, statistics, stop and CSV dump."""
+    SMBus.SIM_BUS = 1
+    with patch("homeassistant.components.pijups.pijuice.SMBus", new=SMBus):
+        with pi.PiJuice(1, 0x14) as pijuice:
+            pijuice.interface.i2cbus._set_buff(0x4B, [0x18, 0xFC, 0])  # -1000 mA
+            sampler = Sampler(pijuice.interface, 50, 0.5)
+            stats = sampler.run()
+            assert stats["samples"] == 25
+            assert stats["stored"] == 25
+            assert stats["errors"] == 0
+            assert 40 < stats["achieved_rate"] < 60
+            assert stats["jitter_ms"] >= 0
+            file_name = tmp_path / "samples.csv"
+            sampler.dump_csv(file_name)
+            with open(file_name, encoding="utf-8") as file:
+                rows = list(csv.reader(file))
+            assert rows[0] == ["time_s", "battery_voltage_mv", "battery_current_ma"]
+            assert len(rows) == 26
+            assert rows[1][1:] == ["4020", "-1000"]
+            assert float(rows[-1][0]) > float(rows[1][0])
+
+            # stop request ends sampling early
+            sampler = Sampler(pijuice.interface, 10, 60)
+            threading.Timer(0.3, sampler.stop).start()
+            stats = sampler.run()
+            assert stats["elapsed_s"] < 1
+            assert 2 <= stats["samples"] <= 5
+
+            # failed reads are counted, not stored
+            sampler = Sampler(pijuice.interface, 10, 0.2)
+            pijuice.interface.i2cbus.io_error_next_read_call()
+            stats = sampler.run()
+            assert stats["errors"] == 1
+            assert stats["samples"] == 1
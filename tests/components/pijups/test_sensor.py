@@ -216,3 +216,29 @@ async def test_pijups_check_disable_status(hass):
     await common.pijups_setup_and_run_test(
         hass, True, run_test_pijups_check_disable_status
     )
+
+
+async def test_pijups_slow_sensor_follows_slow_burst(hass):
+    """Test slow sensor takes value once per burst that read slow registers."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_pijups_slow_sensor_follows_slow_burst(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        charge_sensor = get_sensor_entity_by_name(hass, entry, "Charge")
+        pijups.interface.i2cbus._set_buff(0x41, [50, 0])
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_add_executor_job(charge_sensor.update)
+        assert charge_sensor._attr_native_value == 50
+
+        # no slow registers read since, value is kept
+        pijups.interface.i2cbus._set_buff(0x41, [60, 0])
+        await hass.async_add_executor_job(charge_sensor.update)
+        assert charge_sensor._attr_native_value == 50
+
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_add_executor_job(charge_sensor.update)
+        assert charge_sensor._attr_native_value == 60
+
+    await common.pijups_setup_and_run_test(
+        hass, True, run_test_pijups_slow_sensor_follows_slow_burst
+    )
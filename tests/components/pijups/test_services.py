@@ -0,0 +1,431 @@
+"""Test PiJups services."""
+import asyncio
+from datetime import timedelta
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.components import persistent_notification
+from homeassistant.components.pijups.capture import read_capture
+from homeassistant.components.pijups.const import (
+    ATTR_AT,
+    ATTR_CRON,
+    ATTR_CYCLES,
+    ATTR_DURATION,
+    ATTR_ENABLE,
+    ATTR_FILE,
+    ATTR_RATE,
+    ATTR_SAVE_LAST,
+    DOMAIN,
+    SERVICE_BACKUP_CONFIG,
+    SERVICE_CAPTURE_I2C,
+    SERVICE_CLEAR_FAULTS,
+    SERVICE_PROFILE,
+    SERVICE_RESTORE_CONFIG,
+    SERVICE_SAMPLE_BATTERY,
+    SERVICE_SCHEDULE_WAKEUP,
+)
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.util.dt as dt_util
+
+from .smbus2 import SMBus
+
+from tests.components.pijups import common
+
+
+async def test_backup_restore(hass: HomeAssistant, tmp_path):
+    """Test configuration backup and diff based restore."""
+    SMBus.SIM_BUS = 1
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    backup_file = str(tmp_path / "pijuice_backup.json")
+
+    async def run_test_backup_restore(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        await hass.services.async_call(
+            DOMAIN, SERVICE_BACKUP_CONFIG, {ATTR_FILE: backup_file}, blocking=True
+        )
+        with open(backup_file, encoding="utf-8") as file:
+            backup = json.load(file)
+        assert backup["format"] == 1
+        assert backup["firmware"] == "1.6"
+        assert backup["registers"]["power_inputs"] == "0b"
+        assert backup["registers"]["d1"] == "013c3c64"
+        assert backup["config"]["d1"] is not None
+        assert backup["config"]["io1"] is not None
+
+        # nothing changed, nothing written
+        pijups.interface.i2cbus.set_write_log(True)
+        await hass.services.async_call(
+            DOMAIN, SERVICE_RESTORE_CONFIG, {ATTR_FILE: backup_file}, blocking=True
+        )
+        assert pijups.interface.i2cbus.set_write_log(True) == {}
+
+        # only changed registers are written back
+        pijups.interface.i2cbus._set_buff(0x5E, [0x00, 0])
+        pijups.interface.i2cbus._set_buff(0x6A, [0, 0, 0, 0, 0])
+        await hass.services.async_call(
+            DOMAIN, SERVICE_RESTORE_CONFIG, {ATTR_FILE: backup_file}, blocking=True
+        )
+        write_log = pijups.interface.i2cbus.set_write_log(False)
+        assert sorted(write_log.keys()) == [0x5E, 0x6A]
+        assert pijups.interface.i2cbus._get_buff(0x5E)[0] == 0x0B
+        assert pijups.interface.i2cbus._get_buff(0x6A)[:-1] == [1, 60, 60, 100]
+
+        # custom profile is selected before its data is written, watchdog is not restored
+        custom_backup = json.loads(json.dumps(backup))
+        profile = bytes.fromhex(backup["registers"]["profile"])
+        custom_profile = bytes([profile[0] + 2]) + profile[1:]
+        custom_backup["registers"]["profile_id"] = "0f"
+        custom_backup["registers"]["profile"] = custom_profile.hex()
+        custom_backup["registers"]["watchdog"] = "0500"
+        with open(backup_file, "w", encoding="utf-8") as file:
+            json.dump(custom_backup, file)
+        pijups.interface.i2cbus.set_write_log(True)
+        await hass.services.async_call(
+            DOMAIN, SERVICE_RESTORE_CONFIG, {ATTR_FILE: backup_file}, blocking=True
+        )
+        write_log = pijups.interface.i2cbus.set_write_log(False)
+        assert list(write_log) == [0x52, 0x53, 0x54]
+        assert pijups.interface.i2cbus._get_buff(0x52)[0] == 0x0F
+        assert pijups.interface.i2cbus._get_buff(0x53)[:-1] == list(custom_profile)
+        assert pijups.interface.i2cbus._get_buff(0x61)[:2] == [0, 0]
+        assert pijups.watchdog_period == 0
+        with open(backup_file, "w", encoding="utf-8") as file:
+            json.dump(backup, file)
+
+        # HAT is not accessed during firmware upgrade
+        pijups.piju_enabled = False
+        pijups.interface.i2cbus.set_write_log(True)
+        for service in (SERVICE_BACKUP_CONFIG, SERVICE_RESTORE_CONFIG):
+            with pytest.raises(HomeAssistantError, match="being upgraded"):
+                await hass.services.async_call(
+                    DOMAIN, service, {ATTR_FILE: backup_file}, blocking=True
+                )
+        assert pijups.interface.i2cbus.set_write_log(False) == {}
+        pijups.piju_enabled = True
+
+        # unsupported file content
+        backup["format"] = 0
+        with open(backup_file, "w", encoding="utf-8") as file:
+            json.dump(backup, file)
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_RESTORE_CONFIG, {ATTR_FILE: backup_file}, blocking=True
+            )
+
+        # directory does not exist
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_BACKUP_CONFIG,
+                {ATTR_FILE: str(tmp_path / "missing" / "pijuice_backup.json")},
+                blocking=True,
+            )
+
+        # file outside of allowed directories
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_BACKUP_CONFIG, {ATTR_FILE: "/pijuice_backup.json"}, blocking=True
+            )
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_backup_restore)
+
+
+async def test_schedule_wakeup(hass: HomeAssistant):
+    """Test wake-up alarm scheduling service."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_schedule_wakeup(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        await hass.services.async_call(
+            DOMAIN, SERVICE_SCHEDULE_WAKEUP, {ATTR_CRON: "30 6 * * 1,2,3,4,5"}, blocking=True
+        )
+        assert pijups.interface.i2cbus._get_buff(0xB9)[:-1] == [0, 0x30, 0x06, 0xC0, 0xFF, 0xFF, 0xFF, 0, 0x7C]
+        assert pijups.rtcalarm.GetControlStatus()["data"]["alarm_wakeup_enabled"]
+
+        when = dt_util.utcnow().replace(microsecond=0) + timedelta(hours=1)
+        await hass.services.async_call(
+            DOMAIN, SERVICE_SCHEDULE_WAKEUP, {ATTR_AT: when, ATTR_ENABLE: False}, blocking=True
+        )
+        assert pijups.rtcalarm.GetAlarm()["data"] == {
+            "second": when.second,
+            "minute": when.minute,
+            "hour": when.hour,
+            "day": when.day,
+        }
+        assert not pijups.rtcalarm.GetControlStatus()["data"]["alarm_wakeup_enabled"]
+
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_SCHEDULE_WAKEUP, {ATTR_CRON: "30 6 1 * 1"}, blocking=True
+            )
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SCHEDULE_WAKEUP,
+                {ATTR_AT: dt_util.utcnow() - timedelta(hours=1)},
+                blocking=True,
+            )
+        # more than a month ahead alarm would fire on first matching day of month
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SCHEDULE_WAKEUP,
+                {ATTR_AT: when + timedelta(days=40)},
+                blocking=True,
+            )
+        assert pijups.rtcalarm.GetAlarm()["data"]["day"] == when.day
+
+        # alarm registers are not accessed during firmware upgrade
+        pijups.piju_enabled = False
+        pijups.interface.i2cbus.set_write_log(True)
+        with pytest.raises(HomeAssistantError, match="being upgraded"):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_SCHEDULE_WAKEUP, {ATTR_AT: when + timedelta(hours=1)}, blocking=True
+            )
+        assert pijups.interface.i2cbus.set_write_log(False) == {}
+        pijups.piju_enabled = True
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_schedule_wakeup)
+
+
+async def test_sample_battery(hass: HomeAssistant, tmp_path):
+    """Test high-rate battery sampling service."""
+    SMBus.SIM_BUS = 1
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    samples_file = str(tmp_path / "samples.csv")
+
+    async def run_test_sample_battery(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SAMPLE_BATTERY,
+            {ATTR_RATE: 20, ATTR_DURATION: 1, ATTR_FILE: samples_file},
+            blocking=True,
+            return_response=True,
+        )
+        assert response["samples"] == 20
+        assert response["file"] == samples_file
+        assert "jitter_ms" in response
+        assert pijups.sampler_stats == response
+        assert pijups.sampler is None
+        with open(samples_file, encoding="utf-8") as file:
+            assert len(file.readlines()) == 21
+
+        # samples are kept if file cannot be written, saved on request
+        bad_file = str(tmp_path / "missing" / "samples.csv")
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SAMPLE_BATTERY,
+                {ATTR_RATE: 20, ATTR_DURATION: 1, ATTR_FILE: bad_file},
+                blocking=True,
+            )
+        assert pijups.sampler is None
+        assert pijups.sampler_unsaved is not None
+        # no sampling during firmware upgrade, saving samples does not access HAT
+        pijups.piju_enabled = False
+        with pytest.raises(HomeAssistantError, match="being upgraded"):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SAMPLE_BATTERY,
+                {ATTR_RATE: 20, ATTR_DURATION: 1, ATTR_FILE: samples_file},
+                blocking=True,
+            )
+        assert pijups.sampler_unsaved is not None
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SAMPLE_BATTERY,
+            {ATTR_SAVE_LAST: True, ATTR_FILE: samples_file},
+            blocking=True,
+            return_response=True,
+        )
+        assert response["file"] == samples_file
+        assert pijups.sampler_unsaved is None
+        pijups.piju_enabled = True
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SAMPLE_BATTERY,
+                {ATTR_SAVE_LAST: True, ATTR_FILE: samples_file},
+                blocking=True,
+            )
+
+        # concurrent calls, only one sampler runs
+        results = await asyncio.gather(
+            *(
+                hass.async_add_executor_job(pijups.run_sampler, 20, 1, samples_file)
+                for _ in range(3)
+            )
+        )
+        assert sorted(ret["error"] for ret in results) == ["BUSY", "BUSY", "NO_ERROR"]
+
+        # sampler is busy
+        pijups.sampler = object()
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_SAMPLE_BATTERY,
+                {ATTR_DURATION: 1, ATTR_FILE: samples_file},
+                blocking=True,
+            )
+        pijups.sampler = None
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_sample_battery)
+
+
+async def test_capture_i2c(hass: HomeAssistant, tmp_path):
+    """Test I2C capture service."""
+    SMBus.SIM_BUS = 1
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    capture_file = str(tmp_path / "hat.cap")
+
+    async def run_test_capture_i2c(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        bus = pijups.interface.i2cbus
+
+        async def poll_during_capture():
+            await asyncio.sleep(0.3)
+            await hass.async_add_executor_job(pijups.get_piju_status, True)
+
+        response, _ = await asyncio.gather(
+            hass.services.async_call(
+                DOMAIN,
+                SERVICE_CAPTURE_I2C,
+                {ATTR_DURATION: 1, ATTR_FILE: capture_file},
+                blocking=True,
+                return_response=True,
+            ),
+            poll_during_capture(),
+        )
+        assert response["file"] == capture_file
+        assert response["records"] > 0
+        assert pijups.capture is None
+        assert pijups.interface.i2cbus is bus
+        assert len(read_capture(capture_file)[2]) == response["records"]
+
+        # capture is busy
+        assert pijups.start_capture(capture_file)["error"] == "NO_ERROR"
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_CAPTURE_I2C,
+                {ATTR_DURATION: 1, ATTR_FILE: capture_file},
+                blocking=True,
+            )
+        assert pijups.stop_capture()["error"] == "NO_ERROR"
+        assert pijups.stop_capture()["error"] == "NOT_STARTED"
+
+        # concurrent starts, only one capture runs and other files are not created
+        files = [str(tmp_path / f"hat{index}.cap") for index in range(3)]
+        results = await asyncio.gather(
+            *(hass.async_add_executor_job(pijups.start_capture, file) for file in files)
+        )
+        assert sorted(ret["error"] for ret in results) == ["BUSY", "BUSY", "NO_ERROR"]
+        assert sum(os.path.exists(file) for file in files) == 1
+        assert pijups.interface.i2cbus is pijups.capture
+        assert pijups.capture.bus is bus
+        assert pijups.stop_capture()["error"] == "NO_ERROR"
+        assert pijups.interface.i2cbus is bus
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_capture_i2c)
+
+
+async def test_profile(hass: HomeAssistant, tmp_path):
+    """Test profiler service."""
+    SMBus.SIM_BUS = 1
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    report_file = str(tmp_path / "profile.txt")
+
+    async def run_test_profile(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+
+        async def poll_during_profile():
+            for _ in range(4):
+                await asyncio.sleep(0.1)
+                await hass.async_add_executor_job(pijups.get_piju_status, True)
+
+        response, _ = await asyncio.gather(
+            hass.services.async_call(
+                DOMAIN,
+                SERVICE_PROFILE,
+                {ATTR_CYCLES: 2, ATTR_DURATION: 5, ATTR_FILE: report_file},
+                blocking=True,
+                return_response=True,
+            ),
+            poll_during_profile(),
+        )
+        assert response["cycles"] == 2
+        assert response["file"] == report_file
+        assert sum(response["threads"].values()) == response["active_samples"]
+        assert pijups.profiler is None
+        notifications = persistent_notification._async_get_or_create_notifications(hass)
+        assert report_file in notifications["pijups_profile"]["message"]
+        with open(report_file, encoding="utf-8") as file:
+            assert "2 poll cycles" in file.read()
+
+        # profiler is busy
+        pijups.profiler = object()
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_PROFILE, {ATTR_DURATION: 1, ATTR_FILE: report_file}, blocking=True
+            )
+        pijups.profiler = None
+
+        # concurrent runs, only one profiler runs
+        results = await asyncio.gather(
+            *(
+                hass.async_add_executor_job(pijups.run_profiler, 0.5, None, None, report_file)
+                for _ in range(3)
+            )
+        )
+        assert sorted(ret["error"] for ret in results) == ["BUSY", "BUSY", "NO_ERROR"]
+
+        # report cannot be written
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_PROFILE,
+                {ATTR_DURATION: 1, ATTR_FILE: str(tmp_path / "missing" / "profile.txt")},
+                blocking=True,
+            )
+        assert pijups.profiler is None
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_profile)
+
+
+async def test_clear_faults(hass: HomeAssistant):
+    """Test fault clearing service."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_clear_faults(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        pijups.interface.i2cbus._set_buff(0x44, [0b00100011, 0])
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        assert len(pijups.faults) == 3
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_CLEAR_FAULTS, {}, blocking=True, return_response=True
+        )
+        assert response == {"faults": {"battery_profile_invalid": True}}
+        assert pijups.interface.i2cbus._get_buff(0x44)[0] == 0b00100000
+
+        # fault register is not accessed during firmware upgrade
+        pijups.piju_enabled = False
+        pijups.interface.i2cbus._set_buff(0x44, [0b00101000, 0])
+        with pytest.raises(HomeAssistantError, match="being upgraded"):
+            await hass.services.async_call(DOMAIN, SERVICE_CLEAR_FAULTS, {}, blocking=True)
+        assert pijups.interface.i2cbus._get_buff(0x44)[0] == 0b00101000
+        pijups.piju_enabled = True
+
+        pijups.faults = {"watchdog_reset": True}
+        with patch.object(
+            pijups.status, "ResetFaultFlags", new=lambda flags: {"error": "WRITE_FAILED"}
+        ):
+            with pytest.raises(HomeAssistantError):
+                await hass.services.async_call(DOMAIN, SERVICE_CLEAR_FAULTS, {}, blocking=True)
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_clear_faults)
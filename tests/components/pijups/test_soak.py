@@ -0,0 +1,21 @@
+"""Test PiJups soak harness runs and reports resource usage."""
+import json
+
+from . import soak
+
+
+def test_soak(hass):
+    """Run few simulated hours of polling."""
+    report = soak.run_soak(days=0.25, checkpoint_interval=3 * soak.SECONDS_PER_HOUR)
+    json.dumps(report)
+    assert report["simulated_hours"] == 6
+    assert report["polls"] == 6 * soak.SECONDS_PER_HOUR // report["scan_interval_s"]
+    assert report["cpu_ms_per_simulated_hour"] > 0
+    assert report["peak_rss_kb"] > 0
+    assert report["threads_after"] <= report["threads_before"]
+    assert report["i2c_transfers"]["read"] > report["polls"]
+    assert [point["simulated_hours"] for point in report["checkpoints"]] == [3, 6]
+
+    noisy = soak.run_soak(days=0.05, profile="noisy")
+    assert noisy["profile"] == "noisy"
+    assert len(noisy["checkpoints"]) == 1
@@ -0,0 +1,77 @@
+"""Test PiJups rolling window telemetry statistics."""
+import random
+import statistics
+
+import pytest
+
+from homeassistant.components.pijups.const import DOMAIN, SENSOR_ENTITY
+from homeassistant.components.pijups.interface import PiJups
+from homeassistant.components.pijups.stats import STATS_ATTRIBUTES, RollingWindow
+from homeassistant.core import HomeAssistant
+
+from .smbus2 import SMBus
+
+from tests.components.pijups import common
+
+
+def test_rolling_window():
+    """Test incremental statistics match ones calculated over window contents."""
+    window = RollingWindow(10)
+    assert window.get_statistics() == {}
+    assert window.minimum is None
+    samples = [random.randint(-2000, 5000) for _ in range(100)]
+    for number, value in enumerate(samples, 1):
+        window.append(value)
+        contents = samples[max(number - 10, 0) : number]
+        assert len(window) == len(contents)
+        assert window.minimum == min(contents)
+        assert window.maximum == max(contents)
+        assert window.mean == pytest.approx(statistics.fmean(contents))
+        assert window.stddev == pytest.approx(statistics.pstdev(contents))
+
+    window = RollingWindow(3)
+    for value in (5, 5, 5, 1):
+        window.append(value)
+    assert window.get_statistics() == {"min": 1, "max": 5, "mean": 3.67, "stddev": 1.89, "samples": 3}
+
+
+async def test_sensor_statistics_attributes(hass: HomeAssistant):
+    """Test telemetry sensors expose rolling window statistics."""
+    SMBus.SIM_BUS = 1
+
+    async def run_test_sensor_statistics_attributes(hass, entry):
+        pijups: PiJups = await common.get_pijups(hass, entry)
+        bus = pijups.interface.i2cbus
+        bus._set_buff(0x49, [0xD0, 0x07] + [bus._get_check_sum([0xD0, 0x07])])  # 2000 mV
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        stats = pijups.get_telemetry_statistics("GetBatteryVoltage")
+        assert stats["min"] == 2000
+        assert stats["max"] == 4020
+        assert stats["samples"] == 2
+
+        attributes = hass.states.get("sensor.pijups_battery_voltage").attributes
+        assert attributes["samples"] >= 1
+        assert attributes["max"] == 4020
+        assert "mean" in hass.states.get("sensor.pijups_io_current").attributes
+        assert "mean" not in hass.states.get("sensor.pijups_battery_status").attributes
+
+        # statistics are not recorded and change only with value, so unchanged value writes no state
+        sensor = next(
+            entity
+            for entity in hass.data[DOMAIN][entry.entry_id][SENSOR_ENTITY]
+            if entity.name == "IO voltage"
+        )
+        assert set(STATS_ATTRIBUTES) <= sensor._Entity__combined_unrecorded_attributes
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_add_executor_job(sensor.update)
+        attributes = sensor.extra_state_attributes
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_add_executor_job(sensor.update)
+        assert pijups.get_telemetry_statistics("GetIoVoltage")["samples"] > attributes["samples"]
+        assert sensor.extra_state_attributes == attributes
+        bus._set_buff(0x4D, [0xD0, 0x07] + [bus._get_check_sum([0xD0, 0x07])])
+        await hass.async_add_executor_job(pijups.get_piju_status, True)
+        await hass.async_add_executor_job(sensor.update)
+        assert sensor.extra_state_attributes["min"] == 2000
+
+    await common.pijups_setup_and_run_test(hass, True, run_test_sensor_statistics_attributes)